@@ -6,6 +6,12 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = Path(os.environ.get("CASHMONEY_DATA_DIR", BASE_DIR))
+# Worker threads for background jobs. 0 runs jobs inline in the request.
+JOB_WORKERS = int(os.environ.get("CASHMONEY_JOB_WORKERS", "1"))
+# Concurrent requests when backfilling exchange rates.
+EXCHANGE_RATE_FETCH_WORKERS = int(os.environ.get("CASHMONEY_RATE_FETCH_WORKERS", "4"))
+# Worker processes that parse multi-file imports. 0 parses them in the backend.
+IMPORT_WORKERS = int(os.environ.get("CASHMONEY_IMPORT_WORKERS", "4"))
 
 SECRET_KEY = "cashmoney-local-development-key"
 DEBUG = True
@@ -62,6 +68,11 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": DATA_DIR / "db.sqlite3",
+        # WAL lets requests keep reading while a background job is writing.
+        "OPTIONS": {
+            "init_command": "PRAGMA journal_mode=WAL;",
+            "timeout": 20,
+        },
     }
 }
 
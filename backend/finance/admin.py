@@ -15,6 +15,7 @@ from .models import (
     Transaction,
     TransactionTag,
 )
+from .services import mark_exchange_rates_changed
 
 
 class TransactionTagInline(admin.TabularInline):
@@ -163,6 +164,19 @@ class ExchangeRateAdmin(admin.ModelAdmin):
     search_fields = ("base_currency", "quote_currency", "source")
     date_hierarchy = "date"
 
+    # Rate edits bypass the sync, so tell every process's rate index.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        mark_exchange_rates_changed()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        mark_exchange_rates_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        mark_exchange_rates_changed()
+
 
 @admin.register(FinanceSettings)
 class FinanceSettingsAdmin(admin.ModelAdmin):
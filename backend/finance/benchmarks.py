@@ -0,0 +1,676 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+from django.test.utils import CaptureQueriesContext
+
+from .constants import Direction, WantNeedInvestment
+from .models import (
+    BankAccount,
+    Category,
+    CSVMapping,
+    FinanceSettings,
+    ImportRowResult,
+    Keyword,
+    Subcategory,
+    Transaction,
+    TransactionRollup,
+)
+from .sample_data import create_csv_mappings
+from .services import (
+    CategorizationService,
+    CSVImportService,
+    CSVRowExtractor,
+    CONVERSION_FIELDS,
+    add_category_amount,
+    build_dashboard_summary,
+    build_dashboard_summary_from_rollups,
+    cache_exchange_rate_rows,
+    category_tree,
+    clear_exchange_rate_index,
+    convert_transactions_in_database,
+    mark_transaction_rollups_stale,
+    normalize_currency_code,
+    normalize_text,
+    recalculate_transaction_conversions,
+)
+
+BENCHMARK_WORDS = [
+    "albert",
+    "billa",
+    "bolt",
+    "cafe",
+    "card",
+    "dm",
+    "energy",
+    "fuel",
+    "gym",
+    "insurance",
+    "kaufland",
+    "lidl",
+    "mol",
+    "netflix",
+    "payment",
+    "pharmacy",
+    "rent",
+    "restaurant",
+    "salary",
+    "shell",
+    "spotify",
+    "tesco",
+    "transfer",
+    "uber",
+]
+
+
+@contextmanager
+def rolled_back():
+    """Run a benchmark inside a transaction that is always discarded."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timed(callback):
+    started = time.perf_counter()
+    result = callback()
+    return time.perf_counter() - started, result
+
+
+def benchmark_vocabulary(rng, size):
+    return [f"{rng.choice(BENCHMARK_WORDS)}{index:04d}" for index in range(size)]
+
+
+def benchmark_categorization(keyword_count=2000, text_count=20000, seed=1):
+    rng = random.Random(seed)
+    vocabulary = benchmark_vocabulary(rng, max(keyword_count * 2, 100))
+    texts = [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 10)))
+        for _ in range(text_count)
+    ]
+
+    with rolled_back():
+        Keyword.objects.bulk_create(
+            [
+                Keyword(
+                    name=f"Benchmark keyword {index:05d}",
+                    include_terms=rng.sample(vocabulary, rng.randint(1, 2)),
+                    exclude_terms=(
+                        rng.sample(vocabulary, 1) if rng.random() < 0.2 else []
+                    ),
+                    priority=rng.randint(0, 20),
+                )
+                for index in range(keyword_count)
+            ]
+        )
+        service = CategorizationService()
+        normalized_texts = [normalize_text(text) for text in texts]
+        scan_seconds, scan_results = timed(
+            lambda: [service.scan_keywords(text) for text in normalized_texts]
+        )
+        compiled_seconds, compiled_results = timed(
+            lambda: [service.matcher.match(text) for text in normalized_texts]
+        )
+
+    mismatches = sum(
+        1
+        for scanned, compiled in zip(scan_results, compiled_results)
+        if [keyword.id for keyword in scanned] != [keyword.id for keyword in compiled]
+    )
+    return {
+        "suite": "categorization",
+        "keywords": keyword_count,
+        "texts": text_count,
+        "matched_texts": sum(1 for matched in compiled_results if matched),
+        "scan_seconds": round(scan_seconds, 4),
+        "compiled_seconds": round(compiled_seconds, 4),
+        "speedup": (
+            round(scan_seconds / compiled_seconds, 2) if compiled_seconds else None
+        ),
+        "mismatches": mismatches,
+    }
+
+
+def benchmark_csv_content(rng, row_count):
+    vocabulary = benchmark_vocabulary(rng, 200)
+    start_date = date(2024, 1, 1)
+    lines = ["ID,Date,Description,Amount,Currency"]
+    for index in range(row_count):
+        # Every twentieth row repeats an earlier one to exercise duplicate checks.
+        source = rng.randrange(index) if index and index % 20 == 0 else index
+        transaction_date = start_date + timedelta(days=source % 730)
+        description = " ".join(
+            vocabulary[(source * 7 + offset) % len(vocabulary)] for offset in range(3)
+        )
+        amount = f"-{(source % 5000) + 1}.{source % 100:02d}"
+        lines.append(
+            f"bench-{source},{transaction_date.isoformat()},{description},{amount},CZK"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def benchmark_import(keyword_count=200, row_count=20000, seed=1):
+    rng = random.Random(seed)
+    content = benchmark_csv_content(rng, row_count).encode("utf-8")
+    vocabulary = benchmark_vocabulary(random.Random(seed), 200)
+    results = {}
+
+    with rolled_back():
+        mapping = CSVMapping.objects.create(
+            name="Benchmark CSV Mapping",
+            column_map={
+                "original_id": "ID",
+                "transaction_date": "Date",
+                "description": "Description",
+                "amount": "Amount",
+                "currency": "Currency",
+            },
+            categorization_fields=["description"],
+        )
+        bank_account = BankAccount.objects.create(
+            name="Benchmark account", default_csv_mapping=mapping
+        )
+        Keyword.objects.bulk_create(
+            [
+                Keyword(
+                    name=f"Benchmark keyword {index:05d}",
+                    include_terms=[rng.choice(vocabulary)],
+                    priority=rng.randint(0, 20),
+                )
+                for index in range(keyword_count)
+            ]
+        )
+        for import_mode in [
+            CSVImportService.IMPORT_MODE_ROW,
+            CSVImportService.IMPORT_MODE_BATCH,
+        ]:
+            with rolled_back():
+                service = CSVImportService(
+                    mapping, bank_account, import_mode=import_mode
+                )
+                seconds, (csv_import, report) = timed(
+                    lambda: service.import_file(
+                        SimpleUploadedFile("benchmark.csv", content),
+                        "benchmark.csv",
+                    )
+                )
+                lines = {
+                    outcome: import_row_lines(csv_import, outcome)
+                    for outcome, _label in ImportRowResult.OUTCOME_CHOICES
+                }
+            results[import_mode] = (seconds, report, lines)
+
+    row_seconds, _row_report, row_lines = results[CSVImportService.IMPORT_MODE_ROW]
+    batch_seconds, batch_report, batch_lines = results[
+        CSVImportService.IMPORT_MODE_BATCH
+    ]
+    mismatches = sum(
+        1 for outcome, lines in row_lines.items() if batch_lines[outcome] != lines
+    )
+    return {
+        "suite": "import",
+        "keywords": keyword_count,
+        "rows": row_count,
+        "created": batch_report["created"]["count"],
+        "duplicates": batch_report["skipped"]["duplicate_count"],
+        "row_seconds": round(row_seconds, 4),
+        "batch_seconds": round(batch_seconds, 4),
+        "row_rows_per_second": round(row_count / row_seconds) if row_seconds else None,
+        "batch_rows_per_second": (
+            round(row_count / batch_seconds) if batch_seconds else None
+        ),
+        "speedup": round(row_seconds / batch_seconds, 2) if batch_seconds else None,
+        "mismatches": mismatches,
+    }
+
+
+def import_row_lines(csv_import, outcome):
+    return list(
+        csv_import.row_results.filter(outcome=outcome)
+        .order_by("line")
+        .values_list("line", "transaction__original_id", "transaction__subcategory")
+    )
+
+
+def benchmark_transactions(rng, row_count, bank_accounts, subcategories):
+    start_date = date(2024, 1, 1)
+    wni_values = [None, *[value for value, _label in WantNeedInvestment.CHOICES]]
+    for index in range(row_count):
+        amount = Decimal(rng.randint(-500000, 200000)) / 100
+        currency = "CZK"
+        converted_amount = None
+        converted_currency = ""
+        roll = rng.random()
+        if roll < 0.1:
+            currency = "EUR"
+            converted_amount = amount * 25
+            converted_currency = "CZK"
+        elif roll < 0.12:
+            currency = "USD"
+        yield Transaction(
+            bank_account=rng.choice(bank_accounts),
+            transaction_date=start_date + timedelta(days=index % 730),
+            description=f"Benchmark transaction {index}",
+            amount=amount,
+            currency=currency,
+            converted_amount=converted_amount,
+            converted_currency=converted_currency,
+            direction=Direction.INCOME if amount >= 0 else Direction.EXPENSE,
+            subcategory=rng.choice(subcategories),
+            want_need_investment=rng.choice(wni_values),
+            is_ignored=rng.random() < 0.05,
+        )
+
+
+def counted(callback):
+    # The query log keeps only the latest 9000 queries, and bulk inserts can
+    # already have filled it.
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        seconds, result = timed(callback)
+    return seconds, len(queries), result
+
+
+def build_dashboard_summary_reference(
+    queryset, split_by_owners=False, default_currency=None
+):
+    """Build the dashboard summary with one query per section.
+
+    This is how ``build_dashboard_summary`` used to work, kept as the
+    baseline of the dashboard benchmark.
+    """
+    default_currency = normalize_currency_code(
+        default_currency or FinanceSettings.load().default_currency
+    )
+    amount_field = DecimalField(max_digits=24, decimal_places=8)
+    base_queryset = Transaction.objects.filter(
+        id__in=queryset.order_by().values("id")
+    ).order_by()
+    converted_amount = Case(
+        When(
+            converted_amount__isnull=False,
+            converted_currency=default_currency,
+            then=F("converted_amount"),
+        ),
+        When(currency=default_currency, then=F("amount")),
+        default=Value(None),
+        output_field=amount_field,
+    )
+    if split_by_owners:
+        amount = ExpressionWrapper(
+            converted_amount / Coalesce(F("bank_account__owners"), Value(1)),
+            output_field=amount_field,
+        )
+    else:
+        amount = converted_amount
+    amount_abs = Case(
+        When(
+            _summary_amount__lt=0,
+            then=ExpressionWrapper(
+                F("_summary_amount") * Value(-1),
+                output_field=amount_field,
+            ),
+        ),
+        default=F("_summary_amount"),
+        output_field=amount_field,
+    )
+    annotated = base_queryset.annotate(_summary_amount=amount)
+    valid = annotated.filter(_summary_amount__isnull=False)
+    summary = {
+        "default_currency": default_currency,
+        "missing_conversions": annotated.filter(_summary_amount__isnull=True).count(),
+        "monthly": [],
+        "income_categories": [],
+        "expense_categories": [],
+        "want_need_investment": [],
+    }
+
+    income_categories = {}
+    expense_categories = {}
+
+    monthly_rows = (
+        valid.annotate(_summary_month=TruncMonth("transaction_date"))
+        .values("_summary_month")
+        .annotate(
+            income=Coalesce(
+                Sum(
+                    Case(
+                        When(_summary_amount__gte=0, then=F("_summary_amount")),
+                        default=Value(Decimal("0")),
+                        output_field=amount_field,
+                    )
+                ),
+                Value(Decimal("0")),
+                output_field=amount_field,
+            ),
+            expense=Coalesce(
+                Sum(
+                    Case(
+                        When(_summary_amount__lt=0, then=amount_abs),
+                        default=Value(Decimal("0")),
+                        output_field=amount_field,
+                    )
+                ),
+                Value(Decimal("0")),
+                output_field=amount_field,
+            ),
+        )
+        .order_by("_summary_month")
+    )
+    for row in monthly_rows:
+        month = row["_summary_month"]
+        summary["monthly"].append(
+            {
+                "month": month.strftime("%Y-%m"),
+                "income": float(row["income"] or Decimal("0")),
+                "expense": float(row["expense"] or Decimal("0")),
+            }
+        )
+
+    category_values = {
+        "category_name": Coalesce(
+            F("subcategory__category__name"),
+            Value("Uncategorized"),
+        ),
+        "subcategory_name": Coalesce(F("subcategory__name"), Value("Other")),
+        "category_color": Coalesce(F("subcategory__category__color"), Value("")),
+        "subcategory_color": Coalesce(F("subcategory__color"), Value("")),
+    }
+    income_category_rows = (
+        valid.filter(_summary_amount__gte=0)
+        .annotate(**category_values)
+        .values(
+            "category_name",
+            "subcategory_name",
+            "category_color",
+            "subcategory_color",
+        )
+        .annotate(amount=Sum("_summary_amount"))
+        .order_by("category_name", "subcategory_name")
+    )
+    for row in income_category_rows:
+        add_category_amount(
+            income_categories,
+            row["category_name"],
+            row["subcategory_name"],
+            row["amount"] or Decimal("0"),
+            row["category_color"],
+            row["subcategory_color"],
+        )
+
+    expense_category_rows = (
+        valid.filter(_summary_amount__lt=0)
+        .annotate(_summary_abs_amount=amount_abs, **category_values)
+        .values(
+            "category_name",
+            "subcategory_name",
+            "category_color",
+            "subcategory_color",
+        )
+        .annotate(amount=Sum("_summary_abs_amount"))
+        .order_by("category_name", "subcategory_name")
+    )
+    for row in expense_category_rows:
+        add_category_amount(
+            expense_categories,
+            row["category_name"],
+            row["subcategory_name"],
+            row["amount"] or Decimal("0"),
+            row["category_color"],
+            row["subcategory_color"],
+        )
+
+    wni_rows = (
+        valid.filter(_summary_amount__lt=0)
+        .annotate(
+            _summary_abs_amount=amount_abs,
+            wni_name=Coalesce(
+                F("want_need_investment"),
+                Value("uncategorized"),
+            ),
+        )
+        .values("wni_name")
+        .annotate(amount=Sum("_summary_abs_amount"))
+        .order_by("wni_name")
+    )
+
+    summary["income_categories"] = category_tree(income_categories)
+    summary["expense_categories"] = category_tree(expense_categories)
+    summary["want_need_investment"] = [
+        {"name": row["wni_name"], "amount": float(row["amount"] or Decimal("0"))}
+        for row in wni_rows
+    ]
+    return summary
+
+
+def benchmark_dashboard(row_count=20000, seed=1):
+    rng = random.Random(seed)
+    with rolled_back():
+        bank_accounts = [
+            BankAccount.objects.create(name=f"Benchmark account {index}", owners=owners)
+            for index, owners in enumerate([1, 1, 2])
+        ]
+        subcategories = [None]
+        for category_index in range(3):
+            category = Category.objects.create(
+                name=f"Benchmark category {category_index}"
+            )
+            subcategories.extend(
+                Subcategory.objects.create(
+                    name=f"Benchmark subcategory {category_index}.{index}",
+                    category=category,
+                )
+                for index in range(4)
+            )
+        Transaction.objects.bulk_create(
+            benchmark_transactions(rng, row_count, bank_accounts, subcategories),
+            batch_size=1000,
+        )
+        queryset = Transaction.objects.filter(is_ignored=False)
+        reference_seconds, reference_queries, reference = counted(
+            lambda: build_dashboard_summary_reference(queryset, default_currency="CZK")
+        )
+        single_pass_seconds, single_pass_queries, single_pass = counted(
+            lambda: build_dashboard_summary(queryset, default_currency="CZK")
+        )
+        mark_transaction_rollups_stale(Transaction.objects.all())
+        rollup_rebuild_seconds, _queries, _summary = counted(
+            lambda: build_dashboard_summary_from_rollups(
+                TransactionRollup.objects.filter(is_ignored=False),
+                default_currency="CZK",
+            )
+        )
+        rollup_seconds, rollup_queries, rollup = counted(
+            lambda: build_dashboard_summary_from_rollups(
+                TransactionRollup.objects.filter(is_ignored=False),
+                default_currency="CZK",
+            )
+        )
+
+    # The reference sums floats in SQL, so compare the summaries to the cent.
+    reference = rounded_amounts(reference)
+    mismatches = sum(
+        1
+        for key in reference
+        if reference[key] != rounded_amounts(single_pass[key])
+        or reference[key] != rounded_amounts(rollup[key])
+    )
+    return {
+        "suite": "dashboard",
+        "rows": row_count,
+        "reference_queries": reference_queries,
+        "single_pass_queries": single_pass_queries,
+        "rollup_queries": rollup_queries,
+        "reference_seconds": round(reference_seconds, 4),
+        "single_pass_seconds": round(single_pass_seconds, 4),
+        "rollup_rebuild_seconds": round(rollup_rebuild_seconds, 4),
+        "rollup_seconds": round(rollup_seconds, 4),
+        "mismatches": mismatches,
+    }
+
+
+def benchmark_rate_rows(rng, start_date, day_count):
+    rates = {"CZK": 25.0, "USD": 1.1, "GBP": 0.86}
+    for offset in range(day_count):
+        rate_date = start_date + timedelta(days=offset)
+        # Skip weekends and leave a few holes, as published rates do.
+        if rate_date.weekday() >= 5 or rng.random() < 0.02:
+            continue
+        for quote, rate in rates.items():
+            rates[quote] = rate * rng.uniform(0.995, 1.005)
+            yield {
+                "date": rate_date,
+                "base_currency": "EUR",
+                "quote_currency": quote,
+                "rate": Decimal(f"{rates[quote]:.4f}"),
+            }
+
+
+def converted_values():
+    return {
+        row[0]: row[1:]
+        for row in Transaction.objects.values_list("id", *CONVERSION_FIELDS)
+    }
+
+
+def benchmark_conversion(row_count=20000, seed=1):
+    rng = random.Random(seed)
+    start_date = date(2024, 1, 1)
+    currencies = ["CZK", "CZK", "EUR", "USD", "GBP", "PLN"]
+    results = {}
+    mismatches = 0
+    with rolled_back():
+        bank_account = BankAccount.objects.create(name="Benchmark account")
+        cache_exchange_rate_rows(benchmark_rate_rows(rng, start_date, 760))
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    bank_account=bank_account,
+                    # Start before the first rate so some rows miss a rate.
+                    transaction_date=start_date + timedelta(days=index % 760 - 5),
+                    description=f"Benchmark transaction {index}",
+                    amount=Decimal(rng.randint(-500000, 200000)) / 100,
+                    currency=rng.choice(currencies),
+                    direction=Direction.EXPENSE,
+                )
+                for index in range(row_count)
+            ),
+            batch_size=1000,
+        )
+        for default_currency in ["CZK", "EUR"]:
+            python_seconds, _result = timed(
+                lambda: recalculate_transaction_conversions(
+                    default_currency=default_currency
+                )
+            )
+            expected = converted_values()
+            Transaction.objects.update(
+                converted_amount=None,
+                converted_currency="",
+                conversion_rate=None,
+                conversion_rate_date=None,
+                conversion_status="",
+            )
+            sql_seconds, _result = timed(
+                lambda: convert_transactions_in_database(
+                    default_currency=default_currency
+                )
+            )
+            actual = converted_values()
+            mismatches += sum(
+                1 for key, values in expected.items() if actual[key] != values
+            )
+            results[f"{default_currency.lower()}_python_seconds"] = round(
+                python_seconds, 4
+            )
+            results[f"{default_currency.lower()}_sql_seconds"] = round(sql_seconds, 4)
+    # Rates cached inside the rolled back transaction are gone again.
+    clear_exchange_rate_index()
+
+    return {
+        "suite": "conversion",
+        "rows": row_count,
+        **results,
+        "mismatches": mismatches,
+    }
+
+
+def benchmark_airbank_values(rng, row_count):
+    """Dates and amounts written the way Airbank statements write them."""
+    start_date = date(2024, 1, 1)
+    dates = []
+    amounts = []
+    for _index in range(row_count):
+        transaction_date = start_date + timedelta(days=rng.randrange(730))
+        dates.append(transaction_date.strftime("%d.%m.%Y"))
+        cents = rng.randint(-2500000, 500000)
+        whole = f"{abs(cents) // 100:,}".replace(",", " ")
+        sign = "-" if cents < 0 else ""
+        amounts.append(f"{sign}{whole},{abs(cents) % 100:02d}")
+    return dates, amounts
+
+
+def benchmark_parsing(row_count=20000, seed=1):
+    dates, amounts = benchmark_airbank_values(random.Random(seed), row_count)
+    values = list(zip(dates, amounts))
+
+    with rolled_back():
+        mapping = create_csv_mappings()["airbank"]
+        reference = CSVRowExtractor(mapping)
+        reference_seconds, expected = timed(
+            lambda: [
+                (
+                    reference.parse_date_reference(value),
+                    reference.parse_money_reference(amount),
+                )
+                for value, amount in values
+            ]
+        )
+        # A fresh extractor, so the date cache starts empty.
+        extractor = CSVRowExtractor(mapping)
+        parsed_seconds, actual = timed(
+            lambda: [
+                (extractor.parse_date(value), extractor.parse_money(amount))
+                for value, amount in values
+            ]
+        )
+
+    return {
+        "suite": "parsing",
+        "rows": row_count,
+        "mapping": mapping.name,
+        "distinct_dates": len(set(dates)),
+        "reference_seconds": round(reference_seconds, 4),
+        "parsed_seconds": round(parsed_seconds, 4),
+        "speedup": (
+            round(reference_seconds / parsed_seconds, 2) if parsed_seconds else None
+        ),
+        "mismatches": sum(
+            1 for parsed, wanted in zip(actual, expected) if parsed != wanted
+        ),
+    }
+
+
+def rounded_amounts(value):
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, dict):
+        return {key: rounded_amounts(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded_amounts(item) for item in value]
+    return value
+
+
+BENCHMARK_SUITES = {
+    "categorization": benchmark_categorization,
+    "conversion": benchmark_conversion,
+    "dashboard": benchmark_dashboard,
+    "import": benchmark_import,
+    "parsing": benchmark_parsing,
+}
@@ -0,0 +1,146 @@
+"""Run long operations outside the HTTP request that submitted them.
+
+A job is a ``Job`` row plus a handler callable. Handlers run on a small
+in-process thread pool and report progress through the ``progress`` callback
+they receive, so clients can poll ``/api/jobs/<id>/`` while the work runs.
+``JOB_WORKERS = 0`` runs handlers inline instead, which is what the tests use.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import Job
+
+PROGRESS_UPDATE_INTERVAL_SECONDS = 1.0
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def job_worker_count():
+    return int(getattr(settings, "JOB_WORKERS", 1))
+
+
+def job_upload_directory():
+    return Path(getattr(settings, "DATA_DIR", Path.cwd())) / "job_uploads"
+
+
+def store_job_upload(uploaded_file):
+    upload_dir = job_upload_directory()
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    # Keep the extension, so a ZIP statement archive is stored as one.
+    suffix = Path(uploaded_file.name or "").suffix.lower()
+    if not suffix[1:].isalnum():
+        suffix = ".csv"
+    path = upload_dir / f"{uuid.uuid4().hex}{suffix}"
+    with path.open("wb") as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+    return str(path)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Nothing can still be working on jobs left over from a previous
+            # backend process, so close them before accepting new ones.
+            fail_interrupted_jobs()
+            _executor = ThreadPoolExecutor(
+                max_workers=job_worker_count(),
+                thread_name_prefix="cashmoney-job",
+            )
+        return _executor
+
+
+def fail_interrupted_jobs():
+    return Job.objects.filter(
+        status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING]
+    ).update(
+        status=Job.STATUS_FAILED,
+        error="Interrupted because the backend stopped before the job finished.",
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+
+
+def submit_job(kind, params, handler):
+    """Create a job and run ``handler(params, progress)`` for it.
+
+    The handler's return value is stored as the job result. Any exception
+    marks the job as failed with the exception message.
+    """
+    if job_worker_count() <= 0:
+        job = Job.objects.create(kind=kind, params=params)
+        run_job(job.id, handler)
+        job.refresh_from_db()
+        return job
+
+    executor = get_executor()
+    job = Job.objects.create(kind=kind, params=params)
+    transaction.on_commit(lambda: executor.submit(run_job_in_worker, job.id, handler))
+    return job
+
+
+def run_job_in_worker(job_id, handler):
+    close_old_connections()
+    try:
+        run_job(job_id, handler)
+    finally:
+        connection.close()
+
+
+def run_job(job_id, handler):
+    job = Job.objects.get(id=job_id)
+    job.status = Job.STATUS_RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=["status", "started_at", "updated_at"])
+
+    progress = JobProgress(job.id)
+    try:
+        result = handler(job.params, progress)
+    except Exception as exc:
+        job.status = Job.STATUS_FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    else:
+        job.status = Job.STATUS_COMPLETED
+        job.result = result
+    job.progress_current = progress.current
+    job.progress_total = progress.total
+    job.progress_message = progress.message
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+class JobProgress:
+    """Progress callback that writes to the job row at most once a second."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.current = 0
+        self.total = None
+        self.message = ""
+        self.saved_at = 0.0
+
+    def __call__(self, current, total=None, message=""):
+        self.current = current
+        self.total = total
+        self.message = message[:255]
+        now = time.monotonic()
+        if now - self.saved_at < PROGRESS_UPDATE_INTERVAL_SECONDS:
+            return
+        self.saved_at = now
+        Job.objects.filter(id=self.job_id).update(
+            progress_current=self.current,
+            progress_total=self.total,
+            progress_message=self.message,
+            updated_at=timezone.now(),
+        )
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+
+from finance.benchmarks import (
+    BENCHMARK_SUITES,
+    benchmark_categorization,
+    benchmark_conversion,
+    benchmark_dashboard,
+    benchmark_import,
+    benchmark_parsing,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local performance benchmark. Benchmark data is created inside a "
+        "transaction and rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("suite", choices=sorted(BENCHMARK_SUITES))
+        parser.add_argument(
+            "--keywords",
+            type=int,
+            default=2000,
+            help="Number of keyword rules created for the benchmark.",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=20000,
+            help="Number of texts or transactions to benchmark.",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        suite = options["suite"]
+        if suite == "categorization":
+            result = benchmark_categorization(
+                keyword_count=options["keywords"],
+                text_count=options["rows"],
+                seed=options["seed"],
+            )
+        elif suite == "conversion":
+            result = benchmark_conversion(
+                row_count=options["rows"],
+                seed=options["seed"],
+            )
+        elif suite == "dashboard":
+            result = benchmark_dashboard(
+                row_count=options["rows"],
+                seed=options["seed"],
+            )
+        elif suite == "import":
+            result = benchmark_import(
+                keyword_count=options["keywords"],
+                row_count=options["rows"],
+                seed=options["seed"],
+            )
+        elif suite == "parsing":
+            result = benchmark_parsing(
+                row_count=options["rows"],
+                seed=options["seed"],
+            )
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if result.get("mismatches"):
+            self.stderr.write(
+                self.style.ERROR("Benchmark results differ from the reference path.")
+            )
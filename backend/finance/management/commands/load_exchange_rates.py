@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.services import ExchangeRateProviderError, load_reference_rate_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Load historical EUR reference rates from a local ECB eurofxref-hist CSV "
+        "or zip file, then recalculate converted amounts. Use this when the "
+        "backend cannot reach the exchange-rate provider."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to eurofxref-hist.csv or .zip.")
+        parser.add_argument(
+            "--default-currency",
+            default="",
+            help="Currency to convert into. Defaults to the finance settings.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = load_reference_rate_file(
+                options["path"],
+                default_currency=options["default_currency"] or None,
+            )
+        except ExchangeRateProviderError as exc:
+            raise CommandError(str(exc)) from exc
+
+        recalculation = result["recalculation"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {result['created_rates']} new rates from "
+                f"{result['file_rows']} file rows."
+            )
+        )
+        self.stdout.write(
+            f"Recalculated {recalculation['processed']} of "
+            f"{recalculation['ledger_transactions']} transactions "
+            f"({recalculation['updated']} updated, "
+            f"{recalculation['missing_rates']} still missing a rate)."
+        )
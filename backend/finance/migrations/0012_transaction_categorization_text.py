@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0011_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="categorization_text",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
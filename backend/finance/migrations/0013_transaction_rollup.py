@@ -0,0 +1,143 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:21
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def mark_existing_months_stale(apps, schema_editor):
+    Transaction = apps.get_model("finance", "Transaction")
+    StaleRollupMonth = apps.get_model("finance", "StaleRollupMonth")
+    partitions = (
+        Transaction.objects.order_by()
+        .annotate(rollup_month=TruncMonth("transaction_date"))
+        .values_list("rollup_month", "bank_account_id")
+        .distinct()
+    )
+    StaleRollupMonth.objects.bulk_create(
+        [
+            StaleRollupMonth(month=month, bank_account_id=bank_account_id)
+            for month, bank_account_id in partitions
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0012_transaction_categorization_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StaleRollupMonth",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("month", models.DateField()),
+                (
+                    "bank_account",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="finance.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("month", "bank_account"),
+                        name="unique_stale_rollup_month",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TransactionRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("month", models.DateField()),
+                (
+                    "want_need_investment",
+                    models.CharField(blank=True, max_length=32, null=True),
+                ),
+                (
+                    "direction",
+                    models.CharField(
+                        choices=[("income", "Income"), ("expense", "Expense")],
+                        max_length=16,
+                    ),
+                ),
+                ("is_ignored", models.BooleanField(default=False)),
+                ("is_categorization_locked", models.BooleanField(default=False)),
+                ("currency", models.CharField(max_length=3)),
+                (
+                    "converted_currency",
+                    models.CharField(blank=True, default="", max_length=3),
+                ),
+                ("has_conversion", models.BooleanField(default=False)),
+                ("converted_is_negative", models.BooleanField(default=False)),
+                ("transaction_count", models.PositiveIntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=24),
+                ),
+                (
+                    "converted_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=24),
+                ),
+                (
+                    "bank_account",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="finance.bankaccount",
+                    ),
+                ),
+                (
+                    "subcategory",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="finance.subcategory",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["month"],
+                "indexes": [
+                    models.Index(
+                        fields=["bank_account", "month"],
+                        name="finance_tra_bank_ac_69e738_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(mark_existing_months_stale, migrations.RunPython.noop),
+    ]
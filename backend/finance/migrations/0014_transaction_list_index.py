@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0013_transaction_rollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["-transaction_date", "-created_at", "id"],
+                name="finance_tra_transac_88e786_idx",
+            ),
+        ),
+    ]
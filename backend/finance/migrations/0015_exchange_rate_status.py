@@ -0,0 +1,57 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:16
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0014_transaction_list_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExchangeRateStatus",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "singleton_key",
+                    models.PositiveSmallIntegerField(
+                        default=1, editable=False, unique=True
+                    ),
+                ),
+                ("is_stale", models.BooleanField(default=True)),
+                (
+                    "default_currency",
+                    models.CharField(blank=True, default="", max_length=3),
+                ),
+                ("transaction_currencies", models.JSONField(blank=True, default=list)),
+                (
+                    "required_rate_currencies",
+                    models.JSONField(blank=True, default=list),
+                ),
+                ("transaction_date_from", models.DateField(blank=True, null=True)),
+                ("transaction_date_to", models.DateField(blank=True, null=True)),
+                ("cached_rate_count", models.PositiveIntegerField(default=0)),
+                ("earliest_cached_rate_date", models.DateField(blank=True, null=True)),
+                ("latest_cached_rate_date", models.DateField(blank=True, null=True)),
+                (
+                    "missing_converted_transactions",
+                    models.PositiveIntegerField(default=0),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "exchange rate status",
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:19
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def mark_existing_months_stale(apps, schema_editor):
+    Transaction = apps.get_model("finance", "Transaction")
+    StaleRollupMonth = apps.get_model("finance", "StaleRollupMonth")
+    partitions = (
+        Transaction.objects.order_by()
+        .annotate(rollup_month=TruncMonth("transaction_date"))
+        .values_list("rollup_month", "bank_account_id")
+        .distinct()
+    )
+    StaleRollupMonth.objects.bulk_create(
+        [
+            StaleRollupMonth(month=month, bank_account_id=bank_account_id)
+            for month, bank_account_id in partitions
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0015_exchange_rate_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionCurrencyMonth",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("month", models.DateField()),
+                ("currency", models.CharField(max_length=3)),
+                ("transaction_count", models.PositiveIntegerField(default=0)),
+                ("first_transaction_date", models.DateField()),
+                ("last_transaction_date", models.DateField()),
+                (
+                    "bank_account",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="finance.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["month", "currency"],
+                "indexes": [
+                    models.Index(
+                        fields=["bank_account", "month"],
+                        name="finance_tra_bank_ac_0a29f1_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(mark_existing_months_stale, migrations.RunPython.noop),
+    ]
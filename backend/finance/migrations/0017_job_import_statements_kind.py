@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0016_transaction_currency_month"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("import_transactions", "Import transactions"),
+                    ("import_statements", "Import statement files"),
+                    ("recategorize_transactions", "Recategorize transactions"),
+                    ("sync_exchange_rates", "Sync exchange rates"),
+                ],
+                max_length=64,
+            ),
+        ),
+    ]
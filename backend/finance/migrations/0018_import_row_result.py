@@ -0,0 +1,155 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:36
+
+import django.db.models.deletion
+import finance.models
+import uuid
+from django.db import migrations, models
+
+REPORT_EXAMPLES = 20
+
+
+def compact_import_reports(apps, schema_editor):
+    CSVImport = apps.get_model("finance", "CSVImport")
+    ImportRowResult = apps.get_model("finance", "ImportRowResult")
+    Transaction = apps.get_model("finance", "Transaction")
+    for csv_import in CSVImport.objects.only("id", "report").iterator():
+        report = csv_import.report or {}
+        created = report.get("created") or {}
+        skipped = report.get("skipped") or {}
+        if not created and not skipped:
+            continue
+        transactions = created.get("transactions") or []
+        overlaps = created.get("category_overlaps") or []
+        uncategorized = created.get("uncategorized") or []
+        duplicates = skipped.get("duplicates") or []
+        errors = skipped.get("errors") or []
+        overlap_ids = {item.get("id") for item in overlaps}
+        uncategorized_ids = {item.get("id") for item in uncategorized}
+        existing_ids = {
+            str(transaction_id)
+            for transaction_id in Transaction.objects.filter(
+                id__in=[item.get("id") for item in transactions if item.get("id")]
+            ).values_list("id", flat=True)
+        }
+        results = [
+            ImportRowResult(
+                csv_import=csv_import,
+                outcome="created",
+                transaction_id=(
+                    item.get("id") if item.get("id") in existing_ids else None
+                ),
+                is_category_overlap=item.get("id") in overlap_ids,
+                is_uncategorized=item.get("id") in uncategorized_ids,
+            )
+            for item in transactions
+        ]
+        results.extend(
+            ImportRowResult(
+                csv_import=csv_import,
+                line=item.get("line"),
+                outcome="duplicate",
+                message=item.get("reason", ""),
+                row=item.get("row") or {},
+                duplicate_transaction=item.get("duplicate_transaction"),
+            )
+            for item in duplicates
+        )
+        results.extend(
+            ImportRowResult(
+                csv_import=csv_import,
+                line=item.get("line"),
+                outcome="error",
+                message=item.get("error", ""),
+                row=item.get("row") or {},
+            )
+            for item in errors
+        )
+        ImportRowResult.objects.bulk_create(results, batch_size=1000)
+        report["created"] = {
+            "count": len(transactions),
+            "transactions": transactions[:REPORT_EXAMPLES],
+            "category_overlap_count": len(overlaps),
+            "category_overlaps": overlaps[:REPORT_EXAMPLES],
+            "uncategorized_count": len(uncategorized),
+            "uncategorized": uncategorized[:REPORT_EXAMPLES],
+        }
+        report["skipped"] = {
+            "duplicate_count": len(duplicates),
+            "duplicates": duplicates[:REPORT_EXAMPLES],
+            "error_count": len(errors),
+            "errors": errors[:REPORT_EXAMPLES],
+        }
+        CSVImport.objects.filter(id=csv_import.id).update(report=report)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0017_job_import_statements_kind"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportRowResult",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("line", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "outcome",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("duplicate", "Duplicate"),
+                            ("error", "Error"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("message", models.TextField(blank=True)),
+                (
+                    "row",
+                    models.JSONField(blank=True, default=finance.models.empty_dict),
+                ),
+                ("duplicate_transaction", models.JSONField(blank=True, null=True)),
+                ("is_category_overlap", models.BooleanField(default=False)),
+                ("is_uncategorized", models.BooleanField(default=False)),
+                (
+                    "csv_import",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="row_results",
+                        to="finance.csvimport",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="finance.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["line"],
+                "indexes": [
+                    models.Index(
+                        fields=["csv_import", "outcome", "line"],
+                        name="finance_imp_csv_imp_6dcbd6_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(compact_import_reports, migrations.RunPython.noop),
+    ]
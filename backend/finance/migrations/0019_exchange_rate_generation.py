@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0018_import_row_result"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exchangeratestatus",
+            name="rate_generation",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -276,6 +276,50 @@ class CSVImport(TimestampedModel):
         return self.source_filename or str(self.id)
 
 
+class ImportRowResult(TimestampedModel):
+    """Outcome of one row of a CSV import.
+
+    ``CSVImport.report`` keeps counts and a few examples. The outcome of every
+    row is stored here and served page by page.
+    """
+
+    OUTCOME_CREATED = "created"
+    OUTCOME_DUPLICATE = "duplicate"
+    OUTCOME_ERROR = "error"
+
+    OUTCOME_CHOICES = [
+        (OUTCOME_CREATED, "Created"),
+        (OUTCOME_DUPLICATE, "Duplicate"),
+        (OUTCOME_ERROR, "Error"),
+    ]
+
+    csv_import = models.ForeignKey(
+        CSVImport, on_delete=models.CASCADE, related_name="row_results"
+    )
+    # Empty for errors that concern the whole file.
+    line = models.PositiveIntegerField(null=True, blank=True)
+    outcome = models.CharField(max_length=16, choices=OUTCOME_CHOICES)
+    message = models.TextField(blank=True)
+    row = models.JSONField(default=empty_dict, blank=True)
+    transaction = models.ForeignKey(
+        "Transaction",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    duplicate_transaction = models.JSONField(null=True, blank=True)
+    is_category_overlap = models.BooleanField(default=False)
+    is_uncategorized = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["line"]
+        indexes = [models.Index(fields=["csv_import", "outcome", "line"])]
+
+    def __str__(self):
+        return f"{self.csv_import} line {self.line}: {self.outcome}"
+
+
 class ExchangeRate(TimestampedModel):
     SOURCE_FRANKFURTER = "frankfurter"
 
@@ -312,6 +356,38 @@ class ExchangeRate(TimestampedModel):
         )
 
 
+class ExchangeRateStatus(TimestampedModel):
+    """The last computed exchange-rate status, rebuilt after it goes stale."""
+
+    singleton_key = models.PositiveSmallIntegerField(
+        default=1, unique=True, editable=False
+    )
+    is_stale = models.BooleanField(default=True)
+    default_currency = models.CharField(max_length=3, blank=True, default="")
+    transaction_currencies = models.JSONField(default=list, blank=True)
+    required_rate_currencies = models.JSONField(default=list, blank=True)
+    transaction_date_from = models.DateField(null=True, blank=True)
+    transaction_date_to = models.DateField(null=True, blank=True)
+    cached_rate_count = models.PositiveIntegerField(default=0)
+    earliest_cached_rate_date = models.DateField(null=True, blank=True)
+    latest_cached_rate_date = models.DateField(null=True, blank=True)
+    missing_converted_transactions = models.PositiveIntegerField(default=0)
+    # Bumped on every rate write, so each process can tell its rate index is
+    # out of date.
+    rate_generation = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        verbose_name_plural = "exchange rate status"
+
+    def __str__(self):
+        return f"Exchange rate status ({self.default_currency or '-'})"
+
+    @classmethod
+    def load(cls):
+        status, _created = cls.objects.get_or_create(singleton_key=1)
+        return status
+
+
 class Transaction(TimestampedModel):
     CONVERSION_STATUS_NATIVE = "native"
     CONVERSION_STATUS_CONVERTED = "converted"
@@ -383,6 +459,9 @@ class Transaction(TimestampedModel):
     is_ignored = models.BooleanField(default=False)
     is_categorization_locked = models.BooleanField(default=False)
     raw_data = models.JSONField(default=empty_dict, blank=True)
+    # Normalized text keywords were last matched against, used to narrow
+    # recategorization after keyword edits. Null until it has been computed.
+    categorization_text = models.TextField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["-transaction_date", "-created_at"]
@@ -396,6 +475,7 @@ class Transaction(TimestampedModel):
             models.Index(fields=["subcategory"]),
             models.Index(fields=["want_need_investment"]),
             models.Index(fields=["is_categorization_locked"]),
+            models.Index(fields=["-transaction_date", "-created_at", "id"]),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -432,6 +512,99 @@ class TransactionTag(TimestampedModel):
         return f"{self.transaction} - {self.tag}"
 
 
+class TransactionRollup(TimestampedModel):
+    """Transaction totals for one month and one combination of dashboard filters.
+
+    The bank account and subcategory links use ``SET_NULL`` like the
+    transactions they summarize, so deleting either keeps both tables in step.
+    """
+
+    month = models.DateField()
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    subcategory = models.ForeignKey(
+        Subcategory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    want_need_investment = models.CharField(max_length=32, null=True, blank=True)
+    direction = models.CharField(max_length=16, choices=Direction.CHOICES)
+    is_ignored = models.BooleanField(default=False)
+    is_categorization_locked = models.BooleanField(default=False)
+    currency = models.CharField(max_length=3)
+    converted_currency = models.CharField(max_length=3, blank=True, default="")
+    has_conversion = models.BooleanField(default=False)
+    converted_is_negative = models.BooleanField(default=False)
+    transaction_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=24, decimal_places=2, default=0)
+    converted_amount = models.DecimalField(max_digits=24, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["month"]
+        indexes = [models.Index(fields=["bank_account", "month"])]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.amount} {self.currency}"
+
+
+class StaleRollupMonth(TimestampedModel):
+    """A (month, bank account) slice of ``TransactionRollup`` to rebuild."""
+
+    month = models.DateField()
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "bank_account"], name="unique_stale_rollup_month"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.bank_account_id or '-'}"
+
+
+class TransactionCurrencyMonth(TimestampedModel):
+    """Transaction count and date bounds for one currency in a rollup partition.
+
+    It is rebuilt together with ``TransactionRollup`` whenever the
+    (month, bank account) partition is marked stale.
+    """
+
+    month = models.DateField()
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    currency = models.CharField(max_length=3)
+    transaction_count = models.PositiveIntegerField(default=0)
+    first_transaction_date = models.DateField()
+    last_transaction_date = models.DateField()
+
+    class Meta:
+        ordering = ["month", "currency"]
+        indexes = [models.Index(fields=["bank_account", "month"])]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.currency} ({self.transaction_count})"
+
+
 class InternalTransferMatch(TimestampedModel):
     outgoing_transaction = models.OneToOneField(
         Transaction,
@@ -508,3 +681,49 @@ class Keyword(TimestampedModel):
 
     def __str__(self):
         return self.name
+
+
+class Job(TimestampedModel):
+    KIND_IMPORT_TRANSACTIONS = "import_transactions"
+    KIND_IMPORT_STATEMENTS = "import_statements"
+    KIND_RECATEGORIZE_TRANSACTIONS = "recategorize_transactions"
+    KIND_SYNC_EXCHANGE_RATES = "sync_exchange_rates"
+
+    KIND_CHOICES = [
+        (KIND_IMPORT_TRANSACTIONS, "Import transactions"),
+        (KIND_IMPORT_STATEMENTS, "Import statement files"),
+        (KIND_RECATEGORIZE_TRANSACTIONS, "Recategorize transactions"),
+        (KIND_SYNC_EXCHANGE_RATES, "Sync exchange rates"),
+    ]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=64, choices=KIND_CHOICES)
+    status = models.CharField(
+        max_length=32, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    params = models.JSONField(default=empty_dict, blank=True)
+    progress_current = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(default=empty_dict, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status"])]
+
+    def __str__(self):
+        return f"{self.kind} ({self.status})"
@@ -14,7 +14,7 @@ from .models import (
     Tag,
     Transaction,
 )
-from .services import CSVImportService
+from .services import CSVImportService, delete_transactions
 
 
 SAMPLE_PREFIX = "Sample - "
@@ -48,7 +48,7 @@ def delete_sample_data():
         "categories": Category.objects.filter(name__startswith=SAMPLE_PREFIX).count(),
     }
 
-    Transaction.objects.filter(import_batch__in=sample_imports).delete()
+    delete_transactions(Transaction.objects.filter(import_batch__in=sample_imports))
     sample_imports.delete()
     Keyword.objects.filter(name__startswith=SAMPLE_PREFIX).delete()
     BankAccount.objects.filter(name__startswith=SAMPLE_PREFIX).delete()
@@ -241,6 +241,44 @@ def serialize_csv_import(csv_import):
     }
 
 
+def serialize_import_row_result(row_result):
+    return {
+        "id": str(row_result.id),
+        "line": row_result.line,
+        "outcome": row_result.outcome,
+        "message": row_result.message,
+        "row": row_result.row,
+        "transaction": (
+            serialize_transaction(row_result.transaction, include_raw_data=False)
+            if row_result.transaction
+            else None
+        ),
+        "duplicate_transaction": row_result.duplicate_transaction,
+        "is_category_overlap": row_result.is_category_overlap,
+        "is_uncategorized": row_result.is_uncategorized,
+    }
+
+
+def serialize_job(job):
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "progress": {
+            "current": job.progress_current,
+            "total": job.progress_total,
+            "message": job.progress_message,
+        },
+        "result": job.result,
+        "error": job.error,
+        "started_at": iso(job.started_at),
+        "finished_at": iso(job.finished_at),
+        "created_at": iso(job.created_at),
+        "updated_at": iso(job.updated_at),
+    }
+
+
 def serialize_finance_settings(settings):
     return {
         "id": str(settings.id),
@@ -1,22 +1,46 @@
+import codecs
 import csv
+import gzip
+import hashlib
 import io
 import json
+import multiprocessing
+import os
 import re
+import threading
+import time
+import uuid
+import zipfile
+import zlib
 from bisect import bisect_right
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import (
+    FIRST_EXCEPTION,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from decimal import Decimal, InvalidOperation
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
-
-from django.db import IntegrityError, transaction
+from datetime import date, datetime, timedelta
+from decimal import Context, Decimal, InvalidOperation
+from functools import lru_cache, partial
+from itertools import chain, islice
+from pathlib import Path
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlencode, urlsplit
+
+import django
+from django.conf import settings as django_settings
+from django.db import IntegrityError, connections, router, transaction
 from django.db.models import (
+    BooleanField,
     Case,
+    Count,
     DecimalField,
     ExpressionWrapper,
     F,
+    FloatField,
     Max,
     Min,
     Q,
@@ -24,18 +48,26 @@ from django.db.models import (
     Value,
     When,
 )
-from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.constants import OnConflict
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, TruncMonth
 from django.utils import timezone
 
-from .constants import DEFAULT_CATEGORIZATION_FIELDS
+from .constants import DEFAULT_CATEGORIZATION_FIELDS, Direction
 from .models import (
     BankAccount,
     CSVImport,
     ExchangeRate,
+    ExchangeRateStatus,
     FinanceSettings,
+    ImportRowResult,
     InternalTransferMatch,
     Keyword,
+    StaleRollupMonth,
     Transaction,
+    TransactionCurrencyMonth,
+    TransactionRollup,
+    TransactionTag,
 )
 from .serializers import (
     model_ref,
@@ -48,10 +80,18 @@ from .serializers import (
 ENCODING_CANDIDATES = ["utf-8-sig", "utf-8", "cp1250", "windows-1250", "latin-1"]
 DELIMITER_CANDIDATES = [",", ";", "\t", "|"]
 DATE_FORMAT_CANDIDATES = ["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%m/%d/%Y"]
+CSV_READ_CHUNK_SIZE = 64 * 1024
+CSV_DETECTION_PREFIX_BYTES = 256 * 1024
+CSV_DETECTION_SAMPLE_ROWS = 50
+RECATEGORIZE_CHUNK_SIZE = 1000
 CANONICAL_RATE_BASE_CURRENCY = "EUR"
 FRANKFURTER_SOURCE = ExchangeRate.SOURCE_FRANKFURTER
 MONEY_QUANT = Decimal("0.01")
 RATE_QUANT = Decimal("0.0000000001")
+# Longest stretch without published rates: Easter, from Thursday to Tuesday.
+RATE_GAP_MAX_DAYS = 5
+RATE_FETCH_CHUNK_DAYS = 370
+REFERENCE_RATE_BATCH_SIZE = 20000
 COMMON_CURRENCY_OPTIONS = [
     {"code": "CZK", "name": "Czech Koruna"},
     {"code": "EUR", "name": "Euro"},
@@ -137,9 +177,99 @@ class ExchangeRateProviderError(Exception):
     pass
 
 
+def http_cache_directory():
+    return Path(getattr(django_settings, "DATA_DIR", Path.cwd())) / "http_cache"
+
+
+class HTTPResponseCache:
+    """Provider JSON responses stored on disk, one file per URL.
+
+    Each entry keeps the ``ETag`` and ``Last-Modified`` validators the server
+    sent, so an expired entry can be revalidated instead of downloaded again.
+    Entries are replaced atomically and a broken file counts as a miss.
+    """
+
+    _refreshing = set()
+    _refreshing_lock = threading.Lock()
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or http_cache_directory())
+
+    def get(self, url):
+        try:
+            with self._path(url).open(encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        return entry
+
+    def put(self, url, payload, etag=None, last_modified=None):
+        self._write(
+            {
+                "url": url,
+                "stored_at": time.time(),
+                "etag": etag,
+                "last_modified": last_modified,
+                "payload": payload,
+            }
+        )
+
+    def touch(self, entry):
+        self._write({**entry, "stored_at": time.time()})
+
+    def start_refresh(self, url):
+        """Claim a background refresh of ``url`` unless one is running."""
+        key = (str(self.directory), url)
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def finish_refresh(self, url):
+        with self._refreshing_lock:
+            self._refreshing.discard((str(self.directory), url))
+
+    def _path(self, url):
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def _write(self, entry):
+        path = self._path(entry["url"])
+        temporary_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(temporary_path, path)
+        except OSError:
+            # The cache only saves requests, so a failed write is not an error.
+            temporary_path.unlink(missing_ok=True)
+
+
 class FrankfurterExchangeRateProvider:
+    """Fetch rates from the Frankfurter API.
+
+    Connections are kept open and reused between requests, and one provider
+    can be shared by several threads. Call ``close()`` when done with it.
+
+    With a ``cache``, responses younger than their max age are served from
+    disk and older ones are revalidated. The currency list is served stale
+    right away while it is refreshed in the background.
+    """
+
     api_base_url = "https://api.frankfurter.dev/v2"
     user_agent = "Cashmoney"
+    timeout = 30
+    currencies_max_age = 24 * 60 * 60
+    rates_max_age = 60 * 60
+
+    def __init__(self, api_base_url=None, cache=None):
+        if api_base_url:
+            self.api_base_url = api_base_url.rstrip("/")
+        self.cache = cache
+        self._idle_connections = defaultdict(list)
+        self._connections_lock = threading.Lock()
 
     def fetch_rates(self, base_currency, quote_currencies, start_date, end_date):
         quotes = sorted(
@@ -159,48 +289,142 @@ class FrankfurterExchangeRateProvider:
             "quotes": ",".join(quotes),
         }
         url = f"{self.api_base_url}/rates?{urlencode(params)}"
-        payload = self._fetch_json(url)
+        payload = self._fetch_json(url, max_age=self.rates_max_age)
         return self._parse_rates_payload(payload, params["base"])
 
     def fetch_currencies(self):
-        payload = self._fetch_json(f"{self.api_base_url}/currencies")
+        payload = self._fetch_json(
+            f"{self.api_base_url}/currencies",
+            max_age=self.currencies_max_age,
+            serve_stale=True,
+        )
         return self._parse_currencies_payload(payload)
 
-    def _fetch_json(self, url):
-        request = Request(
-            url,
-            headers={
-                "Accept": "application/json",
-                "User-Agent": self.user_agent,
-            },
-        )
+    def close(self):
+        with self._connections_lock:
+            connections = list(chain.from_iterable(self._idle_connections.values()))
+            self._idle_connections.clear()
+        for connection in connections:
+            connection.close()
+
+    def _fetch_json(self, url, max_age=0, serve_stale=False):
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None:
+            if 0 <= time.time() - entry["stored_at"] < max_age:
+                return entry["payload"]
+            if serve_stale:
+                self._refresh_in_background(url)
+                return entry["payload"]
+        return self._request_json(url, entry)
+
+    def _refresh_in_background(self, url):
+        if not self.cache.start_refresh(url):
+            return
+
+        def refresh():
+            # This provider may be closed before the refresh ends.
+            provider = type(self)(self.api_base_url, cache=self.cache)
+            try:
+                provider._request_json(url, self.cache.get(url))
+            except ExchangeRateProviderError:
+                pass
+            finally:
+                provider.close()
+                self.cache.finish_refresh(url)
+
+        threading.Thread(
+            target=refresh, name="cashmoney-http-cache", daemon=True
+        ).start()
+
+    def _request_json(self, url, entry=None):
+        headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "User-Agent": self.user_agent,
+        }
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
         try:
-            with urlopen(request, timeout=30) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-        except HTTPError as exc:
-            message = self._error_message(exc)
-            raise ExchangeRateProviderError(
-                f"Could not fetch Frankfurter data: {message}"
-            ) from exc
-        except (URLError, TimeoutError, OSError, json.JSONDecodeError) as exc:
+            status, reason, body, response_headers = self._get(url, headers)
+            if status == 304 and entry is not None:
+                self.cache.touch(entry)
+                return entry["payload"]
+            if status >= 400:
+                message = self._error_message(status, reason, body)
+                raise ExchangeRateProviderError(
+                    f"Could not fetch Frankfurter data: {message}"
+                )
+            payload = json.loads(body.decode("utf-8"))
+        except (
+            HTTPException,
+            OSError,
+            EOFError,
+            zlib.error,
+            UnicodeDecodeError,
+            json.JSONDecodeError,
+        ) as exc:
             raise ExchangeRateProviderError(
                 f"Could not fetch Frankfurter data: {exc}"
             ) from exc
+        if self.cache is not None:
+            self.cache.put(
+                url,
+                payload,
+                etag=response_headers.get("ETag"),
+                last_modified=response_headers.get("Last-Modified"),
+            )
         return payload
 
-    def _error_message(self, exc):
+    def _get(self, url, headers):
+        parts = urlsplit(url)
+        origin = (parts.scheme, parts.netloc)
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        while True:
+            connection, reused = self._take_connection(origin)
+            try:
+                connection.request("GET", path or "/", headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (HTTPException, OSError):
+                connection.close()
+                # The server may have dropped an idle connection since its
+                # last use. Only a fresh connection failing is a real error.
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._connections_lock:
+                    self._idle_connections[origin].append(connection)
+            if (response.getheader("Content-Encoding") or "").lower() == "gzip":
+                body = gzip.decompress(body)
+            return response.status, response.reason, body, response.headers
+
+    def _take_connection(self, origin):
+        with self._connections_lock:
+            idle = self._idle_connections[origin]
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = origin
+        connection_class = HTTPSConnection if scheme == "https" else HTTPConnection
+        return connection_class(netloc, timeout=self.timeout), False
+
+    def _error_message(self, status, reason, body):
         try:
-            raw = exc.read().decode("utf-8")
-        except Exception:
+            raw = body.decode("utf-8")
+        except UnicodeDecodeError:
             raw = ""
         if raw:
             try:
                 payload = json.loads(raw)
                 if isinstance(payload, dict) and payload.get("message"):
-                    return f"{exc.code} {payload['message']}"
+                    return f"{status} {payload['message']}"
             except json.JSONDecodeError:
                 pass
-        return f"{exc.code} {exc.reason}"
+        return f"{status} {reason}"
 
     def _parse_rates_payload(self, payload, fallback_base):
         if isinstance(payload, list):
@@ -278,6 +502,100 @@ class FrankfurterExchangeRateProvider:
             ) from exc
 
 
+class ReferenceRateFileProvider:
+    """Read EUR reference rates from a local ECB ``eurofxref-hist`` file.
+
+    The file can be the CSV itself or the zipped download. Frankfurter serves
+    the same ECB reference rates, so rows are cached under its source and fill
+    the same gaps a network sync would.
+    """
+
+    missing_values = {"", "N/A"}
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def fetch_rates(self, base_currency, quote_currencies, start_date, end_date):
+        if normalize_currency_code(base_currency) != CANONICAL_RATE_BASE_CURRENCY:
+            raise ExchangeRateProviderError(
+                f"Reference rate files are quoted in {CANONICAL_RATE_BASE_CURRENCY}."
+            )
+        quotes = {normalize_currency_code(currency) for currency in quote_currencies}
+        return [
+            row
+            for row in self.iter_rates()
+            if row["quote_currency"] in quotes and start_date <= row["date"] <= end_date
+        ]
+
+    def iter_rates(self):
+        with self._open_text() as text:
+            reader = csv.reader(text)
+            header = next(reader, None)
+            if not header or header[0].strip().casefold() != "date":
+                raise ExchangeRateProviderError(
+                    "Reference rate file must start with a Date column."
+                )
+            columns = []
+            for index, name in enumerate(header[1:], start=1):
+                try:
+                    columns.append((index, normalize_currency_code(name, default="")))
+                except ValueError:
+                    continue
+
+            for line_number, line in enumerate(reader, start=2):
+                if not line or not line[0].strip():
+                    continue
+                try:
+                    rows = self._parse_line(line, columns)
+                except (ValueError, InvalidOperation) as exc:
+                    raise ExchangeRateProviderError(
+                        f"Reference rate file has an invalid row on line {line_number}."
+                    ) from exc
+                yield from rows
+
+    def _parse_line(self, line, columns):
+        rate_date = datetime.strptime(line[0].strip(), "%Y-%m-%d").date()
+        rows = []
+        for index, quote_currency in columns:
+            value = line[index].strip() if index < len(line) else ""
+            if value in self.missing_values:
+                continue
+            rows.append(
+                {
+                    "date": rate_date,
+                    "base_currency": CANONICAL_RATE_BASE_CURRENCY,
+                    "quote_currency": quote_currency,
+                    "rate": Decimal(value),
+                    "source": FRANKFURTER_SOURCE,
+                }
+            )
+        return rows
+
+    @contextmanager
+    def _open_text(self):
+        try:
+            if zipfile.is_zipfile(self.path):
+                with zipfile.ZipFile(self.path) as archive:
+                    names = [
+                        name
+                        for name in archive.namelist()
+                        if name.casefold().endswith(".csv")
+                    ]
+                    if not names:
+                        raise ExchangeRateProviderError(
+                            "Reference rate archive does not contain a CSV file."
+                        )
+                    with archive.open(names[0]) as raw:
+                        yield io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            else:
+                with self.path.open(encoding="utf-8-sig", newline="") as text:
+                    yield text
+        except (OSError, zipfile.BadZipFile, UnicodeDecodeError) as exc:
+            raise ExchangeRateProviderError(
+                f"Could not read reference rate file: {exc}"
+            ) from exc
+
+
 def merge_currency_options(*option_lists):
     options_by_code = {}
     for option_list in option_lists:
@@ -318,8 +636,13 @@ def configured_currency_options():
 
 
 def available_currency_options(provider=None):
-    provider = provider or FrankfurterExchangeRateProvider()
-    currencies = provider.fetch_currencies()
+    owns_provider = provider is None
+    provider = provider or FrankfurterExchangeRateProvider(cache=HTTPResponseCache())
+    try:
+        currencies = provider.fetch_currencies()
+    finally:
+        if owns_provider:
+            provider.close()
     return {
         "source": FRANKFURTER_SOURCE,
         "fallback": False,
@@ -339,23 +662,67 @@ def fallback_currency_options(error=None):
     }
 
 
+def currency_catalogue():
+    """Return transaction counts and date bounds per currency for the ledger.
+
+    This reads the ``TransactionCurrencyMonth`` rows, after rebuilding the
+    partitions transaction writes have marked stale, instead of the ledger.
+    """
+    refresh_stale_rollups()
+    catalogue = {}
+    rows = (
+        TransactionCurrencyMonth.objects.exclude(currency="")
+        .order_by()
+        .values("currency")
+        .annotate(
+            transaction_count=Sum("transaction_count"),
+            start_date=Min("first_transaction_date"),
+            end_date=Max("last_transaction_date"),
+        )
+    )
+    for row in rows:
+        entry = catalogue.setdefault(
+            normalize_currency_code(row["currency"]),
+            {"transaction_count": 0, "start_date": None, "end_date": None},
+        )
+        entry["transaction_count"] += row["transaction_count"]
+        entry["start_date"] = min(
+            filter(None, [entry["start_date"], row["start_date"]])
+        )
+        entry["end_date"] = max(filter(None, [entry["end_date"], row["end_date"]]))
+    return catalogue
+
+
 def transaction_date_range(queryset=None):
     if queryset is None:
-        queryset = Transaction.objects.all()
+        catalogue = currency_catalogue().values()
+        return {
+            "start_date": min(
+                (entry["start_date"] for entry in catalogue), default=None
+            ),
+            "end_date": max((entry["end_date"] for entry in catalogue), default=None),
+        }
     return queryset.aggregate(
         start_date=Min("transaction_date"),
         end_date=Max("transaction_date"),
     )
 
 
-def transaction_currencies(queryset=None, default_currency=None):
+def stored_transaction_currencies(queryset=None):
     if queryset is None:
-        queryset = Transaction.objects.all()
-    currencies = {
+        return set(currency_catalogue())
+    return {
         normalize_currency_code(currency)
-        for currency in queryset.exclude(currency="").values_list("currency", flat=True)
+        for currency in queryset.exclude(currency="")
+        .order_by()
+        .values_list("currency", flat=True)
+        .distinct()
         if currency
     }
+
+
+def transaction_currencies(queryset=None, default_currency=None):
+    currencies = stored_transaction_currencies(queryset)
     currencies.add(
         normalize_currency_code(
             default_currency or FinanceSettings.load().default_currency
@@ -368,15 +735,7 @@ def required_rate_quote_currencies(queryset=None, default_currency=None):
     default_currency = normalize_currency_code(
         default_currency or FinanceSettings.load().default_currency
     )
-    if queryset is None:
-        queryset = Transaction.objects.all()
-    foreign_currencies = {
-        normalize_currency_code(currency)
-        for currency in queryset.exclude(currency="")
-        .exclude(currency=default_currency)
-        .values_list("currency", flat=True)
-        if currency
-    }
+    foreign_currencies = stored_transaction_currencies(queryset) - {default_currency}
     if not foreign_currencies:
         return []
 
@@ -387,7 +746,7 @@ def required_rate_quote_currencies(queryset=None, default_currency=None):
     )
 
 
-def chunk_date_range(start_date, end_date, max_days=370):
+def chunk_date_range(start_date, end_date, max_days=RATE_FETCH_CHUNK_DAYS):
     cursor = start_date
     while cursor <= end_date:
         chunk_end = min(cursor + timedelta(days=max_days - 1), end_date)
@@ -395,49 +754,285 @@ def chunk_date_range(start_date, end_date, max_days=370):
         cursor = chunk_end + timedelta(days=1)
 
 
+def exchange_rate_fetch_worker_count():
+    return max(1, int(getattr(django_settings, "EXCHANGE_RATE_FETCH_WORKERS", 1)))
+
+
+def fetch_exchange_rate_chunks(provider, fetch_requests, workers=None, progress=None):
+    """Run ``(quotes, start, end)`` rate requests on a bounded thread pool.
+
+    Rows are returned in request order. The first provider error cancels the
+    requests that have not started yet and is raised to the caller.
+    """
+    workers = min(workers or exchange_rate_fetch_worker_count(), len(fetch_requests))
+
+    def fetch(fetch_request):
+        range_quotes, chunk_start, chunk_end = fetch_request
+        return provider.fetch_rates(
+            CANONICAL_RATE_BASE_CURRENCY, range_quotes, chunk_start, chunk_end
+        )
+
+    if workers <= 1:
+        rows = []
+        for index, fetch_request in enumerate(fetch_requests):
+            if progress:
+                progress(index, len(fetch_requests), "Fetching exchange rates")
+            rows.extend(fetch(fetch_request))
+        return rows
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="cashmoney-rates"
+    ) as executor:
+        futures = [executor.submit(fetch, request) for request in fetch_requests]
+        pending = set(futures)
+        while pending:
+            if progress:
+                progress(
+                    len(futures) - len(pending),
+                    len(futures),
+                    "Fetching exchange rates",
+                )
+            done, pending = wait(pending, return_when=FIRST_EXCEPTION)
+            for future in done:
+                if future.exception() is not None:
+                    for pending_future in pending:
+                        pending_future.cancel()
+                    raise future.exception()
+    return list(chain.from_iterable(future.result() for future in futures))
+
+
 def cache_exchange_rate_rows(rows):
-    rates = [
-        ExchangeRate(
-            date=row["date"],
-            base_currency=normalize_currency_code(row["base_currency"]),
-            quote_currency=normalize_currency_code(row["quote_currency"]),
-            rate=Decimal(str(row["rate"])).quantize(RATE_QUANT),
-            source=str(row.get("source") or FRANKFURTER_SOURCE).lower(),
-        )
-        for row in rows
-        if row.get("base_currency") != row.get("quote_currency")
-    ]
-    if not rates:
-        return 0
+    return len(insert_new_exchange_rates(rows))
 
-    before = ExchangeRate.objects.count()
-    ExchangeRate.objects.bulk_create(rates, ignore_conflicts=True)
-    return ExchangeRate.objects.count() - before
 
+@dataclass(frozen=True)
+class NewExchangeRate:
+    source: str
+    base_currency: str
+    quote_currency: str
+    date: object
+    rate: Decimal
 
-def build_rate_lookup(currencies, end_date):
-    quote_currencies = [
-        currency for currency in currencies if currency != CANONICAL_RATE_BASE_CURRENCY
-    ]
-    lookup = {}
-    if not quote_currencies or not end_date:
-        return lookup
 
-    rates = (
+def insert_new_exchange_rates(rows):
+    """Cache rate rows that are not stored yet and return the inserted rates."""
+    date_field = ExchangeRate._meta.get_field("date")
+    currency_codes = {}
+
+    def currency_code(value):
+        if value not in currency_codes:
+            currency_codes[value] = normalize_currency_code(value)
+        return currency_codes[value]
+
+    rates = {}
+    for row in rows:
+        if row.get("base_currency") == row.get("quote_currency"):
+            continue
+        key = (
+            str(row.get("source") or FRANKFURTER_SOURCE).lower(),
+            currency_code(row["base_currency"]),
+            currency_code(row["quote_currency"]),
+            date_field.to_python(row["date"]),
+        )
+        if key not in rates:
+            rates[key] = NewExchangeRate(
+                *key, Decimal(str(row["rate"])).quantize(RATE_QUANT)
+            )
+    if not rates:
+        return []
+
+    existing = set(
         ExchangeRate.objects.filter(
-            source=FRANKFURTER_SOURCE,
-            base_currency=CANONICAL_RATE_BASE_CURRENCY,
-            quote_currency__in=quote_currencies,
-            date__lte=end_date,
+            source__in={key[0] for key in rates},
+            base_currency__in={key[1] for key in rates},
+            quote_currency__in={key[2] for key in rates},
+            date__range=(min(key[3] for key in rates), max(key[3] for key in rates)),
+        ).values_list("source", "base_currency", "quote_currency", "date")
+    )
+    new_rates = [rate for key, rate in rates.items() if key not in existing]
+    if new_rates:
+        bulk_insert_exchange_rates(new_rates)
+        generation = mark_exchange_rates_changed()
+        # A rollback must not leave the rows in the index.
+        transaction.on_commit(
+            partial(_exchange_rate_index.add, new_rates, generation),
+            using=router.db_for_write(ExchangeRate),
         )
-        .order_by("quote_currency", "date")
-        .values_list("quote_currency", "date", "rate")
+    return new_rates
+
+
+def bulk_insert_exchange_rates(rates):
+    """Insert ``NewExchangeRate`` rows with one ``executemany``.
+
+    Rows that already exist are skipped, as with
+    ``bulk_create(ignore_conflicts=True)``. This avoids building a model
+    instance and compiling every value of every row, which dominated large
+    reference-file loads.
+    """
+    if not rates:
+        return
+    opts = ExchangeRate._meta
+    connection = connections[router.db_for_write(ExchangeRate)]
+    field_names = [
+        "id",
+        "date",
+        "base_currency",
+        "quote_currency",
+        "rate",
+        "source",
+        "fetched_at",
+        "created_at",
+        "updated_at",
+    ]
+    fields = [opts.get_field(name) for name in field_names]
+    id_field, date_field, rate_field = fields[0], fields[1], fields[4]
+    now = fields[-1].get_db_prep_save(timezone.now(), connection)
+    params = [
+        (
+            id_field.get_db_prep_save(uuid.uuid4(), connection),
+            date_field.get_db_prep_save(rate.date, connection),
+            rate.base_currency,
+            rate.quote_currency,
+            rate_field.get_db_prep_save(rate.rate, connection),
+            rate.source,
+            now,
+            now,
+            now,
+        )
+        for rate in rates
+    ]
+    ops = connection.ops
+    columns = ", ".join(ops.quote_name(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = (
+        f"{ops.insert_statement(on_conflict=OnConflict.IGNORE)} "
+        f"{ops.quote_name(opts.db_table)} ({columns}) VALUES ({placeholders})"
+        f"{ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None)}"
     )
-    for quote_currency, rate_date, rate in rates:
-        bucket = lookup.setdefault(quote_currency, {"dates": [], "rates": []})
-        bucket["dates"].append(rate_date)
-        bucket["rates"].append(rate)
-    return lookup
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+class ExchangeRateIndex:
+    """Sorted Frankfurter rates per quote currency, shared by the process.
+
+    A currency is loaded from the database the first time a lookup needs it.
+    The index also remembers past gaps the provider had no rates for, so syncs
+    stop asking for them. Every rate write bumps the rate generation stored on
+    ``ExchangeRateStatus``. ``cache_exchange_rate_rows`` adds its rows in place
+    once they are committed, and any other change of generation, including
+    writes from another process, empties the index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._empty_gaps = set()
+        self._generation = None
+
+    def refresh(self):
+        """Empty the index if the rates changed since it was loaded."""
+        generation = exchange_rate_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._buckets.clear()
+                self._empty_gaps.clear()
+                self._generation = generation
+
+    def lookup(self, currencies):
+        quote_currencies = {
+            currency
+            for currency in currencies
+            if currency != CANONICAL_RATE_BASE_CURRENCY
+        }
+        self.refresh()
+        with self._lock:
+            missing = quote_currencies - self._buckets.keys()
+            if missing:
+                self._buckets.update(self._load(missing))
+            return {
+                currency: self._buckets[currency]
+                for currency in quote_currencies
+                if self._buckets[currency]["dates"]
+            }
+
+    def add(self, rates, generation):
+        """Add committed ``rates`` that moved the rate generation to ``generation``.
+
+        If another write came in between, the index is emptied instead.
+        """
+        new_rates = defaultdict(list)
+        for rate in rates:
+            if (
+                rate.source == FRANKFURTER_SOURCE
+                and rate.base_currency == CANONICAL_RATE_BASE_CURRENCY
+            ):
+                rate_date = ExchangeRate._meta.get_field("date").to_python(rate.date)
+                new_rates[rate.quote_currency].append((rate_date, rate.rate))
+
+        with self._lock:
+            if self._generation is None or generation != self._generation + 1:
+                self._buckets.clear()
+                self._empty_gaps.clear()
+                self._generation = None
+                return
+            self._generation = generation
+            for currency, rows in new_rates.items():
+                bucket = self._buckets.get(currency)
+                if bucket is None:
+                    continue
+                # Lookups may still hold the old lists, so build new ones. The
+                # database keeps the existing rate when an insert conflicts.
+                merged = dict(zip(bucket["dates"], bucket["rates"]))
+                for rate_date, rate in rows:
+                    merged.setdefault(rate_date, rate)
+                dates = sorted(merged)
+                self._buckets[currency] = {
+                    "dates": dates,
+                    "rates": [merged[rate_date] for rate_date in dates],
+                }
+
+    def mark_empty_gaps(self, gaps):
+        with self._lock:
+            self._empty_gaps.update(gaps)
+
+    def is_empty_gap(self, gap):
+        return gap in self._empty_gaps
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._empty_gaps.clear()
+            self._generation = None
+
+    def _load(self, currencies):
+        buckets = {currency: {"dates": [], "rates": []} for currency in currencies}
+        rates = (
+            ExchangeRate.objects.filter(
+                source=FRANKFURTER_SOURCE,
+                base_currency=CANONICAL_RATE_BASE_CURRENCY,
+                quote_currency__in=currencies,
+            )
+            .order_by("quote_currency", "date")
+            .values_list("quote_currency", "date", "rate")
+        )
+        for quote_currency, rate_date, rate in rates:
+            buckets[quote_currency]["dates"].append(rate_date)
+            buckets[quote_currency]["rates"].append(rate)
+        return buckets
+
+
+_exchange_rate_index = ExchangeRateIndex()
+
+
+def clear_exchange_rate_index():
+    _exchange_rate_index.clear()
+
+
+def build_rate_lookup(currencies, end_date):
+    if not end_date:
+        return {}
+    return _exchange_rate_index.lookup(currencies)
 
 
 def rate_on_or_before(lookup, currency, target_date):
@@ -494,80 +1089,604 @@ def calculate_converted_amount(
     }
 
 
+# Conversion rates carry ten decimal places, so a rate is an integer count of
+# 1e-10 units and a converted amount is cents times that count.
+RATE_UNITS = 10**10
+# Decimal multiplies exactly up to 28 digits. Larger products keep the Decimal
+# path so they round the same way.
+EXACT_PRODUCT_LIMIT = 10**28
+CONVERSION_BATCH_SIZE = 2000
+
+
+CONVERSION_FIELDS = [
+    "converted_amount",
+    "converted_currency",
+    "conversion_rate",
+    "conversion_rate_date",
+    "conversion_status",
+]
+
+
+def amount_to_cents(amount):
+    return int(amount.quantize(MONEY_QUANT).scaleb(2))
+
+
+def cents_to_amount(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def search_sorted(dates, days):
+    """Return the index of the last of ``dates`` on or before each of ``days``.
+
+    Both lists are sorted, so one merge walk resolves every day. The index is
+    ``-1`` for days before the first date.
+    """
+    indices = []
+    index = -1
+    last_index = len(dates) - 1
+    for day in days:
+        while index < last_index and dates[index + 1] <= day:
+            index += 1
+        indices.append(index)
+    return indices
+
+
+def _canonical_rates_by_day(lookup, currency, days):
+    """Map each day to its ``(rate, rate_date)`` for one currency."""
+    if currency == CANONICAL_RATE_BASE_CURRENCY:
+        return {day: (Decimal("1"), day) for day in days}
+    bucket = lookup.get(currency)
+    if not bucket:
+        return dict.fromkeys(days, (None, None))
+    days = sorted(days)
+    return {
+        day: (
+            (bucket["rates"][index], bucket["dates"][index])
+            if index >= 0
+            else (None, None)
+        )
+        for day, index in zip(days, search_sorted(bucket["dates"], days))
+    }
+
+
+def convert_amounts_in_cents(dates, currencies, amounts, target_currency, lookup):
+    """Convert parallel lists of dates, currencies and amounts in cents.
+
+    Rates are resolved once per distinct currency and day, and each amount is
+    rounded half to even in integer arithmetic. The results match
+    ``calculate_converted_amount`` row for row, with the amount in cents.
+    """
+    target_currency = normalize_currency_code(target_currency)
+    codes = {code: normalize_currency_code(code) for code in set(currencies)}
+    days_by_currency = defaultdict(set)
+    for currency, day in zip(currencies, dates):
+        days_by_currency[codes[currency]].add(day)
+    all_days = set().union(*days_by_currency.values())
+    target_rates = _canonical_rates_by_day(lookup, target_currency, all_days)
+
+    conversions = {}
+    for currency, days in days_by_currency.items():
+        if currency == target_currency:
+            for day in days:
+                conversions[currency, day] = (
+                    RATE_UNITS,
+                    Decimal("1").quantize(RATE_QUANT),
+                    day,
+                    Transaction.CONVERSION_STATUS_NATIVE,
+                )
+            continue
+        source_rates = _canonical_rates_by_day(lookup, currency, days)
+        for day in days:
+            source_rate, source_rate_date = source_rates[day]
+            target_rate, target_rate_date = target_rates[day]
+            if source_rate is None or target_rate is None:
+                conversions[currency, day] = (
+                    None,
+                    None,
+                    None,
+                    Transaction.CONVERSION_STATUS_MISSING_RATE,
+                )
+                continue
+            conversion_rate = (target_rate / source_rate).quantize(RATE_QUANT)
+            rate_dates = []
+            if currency != CANONICAL_RATE_BASE_CURRENCY:
+                rate_dates.append(source_rate_date)
+            if target_currency != CANONICAL_RATE_BASE_CURRENCY:
+                rate_dates.append(target_rate_date)
+            conversions[currency, day] = (
+                int(conversion_rate.scaleb(10)),
+                conversion_rate,
+                max(rate_dates) if rate_dates else day,
+                Transaction.CONVERSION_STATUS_CONVERTED,
+            )
+
+    results = []
+    for day, currency, cents in zip(dates, currencies, amounts):
+        rate_units, rate, rate_date, status = conversions[codes[currency], day]
+        if rate_units is None:
+            converted = None
+        elif rate_units == RATE_UNITS:
+            converted = cents
+        else:
+            product = cents * rate_units
+            if abs(product) >= EXACT_PRODUCT_LIMIT:
+                converted = amount_to_cents(cents_to_amount(cents) * rate)
+            else:
+                converted, remainder = divmod(product, RATE_UNITS)
+                if remainder * 2 > RATE_UNITS or (
+                    remainder * 2 == RATE_UNITS and converted % 2
+                ):
+                    converted += 1
+        results.append(
+            {
+                "amount_cents": converted,
+                "rate": rate,
+                "rate_date": rate_date,
+                "status": status,
+            }
+        )
+    return results
+
+
+def bulk_update_conversions(changed):
+    """Write ``(id, conversion values)`` pairs with one ``executemany``.
+
+    ``bulk_update`` builds a ``CASE`` expression per row and field, which
+    costs far more than converting the rows did.
+    """
+    opts = Transaction._meta
+    connection = connections[router.db_for_write(Transaction)]
+    fields = [opts.get_field(name) for name in [*CONVERSION_FIELDS, "updated_at"]]
+    id_field = opts.get_field("id")
+    now = fields[-1].get_db_prep_save(timezone.now(), connection)
+    params = [
+        (
+            *(
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(fields, values)
+            ),
+            now,
+            id_field.get_db_prep_save(transaction_id, connection),
+        )
+        for transaction_id, values in changed
+    ]
+    ops = connection.ops
+    assignments = ", ".join(f"{ops.quote_name(field.column)} = %s" for field in fields)
+    sql = (
+        f"UPDATE {ops.quote_name(opts.db_table)} SET {assignments} "
+        f"WHERE {ops.quote_name(id_field.column)} = %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
 def recalculate_transaction_conversions(queryset=None, default_currency=None):
     default_currency = normalize_currency_code(
         default_currency or FinanceSettings.load().default_currency
     )
     if queryset is None:
         queryset = Transaction.objects.all()
-    date_range = transaction_date_range(queryset)
-    end_date = date_range["end_date"]
-    if not end_date:
-        return {
-            "default_currency": default_currency,
-            "processed": 0,
-            "updated": 0,
-            "missing_rates": 0,
-        }
-
-    currencies = transaction_currencies(queryset, default_currency)
-    lookup = build_rate_lookup(currencies, end_date)
-    processed = 0
+    rows = list(
+        queryset.order_by().values_list(
+            "id",
+            "bank_account_id",
+            "transaction_date",
+            "currency",
+            "amount",
+            *CONVERSION_FIELDS,
+        )
+    )
+    currencies = {normalize_currency_code(row[3]) for row in rows}
+    currencies.add(default_currency)
+    lookup = build_rate_lookup(currencies, max((row[2] for row in rows), default=None))
     missing_rates = 0
     changed = []
-
-    for transaction_obj in queryset:
-        processed += 1
-        result = calculate_converted_amount(
-            transaction_obj.amount,
-            transaction_obj.currency,
+    partitions = set()
+
+    for start in range(0, len(rows), CONVERSION_BATCH_SIZE):
+        batch = rows[start : start + CONVERSION_BATCH_SIZE]
+        results = convert_amounts_in_cents(
+            [row[2] for row in batch],
+            [row[3] for row in batch],
+            [amount_to_cents(row[4]) for row in batch],
             default_currency,
-            transaction_obj.transaction_date,
             lookup,
         )
-        if result["status"] == Transaction.CONVERSION_STATUS_MISSING_RATE:
-            missing_rates += 1
-        next_values = {
-            "converted_amount": result["amount"],
-            "converted_currency": default_currency,
-            "conversion_rate": result["rate"],
-            "conversion_rate_date": result["rate_date"],
-            "conversion_status": result["status"],
-        }
-        if any(
-            getattr(transaction_obj, field) != value
-            for field, value in next_values.items()
-        ):
-            for field, value in next_values.items():
-                setattr(transaction_obj, field, value)
-            transaction_obj.updated_at = timezone.now()
-            changed.append(transaction_obj)
+        for row, result in zip(batch, results):
+            if result["status"] == Transaction.CONVERSION_STATUS_MISSING_RATE:
+                missing_rates += 1
+            next_values = (
+                (
+                    cents_to_amount(result["amount_cents"])
+                    if result["amount_cents"] is not None
+                    else None
+                ),
+                default_currency,
+                result["rate"],
+                result["rate_date"],
+                result["status"],
+            )
+            if row[5:] != next_values:
+                changed.append((row[0], next_values))
+                partitions.add((row[2].replace(day=1), row[1]))
 
     if changed:
-        Transaction.objects.bulk_update(
-            changed,
-            [
-                "converted_amount",
-                "converted_currency",
-                "conversion_rate",
-                "conversion_rate_date",
-                "conversion_status",
-                "updated_at",
-            ],
-        )
+        with transaction.atomic():
+            bulk_update_conversions(changed)
+            mark_rollups_stale(partitions)
 
     return {
         "default_currency": default_currency,
-        "processed": processed,
+        "processed": len(rows),
         "updated": len(changed),
         "missing_rates": missing_rates,
     }
 
 
-def exchange_rate_status(default_currency=None):
+# Django reads SQLite numbers through a 15-digit context before quantizing.
+STORED_DECIMAL_CONTEXT = Context(prec=15)
+SQLITE_INTEGER_MAX = 2**63 - 1
+# The SQL conversion splits a rate into 1e-5 units above and below so that
+# cents times either half stays within SQLite's 64-bit integers.
+SQL_RATE_SPLIT = 10**5
+# UPDATE ... FROM needs SQLite 3.33; RETURNING and AS MATERIALIZED 3.35.
+SQLITE_CONVERSION_VERSION = (3, 35)
+
+
+def stored_decimal(value, field):
+    """Read a number from SQLite the way Django's decimal converter does."""
+    return STORED_DECIMAL_CONTEXT.create_decimal_from_float(value).quantize(
+        Decimal(1).scaleb(-field.decimal_places), context=field.context
+    )
+
+
+def sql_conversion_rate(source_rate, target_rate):
+    if source_rate is None or target_rate is None:
+        return None
+    rate_field = ExchangeRate._meta.get_field("rate")
+    conversion_rate = stored_decimal(target_rate, rate_field) / stored_decimal(
+        source_rate, rate_field
+    )
+    return str(conversion_rate.quantize(RATE_QUANT))
+
+
+def sql_rate_units(conversion_rate):
+    if conversion_rate is None:
+        return None
+    rate_units = int(Decimal(conversion_rate).scaleb(10))
+    return rate_units if rate_units <= SQLITE_INTEGER_MAX else None
+
+
+def sql_converted_amount(amount, conversion_rate):
+    if amount is None or conversion_rate is None:
+        return None
+    amount = stored_decimal(amount, Transaction._meta.get_field("amount"))
+    return str((amount * Decimal(conversion_rate)).quantize(MONEY_QUANT))
+
+
+def register_sqlite_conversion_functions(sqlite_connection):
+    """Expose the Decimal conversion rules to SQL on a SQLite connection."""
+    sqlite_connection.create_function(
+        "cashmoney_conversion_rate", 2, sql_conversion_rate, deterministic=True
+    )
+    sqlite_connection.create_function(
+        "cashmoney_rate_units", 1, sql_rate_units, deterministic=True
+    )
+    sqlite_connection.create_function(
+        "cashmoney_converted_amount", 2, sql_converted_amount, deterministic=True
+    )
+
+
+def _conversion_rate_sql(currency, day_column):
+    """Return SQL for the canonical rate of ``currency`` on or before a day."""
+    if currency == CANONICAL_RATE_BASE_CURRENCY:
+        return "1", "NULL", []
+    lookup = (
+        f"FROM {ExchangeRate._meta.db_table} AS rate "
+        "WHERE rate.source = %s AND rate.base_currency = %s "
+        f"AND rate.quote_currency = %s AND rate.date <= {day_column} "
+        "ORDER BY rate.date DESC LIMIT 1"
+    )
+    params = [FRANKFURTER_SOURCE, CANONICAL_RATE_BASE_CURRENCY, currency]
+    return f"(SELECT rate.rate {lookup})", f"(SELECT rate.date {lookup})", params
+
+
+def conversion_update_sql(
+    stored_currency, default_currency, updated_at, scope_sql="", scope_params=()
+):
+    """Return ``(sql, params)`` converting one stored currency to the default.
+
+    Rates are looked up once per distinct transaction date, and only rows
+    whose conversion fields change are written.
+    """
+    table = Transaction._meta.db_table
+    source_currency = normalize_currency_code(stored_currency)
+    changed = (
+        f"({table}.converted_amount IS NOT new.converted_amount "
+        f"OR {table}.converted_currency IS NOT %s "
+        f"OR {table}.conversion_rate IS NOT new.conversion_rate "
+        f"OR {table}.conversion_rate_date IS NOT new.conversion_rate_date "
+        f"OR {table}.conversion_status IS NOT new.conversion_status)"
+    )
+    if source_currency == default_currency:
+        new_sql = (
+            "SELECT t.id, t.amount AS converted_amount, 1 AS conversion_rate, "
+            "t.transaction_date AS conversion_rate_date, "
+            "%s AS conversion_status "
+            f"FROM {table} AS t WHERE t.currency = %s{scope_sql}"
+        )
+        new_params = [
+            Transaction.CONVERSION_STATUS_NATIVE,
+            stored_currency,
+            *scope_params,
+        ]
+    else:
+        new_sql, new_params = _converted_rows_sql(
+            stored_currency, source_currency, default_currency, scope_sql, scope_params
+        )
+    # The rows to write are a subquery rather than a CTE so the statement
+    # starts with UPDATE. It returns the rollup partition of every written
+    # row.
+    sql = (
+        f"UPDATE {table} SET converted_amount = new.converted_amount, "
+        "converted_currency = %s, conversion_rate = new.conversion_rate, "
+        "conversion_rate_date = new.conversion_rate_date, "
+        "conversion_status = new.conversion_status, updated_at = %s "
+        f"FROM ({new_sql}) AS new WHERE {table}.id = new.id AND {changed} "
+        f"RETURNING {table}.transaction_date, {table}.bank_account_id"
+    )
+    return sql, [default_currency, updated_at, *new_params, default_currency]
+
+
+def _converted_rows_sql(
+    stored_currency, source_currency, default_currency, scope_sql, scope_params
+):
+    """Return SQL selecting the converted values of a foreign currency."""
+    table = Transaction._meta.db_table
+    source_rate, source_date, source_params = _conversion_rate_sql(
+        source_currency, "days.day"
+    )
+    target_rate, target_date, target_params = _conversion_rate_sql(
+        default_currency, "days.day"
+    )
+    if source_currency == CANONICAL_RATE_BASE_CURRENCY:
+        rate_date = "target_date"
+    elif default_currency == CANONICAL_RATE_BASE_CURRENCY:
+        rate_date = "source_date"
+    else:
+        rate_date = "MAX(source_date, target_date)"
+    # Rates are resolved once per day in materialized CTEs. Each row is then
+    # rounded half to even in integer cents, like ``convert_amounts_in_cents``.
+    # Rows whose product could overflow 64 bits fall back to the Decimal
+    # function.
+    sql = (
+        "WITH days AS ("
+        "SELECT DISTINCT t.transaction_date AS day "
+        f"FROM {table} AS t WHERE t.currency = %s{scope_sql}"
+        "), rates AS ("
+        f"SELECT day, {source_rate} AS source_rate, {source_date} AS source_date, "
+        f"{target_rate} AS target_rate, {target_date} AS target_date FROM days"
+        "), conversions AS MATERIALIZED ("
+        "SELECT day, "
+        "cashmoney_conversion_rate(source_rate, target_rate) AS conversion_rate, "
+        "CASE WHEN source_rate IS NULL OR target_rate IS NULL THEN NULL "
+        f"ELSE {rate_date} END AS conversion_rate_date FROM rates"
+        "), factors AS MATERIALIZED ("
+        "SELECT day, conversion_rate, conversion_rate_date, "
+        "cashmoney_rate_units(conversion_rate) AS rate_units FROM conversions"
+        "), split_rates AS ("
+        "SELECT day, conversion_rate, conversion_rate_date, "
+        "rate_units / %s AS rate_high, rate_units %% %s AS rate_low, "
+        "%s / (rate_units / %s + %s) AS cents_limit FROM factors"
+        "), cents AS ("
+        "SELECT t.id, t.amount, r.*, "
+        "CAST(ROUND(ABS(t.amount) * 100) AS INTEGER) AS cents "
+        f"FROM {table} AS t JOIN split_rates AS r ON r.day = t.transaction_date "
+        f"WHERE t.currency = %s{scope_sql}"
+        "), products AS ("
+        "SELECT *, cents * rate_high + cents * rate_low / %s AS scaled, "
+        "cents * rate_low %% %s AS low FROM cents"
+        "), quotients AS ("
+        "SELECT *, scaled / %s AS whole, (scaled %% %s) * %s + low AS remainder "
+        "FROM products"
+        "), rounded AS ("
+        "SELECT *, whole + CASE WHEN remainder > %s "
+        "OR (remainder = %s AND whole %% 2 = 1) THEN 1 ELSE 0 END "
+        "AS rounded_cents FROM quotients"
+        ") SELECT id, "
+        "CASE WHEN conversion_rate IS NULL THEN NULL "
+        "WHEN cents_limit IS NULL OR cents > cents_limit "
+        "THEN cashmoney_converted_amount(amount, conversion_rate) "
+        "ELSE printf('%%s%%d.%%02d', "
+        "CASE WHEN amount < 0 AND rounded_cents > 0 THEN '-' ELSE '' END, "
+        "rounded_cents / 100, rounded_cents %% 100) END AS converted_amount, "
+        "conversion_rate, conversion_rate_date, "
+        "CASE WHEN conversion_rate IS NULL THEN %s ELSE %s END "
+        "AS conversion_status FROM rounded"
+    )
+    half = RATE_UNITS // 2
+    params = [
+        stored_currency,
+        *scope_params,
+        *source_params,
+        *source_params,
+        *target_params,
+        *target_params,
+        SQL_RATE_SPLIT,
+        SQL_RATE_SPLIT,
+        SQLITE_INTEGER_MAX,
+        SQL_RATE_SPLIT,
+        SQL_RATE_SPLIT,
+        stored_currency,
+        *scope_params,
+        SQL_RATE_SPLIT,
+        SQL_RATE_SPLIT,
+        SQL_RATE_SPLIT,
+        SQL_RATE_SPLIT,
+        SQL_RATE_SPLIT,
+        half,
+        half,
+        Transaction.CONVERSION_STATUS_MISSING_RATE,
+        Transaction.CONVERSION_STATUS_CONVERTED,
+    ]
+    return sql, params
+
+
+# Temporary table holding the ids a scoped conversion UPDATE works on.
+CONVERSION_SCOPE_TABLE = "cashmoney_conversion_scope"
+
+
+def converted_rollup_partition(transaction_date, bank_account_id):
+    """Return the rollup partition of a row returned by a conversion UPDATE."""
+    transaction_date = Transaction._meta.get_field("transaction_date").to_python(
+        transaction_date
+    )
+    bank_account_id = Transaction._meta.get_field("bank_account").to_python(
+        bank_account_id
+    )
+    return transaction_date.replace(day=1), bank_account_id
+
+
+def convert_transactions_in_database(queryset=None, default_currency=None):
+    """Recalculate conversions with one SQL UPDATE per stored currency.
+
+    This gives the same results as ``recalculate_transaction_conversions``
+    without loading the rows into Python. It needs the SQLite conversion
+    functions and SQLite 3.35 or newer; anything else uses the Python path.
+    """
+    default_currency = normalize_currency_code(
+        default_currency or FinanceSettings.load().default_currency
+    )
+    connection = connections[router.db_for_write(Transaction)]
+    if (
+        connection.vendor != "sqlite"
+        or connection.Database.sqlite_version_info < SQLITE_CONVERSION_VERSION
+    ):
+        return recalculate_transaction_conversions(queryset, default_currency)
+
+    updated_at = Transaction._meta.get_field("updated_at").get_db_prep_save(
+        timezone.now(), connection
+    )
+    updated = 0
+    partitions = set()
+    with transaction.atomic(), connection.cursor() as cursor:
+        scope_sql = ""
+        if queryset is None:
+            queryset = Transaction.objects.all()
+        else:
+            # The UPDATE can move rows out of the scope (a filled rate, a new
+            # converted currency), so its ids are pinned first and counted
+            # from there.
+            id_sql, id_params = queryset.order_by().values("id").query.sql_with_params()
+            cursor.execute(f"DROP TABLE IF EXISTS temp.{CONVERSION_SCOPE_TABLE}")
+            cursor.execute(
+                f"CREATE TEMP TABLE {CONVERSION_SCOPE_TABLE} AS {id_sql}", id_params
+            )
+            scope_ids = f"SELECT id FROM temp.{CONVERSION_SCOPE_TABLE}"
+            scope_sql = f" AND t.id IN ({scope_ids})"
+            queryset = Transaction.objects.filter(id__in=RawSQL(scope_ids, ()))
+
+        stored_currencies = (
+            queryset.order_by().values_list("currency", flat=True).distinct()
+        )
+        for stored_currency in list(stored_currencies):
+            sql, params = conversion_update_sql(
+                stored_currency, default_currency, updated_at, scope_sql
+            )
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            updated += len(rows)
+            partitions.update(rows)
+        mark_rollups_stale(
+            converted_rollup_partition(transaction_date, bank_account_id)
+            for transaction_date, bank_account_id in partitions
+        )
+        counts = queryset.aggregate(
+            processed=Count("id"),
+            missing_rates=Count(
+                "id",
+                filter=Q(conversion_status=Transaction.CONVERSION_STATUS_MISSING_RATE),
+            ),
+        )
+        if scope_sql:
+            cursor.execute(f"DROP TABLE temp.{CONVERSION_SCOPE_TABLE}")
+
+    return {
+        "default_currency": default_currency,
+        "processed": counts["processed"],
+        "updated": updated,
+        "missing_rates": counts["missing_rates"],
+    }
+
+
+EXCHANGE_RATE_STATUS_FIELDS = [
+    "default_currency",
+    "transaction_currencies",
+    "required_rate_currencies",
+    "transaction_date_from",
+    "transaction_date_to",
+    "cached_rate_count",
+    "earliest_cached_rate_date",
+    "latest_cached_rate_date",
+    "missing_converted_transactions",
+]
+
+
+def mark_exchange_rate_status_stale():
+    ExchangeRateStatus.objects.filter(is_stale=False).update(
+        is_stale=True, updated_at=timezone.now()
+    )
+
+
+def exchange_rate_generation():
+    return (
+        ExchangeRateStatus.objects.filter(singleton_key=1)
+        .values_list("rate_generation", flat=True)
+        .first()
+        or 0
+    )
+
+
+def mark_exchange_rates_changed():
+    """Mark the status stale and bump the rate generation, returning the new one.
+
+    Rate indexes compare the generation before each lookup, so every process
+    sees the change.
+    """
+    ExchangeRateStatus.load()
+    ExchangeRateStatus.objects.filter(singleton_key=1).update(
+        is_stale=True,
+        rate_generation=F("rate_generation") + 1,
+        updated_at=timezone.now(),
+    )
+    return exchange_rate_generation()
+
+
+def exchange_rate_status(default_currency=None, refresh=False):
+    """Return the stored exchange-rate status, rebuilding it when needed.
+
+    The record is rebuilt on ``refresh``, after a transaction or rate write
+    marked it stale, and when it was built for another default currency.
+    """
     default_currency = normalize_currency_code(
         default_currency or FinanceSettings.load().default_currency
     )
+    status = ExchangeRateStatus.load()
+    if refresh or status.is_stale or status.default_currency != default_currency:
+        # Clear the flag first, so writes made during the rebuild mark the
+        # record stale again.
+        ExchangeRateStatus.objects.filter(id=status.id).update(is_stale=False)
+        for field, value in build_exchange_rate_status(default_currency).items():
+            setattr(status, field, value)
+        status.save(update_fields=[*EXCHANGE_RATE_STATUS_FIELDS, "updated_at"])
+    return {
+        "source": FRANKFURTER_SOURCE,
+        "rate_base_currency": CANONICAL_RATE_BASE_CURRENCY,
+        **{field: getattr(status, field) for field in EXCHANGE_RATE_STATUS_FIELDS},
+    }
+
+
+def build_exchange_rate_status(default_currency):
     date_range = transaction_date_range()
     quote_currencies = required_rate_quote_currencies(default_currency=default_currency)
     cached_rates = ExchangeRate.objects.filter(
@@ -588,8 +1707,6 @@ def exchange_rate_status(default_currency=None):
         .count()
     )
     return {
-        "source": FRANKFURTER_SOURCE,
-        "rate_base_currency": CANONICAL_RATE_BASE_CURRENCY,
         "default_currency": default_currency,
         "transaction_currencies": transaction_currencies(
             default_currency=default_currency
@@ -604,59 +1721,184 @@ def exchange_rate_status(default_currency=None):
     }
 
 
-def exchange_rate_fetch_plan(start_date, end_date, quote_currencies):
-    plan = defaultdict(list)
-    if not start_date or not end_date:
-        return plan
+def exchange_rate_gaps(start_date, end_date, quote_currencies):
+    """Return ``(quote, gap_start, gap_end)`` ranges missing from the rate cache.
 
-    for quote_currency in quote_currencies:
-        quote_currency = normalize_currency_code(quote_currency)
-        cached_dates = ExchangeRate.objects.filter(
+    Rates are not published on weekends and holidays, so only stretches of
+    more than ``RATE_GAP_MAX_DAYS`` between cached rates count as gaps. The
+    range reaches that many days before ``start_date`` so a transaction on a
+    weekend can use the rate published before it.
+    """
+    if not start_date or not end_date or not quote_currencies:
+        return []
+
+    quotes = sorted(
+        {normalize_currency_code(currency) for currency in quote_currencies}
+    )
+    range_start = start_date - timedelta(days=RATE_GAP_MAX_DAYS)
+    cached_dates = defaultdict(list)
+    coverage = (
+        ExchangeRate.objects.filter(
             source=FRANKFURTER_SOURCE,
             base_currency=CANONICAL_RATE_BASE_CURRENCY,
-            quote_currency=quote_currency,
-        ).aggregate(first_date=Min("date"), last_date=Max("date"))
-        first_date = cached_dates["first_date"]
-        last_date = cached_dates["last_date"]
-        if not first_date or not last_date:
-            plan[(start_date, end_date)].append(quote_currency)
+            quote_currency__in=quotes,
+            date__range=(range_start, end_date),
+        )
+        .order_by("quote_currency", "date")
+        .values_list("quote_currency", "date")
+    )
+    for quote_currency, rate_date in coverage:
+        cached_dates[quote_currency].append(rate_date)
+
+    one_day = timedelta(days=1)
+    gaps = []
+    for quote in quotes:
+        dates = cached_dates[quote]
+        if not dates:
+            gaps.append((quote, range_start, end_date))
+            continue
+        if dates[0] > start_date:
+            gaps.append((quote, range_start, dates[0] - one_day))
+        for previous_date, rate_date in zip(dates, dates[1:]):
+            if (rate_date - previous_date).days > RATE_GAP_MAX_DAYS:
+                gaps.append((quote, previous_date + one_day, rate_date - one_day))
+        if dates[-1] < end_date:
+            gaps.append((quote, dates[-1] + one_day, end_date))
+    _exchange_rate_index.refresh()
+    return [gap for gap in gaps if not _exchange_rate_index.is_empty_gap(gap)]
+
+
+def merge_exchange_rate_gaps(gaps, max_days=RATE_FETCH_CHUNK_DAYS):
+    """Group gaps into ``{(start, end): quotes}`` ranges for the provider.
+
+    A gap joins the previous range, whatever its currency, when covering
+    both needs fewer ``max_days`` requests than fetching them apart.
+    """
+
+    def request_count(start_date, end_date):
+        return (end_date - start_date).days // max_days + 1
+
+    ranges = []
+    for quote, gap_start, gap_end in sorted(gaps, key=lambda gap: gap[1:]):
+        if ranges:
+            range_start, range_end, range_quotes = ranges[-1]
+            merged_end = max(range_end, gap_end)
+            if request_count(range_start, merged_end) < request_count(
+                range_start, range_end
+            ) + request_count(gap_start, gap_end):
+                ranges[-1] = (range_start, merged_end, range_quotes | {quote})
+                continue
+        ranges.append((gap_start, gap_end, {quote}))
+
+    return {
+        (range_start, range_end): sorted(range_quotes)
+        for range_start, range_end, range_quotes in ranges
+    }
+
+
+def remember_empty_rate_gaps(gaps, rows, end_date):
+    """Remember past gaps that a fetch returned no rates for.
+
+    Gaps reaching ``end_date`` are left out, because rates for recent days
+    may still be published.
+    """
+    fetched_dates = defaultdict(list)
+    for row in rows:
+        fetched_dates[row["quote_currency"]].append(row["date"])
+    for dates in fetched_dates.values():
+        dates.sort()
+
+    empty_gaps = []
+    for gap in gaps:
+        quote, gap_start, gap_end = gap
+        if gap_end >= end_date:
+            continue
+        dates = fetched_dates.get(quote, [])
+        index = bisect_right(dates, gap_end) - 1
+        if index < 0 or dates[index] < gap_start:
+            empty_gaps.append(gap)
+    _exchange_rate_index.mark_empty_gaps(empty_gaps)
+
+
+def track_first_new_rate_dates(first_new_rate_dates, new_rates):
+    for rate in new_rates:
+        if rate.source != FRANKFURTER_SOURCE:
             continue
-        if first_date > start_date:
-            plan[(start_date, first_date - timedelta(days=1))].append(quote_currency)
-        if last_date < end_date:
-            plan[(last_date + timedelta(days=1), end_date)].append(quote_currency)
-    return plan
+        first_date = first_new_rate_dates.get(rate.quote_currency)
+        if first_date is None or rate.date < first_date:
+            first_new_rate_dates[rate.quote_currency] = rate.date
+
+
+def conversion_recalculation_scope(default_currency, first_new_rate_dates):
+    """Match transactions whose conversion can change after new rates.
+
+    ``first_new_rate_dates`` maps a quote currency to its earliest new rate.
+    A new rate for the default currency moves every foreign-currency row from
+    that date on. Rows not yet converted to the default currency, or still
+    missing a rate, are always included.
+    """
+    scope = Q(conversion_status=Transaction.CONVERSION_STATUS_MISSING_RATE) | ~Q(
+        converted_currency=default_currency
+    )
+    for currency, first_date in first_new_rate_dates.items():
+        if currency == default_currency:
+            scope |= Q(transaction_date__gte=first_date) & ~Q(currency=default_currency)
+        else:
+            scope |= Q(currency=currency, transaction_date__gte=first_date)
+    return scope
 
 
-def sync_missing_exchange_rates(provider=None, default_currency=None):
+def sync_missing_exchange_rates(provider=None, default_currency=None, progress=None):
     default_currency = normalize_currency_code(
         default_currency or FinanceSettings.load().default_currency
     )
     queryset = Transaction.objects.all()
-    date_range = transaction_date_range(queryset)
+    date_range = transaction_date_range()
     start_date = date_range["start_date"]
     end_date = date_range["end_date"]
-    quotes = required_rate_quote_currencies(queryset, default_currency)
+    quotes = required_rate_quote_currencies(default_currency=default_currency)
     created_rates = 0
     fetched_rows = 0
+    first_new_rate_dates = {}
 
-    fetch_plan = exchange_rate_fetch_plan(start_date, end_date, quotes)
+    gaps = exchange_rate_gaps(start_date, end_date, quotes)
+    fetch_plan = merge_exchange_rate_gaps(gaps)
     if fetch_plan:
-        provider = provider or FrankfurterExchangeRateProvider()
-        for (range_start, range_end), range_quotes in fetch_plan.items():
-            for chunk_start, chunk_end in chunk_date_range(range_start, range_end):
-                rows = provider.fetch_rates(
-                    CANONICAL_RATE_BASE_CURRENCY,
-                    range_quotes,
-                    chunk_start,
-                    chunk_end,
-                )
-                fetched_rows += len(rows)
-                created_rates += cache_exchange_rate_rows(rows)
-
-    recalculation = recalculate_transaction_conversions(
-        queryset, default_currency=default_currency
+        fetch_requests = [
+            (range_quotes, chunk_start, chunk_end)
+            for (range_start, range_end), range_quotes in fetch_plan.items()
+            for chunk_start, chunk_end in chunk_date_range(range_start, range_end)
+        ]
+        owns_provider = provider is None
+        provider = provider or FrankfurterExchangeRateProvider(
+            cache=HTTPResponseCache()
+        )
+        try:
+            rows = fetch_exchange_rate_chunks(
+                provider, fetch_requests, progress=progress
+            )
+        finally:
+            if owns_provider:
+                provider.close()
+        # Rates are only cached once every chunk arrived, so a failed sync
+        # leaves the cache and the conversions as they were. Gaps the provider
+        # had no rates for are also only known from the complete fetch.
+        fetched_rows = len(rows)
+        remember_empty_rate_gaps(gaps, rows, end_date)
+        new_rates = insert_new_exchange_rates(rows)
+        created_rates = len(new_rates)
+        track_first_new_rate_dates(first_new_rate_dates, new_rates)
+
+    if progress:
+        progress(0, None, "Recalculating converted amounts")
+
+    recalculation = convert_transactions_in_database(
+        queryset.filter(
+            conversion_recalculation_scope(default_currency, first_new_rate_dates)
+        ),
+        default_currency=default_currency,
     )
+    recalculation["ledger_transactions"] = queryset.count()
     return {
         "default_currency": default_currency,
         "fetched_rows": fetched_rows,
@@ -666,40 +1908,131 @@ def sync_missing_exchange_rates(provider=None, default_currency=None):
     }
 
 
+def load_reference_rate_file(
+    path, default_currency=None, batch_size=REFERENCE_RATE_BATCH_SIZE, progress=None
+):
+    """Cache every rate in a reference rate file, then recalculate once.
+
+    The file is streamed and inserted in batches. Only conversions the new
+    rates can change are recalculated, as after a network sync.
+    """
+    default_currency = normalize_currency_code(
+        default_currency or FinanceSettings.load().default_currency
+    )
+    rows = ReferenceRateFileProvider(path).iter_rates()
+    file_rows = 0
+    created_rates = 0
+    first_new_rate_dates = {}
+    for batch in iter(lambda: list(islice(rows, batch_size)), []):
+        file_rows += len(batch)
+        with transaction.atomic():
+            new_rates = insert_new_exchange_rates(batch)
+        created_rates += len(new_rates)
+        track_first_new_rate_dates(first_new_rate_dates, new_rates)
+        if progress:
+            progress(file_rows, None, "Loading exchange rates")
+
+    if progress:
+        progress(0, None, "Recalculating converted amounts")
+
+    queryset = Transaction.objects.all()
+    recalculation = convert_transactions_in_database(
+        queryset.filter(
+            conversion_recalculation_scope(default_currency, first_new_rate_dates)
+        ),
+        default_currency=default_currency,
+    )
+    recalculation["ledger_transactions"] = queryset.count()
+    return {
+        "default_currency": default_currency,
+        "file_rows": file_rows,
+        "created_rates": created_rates,
+        "recalculation": recalculation,
+    }
+
+
 def mapped_transaction_values_from_raw_data(transaction_obj, csv_mapping):
     raw_data = transaction_obj.raw_data
     if not isinstance(raw_data, dict) or not raw_data:
         return {}
 
-    extractor = CSVRowExtractor(csv_mapping)
+    extractor = csv_row_extractor(csv_mapping)
     values = {}
     for field_name in RECATEGORIZABLE_TRANSACTION_FIELDS:
-        if coerce_list(csv_mapping.get_column(field_name)):
+        if extractor.field_columns(field_name):
             values[field_name] = extractor.get_value(raw_data, field_name)
     return values
 
 
+def iter_file_chunks(file_obj, chunk_size=CSV_READ_CHUNK_SIZE):
+    if hasattr(file_obj, "chunks"):
+        yield from file_obj.chunks(chunk_size)
+        return
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_decoded_chunks(chunks, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        text = chunk if isinstance(chunk, str) else decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_text_lines(text_chunks):
+    """Split streamed text into lines the way ``str.splitlines()`` would.
+
+    Each line is yielded with a ``"\n"`` terminator so quoted CSV values that
+    span several lines still parse.
+    """
+    pending = ""
+    for chunk in text_chunks:
+        lines = (pending + chunk.replace("\ufeff", "")).splitlines(keepends=True)
+        pending = ""
+        # Keep an unterminated last line, or a bare "\r" that may still be
+        # followed by "\n" in the next chunk.
+        if lines and (lines[-1].splitlines() == [lines[-1]] or lines[-1][-1] == "\r"):
+            pending = lines.pop()
+        for line in lines:
+            yield line.splitlines()[0] + "\n"
+    if pending:
+        yield pending.splitlines()[0] + "\n"
+
+
+def stream_csv_rows_with_headers(csv_mapping, file_obj):
+    """Return ``(rows, headers)`` where ``rows`` lazily yields parsed rows.
+
+    The file is decoded chunk by chunk, so only the current chunk and row are
+    held in memory. Header problems are raised before this returns.
+    """
+    chunks = iter_file_chunks(file_obj)
+    return read_csv_rows_from_lines(
+        csv_mapping, iter_text_lines(iter_decoded_chunks(chunks, csv_mapping.encoding))
+    )
+
+
 def read_csv_rows_with_headers(csv_mapping, file_obj):
-    raw = file_obj.read()
-    if isinstance(raw, str):
-        text = raw
-    else:
-        text = raw.decode(csv_mapping.encoding)
-    return read_csv_rows_from_text(csv_mapping, text)
+    rows, headers = stream_csv_rows_with_headers(csv_mapping, file_obj)
+    return list(rows), headers
 
 
-def read_csv_rows_from_text(csv_mapping, text):
-    text = text.replace("\ufeff", "")
-    lines = text.splitlines()
-    if not lines:
+def read_csv_rows_from_lines(csv_mapping, lines):
+    lines = iter(lines)
+    leading_lines = list(islice(lines, csv_mapping.header_row + 1))
+    if not leading_lines:
         raise ValueError("CSV file is empty")
-    if csv_mapping.header_row >= len(lines):
+    if csv_mapping.header_row >= len(leading_lines):
         raise ValueError("Header row is outside the CSV file")
 
-    lines = lines[csv_mapping.header_row :]
-
     reader = csv.DictReader(
-        io.StringIO("\n".join(lines)),
+        chain(leading_lines[-1:], lines),
         delimiter=csv_mapping.delimiter,
         quotechar=csv_mapping.quotechar,
     )
@@ -707,9 +2040,11 @@ def read_csv_rows_from_text(csv_mapping, text):
         raise ValueError("CSV header row is missing")
 
     headers = [str(header).replace("\xa0", " ").strip() for header in reader.fieldnames]
+    return iter_cleaned_csv_rows(reader, csv_mapping.header_row + 2), headers
+
 
-    rows = []
-    for index, row in enumerate(reader, start=csv_mapping.header_row + 2):
+def iter_cleaned_csv_rows(reader, start):
+    for index, row in enumerate(reader, start=start):
         cleaned = {
             str(key).replace("\xa0", " ").strip(): (
                 value.replace("\xa0", " ").strip() if isinstance(value, str) else value
@@ -717,18 +2052,22 @@ def read_csv_rows_from_text(csv_mapping, text):
             for key, value in row.items()
             if key is not None
         }
-        rows.append((index, cleaned))
-    return rows, headers
+        yield index, cleaned
 
 
 def detect_csv_columns(csv_mapping, file_obj, sample_size=5, autodetect_settings=False):
     warnings = []
     detected_settings = csv_mapping_settings(csv_mapping)
-    if autodetect_settings:
-        raw = file_obj.read()
+    loaded_is_estimate = False
+    if not autodetect_settings:
+        rows, headers = stream_csv_rows_with_headers(csv_mapping, file_obj)
+        sample_rows, loaded = sample_csv_rows(rows, headers, sample_size)
+    else:
+        prefix, complete = read_csv_detection_prefix(file_obj)
         text, detected_settings, warnings = detect_csv_settings(
-            raw,
+            prefix,
             default_currency=csv_mapping.default_currency,
+            final=complete,
         )
         csv_mapping.delimiter = detected_settings["delimiter"]
         csv_mapping.quotechar = detected_settings["quotechar"]
@@ -737,26 +2076,46 @@ def detect_csv_columns(csv_mapping, file_obj, sample_size=5, autodetect_settings
         csv_mapping.date_format = detected_settings["date_format"]
         csv_mapping.decimal_separator = detected_settings["decimal_separator"]
         csv_mapping.thousands_separator = detected_settings["thousands_separator"]
-        rows, headers = read_csv_rows_from_text(csv_mapping, text)
-    else:
-        rows, headers = read_csv_rows_with_headers(csv_mapping, file_obj)
+        rows, headers = read_csv_rows_from_lines(csv_mapping, iter_text_lines([text]))
+        sample_rows, loaded = sample_csv_rows(rows, headers, sample_size)
+        if not complete:
+            # Only the prefix is read, so scale its row count to the file.
+            loaded_is_estimate = True
+            file_size = getattr(file_obj, "size", None)
+            loaded = round(loaded * file_size / len(prefix)) if file_size else None
+            if prefix.isascii():
+                warnings.append(
+                    "The start of the file is plain ASCII, so the encoding "
+                    "could not be confirmed; check it if later rows have accents."
+                )
 
     return {
         "detected_settings": detected_settings,
         "headers": headers,
-        "loaded": len(rows),
-        "sample_size": min(sample_size, len(rows)),
-        "sample_rows": [
-            {
-                "line": line_number,
-                "raw": {header: row.get(header, "") for header in headers},
-            }
-            for line_number, row in rows[:sample_size]
-        ],
+        "loaded": loaded,
+        "loaded_is_estimate": loaded_is_estimate,
+        "sample_size": len(sample_rows),
+        "sample_rows": sample_rows,
         "warnings": warnings,
     }
 
 
+def sample_csv_rows(rows, headers, sample_size):
+    """Return ``(sample_rows, row_count)`` for parsed CSV ``rows``."""
+    loaded = 0
+    sample_rows = []
+    for line_number, row in rows:
+        loaded += 1
+        if len(sample_rows) < sample_size:
+            sample_rows.append(
+                {
+                    "line": line_number,
+                    "raw": {header: row.get(header, "") for header in headers},
+                }
+            )
+    return sample_rows, loaded
+
+
 def csv_mapping_settings(csv_mapping):
     return {
         "delimiter": csv_mapping.delimiter,
@@ -769,8 +2128,27 @@ def csv_mapping_settings(csv_mapping):
     }
 
 
-def detect_csv_settings(raw, default_currency="CZK"):
-    text, encoding = decode_csv_text(raw)
+def read_csv_detection_prefix(file_obj, size=None):
+    """Return ``(prefix, complete)`` for settings detection.
+
+    The prefix holds the first ``size`` bytes, cut after the last line break
+    unless it is the whole file. Nothing past it is read.
+    """
+    size = size or CSV_DETECTION_PREFIX_BYTES
+    prefix = b""
+    for chunk in iter_file_chunks(file_obj):
+        prefix += chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+        if len(prefix) > size:
+            break
+    else:
+        return prefix, True
+
+    cut = prefix.rfind(b"\n", 0, size) + 1 or size
+    return prefix[:cut], False
+
+
+def detect_csv_settings(raw, default_currency="CZK", final=True):
+    text, encoding = decode_csv_text(raw, final=final)
     text = text.replace("\ufeff", "")
     if not text.strip():
         raise ValueError("CSV file is empty")
@@ -791,8 +2169,12 @@ def detect_csv_settings(raw, default_currency="CZK"):
             "default_currency": default_currency,
         },
     )()
-    rows, headers = read_csv_rows_from_text(probe_mapping, text)
-    values = [value for _, row in rows[:50] for value in row.values()]
+    rows, headers = read_csv_rows_from_lines(probe_mapping, iter_text_lines([text]))
+    values = [
+        value
+        for _, row in islice(rows, CSV_DETECTION_SAMPLE_ROWS)
+        for value in row.values()
+    ]
     date_format, date_warning = detect_date_format(values)
     decimal_separator, thousands_separator, number_warning = detect_number_format(
         values
@@ -814,13 +2196,19 @@ def detect_csv_settings(raw, default_currency="CZK"):
     )
 
 
-def decode_csv_text(raw):
+def decode_csv_text(raw, final=True):
+    """Decode ``raw`` with the first encoding candidate that accepts it.
+
+    Pass ``final=False`` for a prefix of a longer file, so a character cut
+    at its end does not rule out an encoding.
+    """
     if isinstance(raw, str):
         return raw, "utf-8"
 
     for encoding in ENCODING_CANDIDATES:
         try:
-            return raw.decode(encoding), encoding
+            decoder = codecs.getincrementaldecoder(encoding)()
+            return decoder.decode(raw, final=final), encoding
         except UnicodeDecodeError:
             continue
     return raw.decode("latin-1"), "latin-1"
@@ -1097,6 +2485,121 @@ def serialize_categorization_result(result):
     }
 
 
+def iter_set_bits(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over every normalized include and exclude term.
+
+    One pass over the text collects a bitset of term hits; keyword matches are
+    then resolved from per-keyword include/exclude masks in priority order.
+    """
+
+    def __init__(self, prepared_keywords):
+        self.keywords = []
+        self.include_masks = []
+        self.exclude_masks = []
+        self.always_candidates = 0
+        self.term_keyword_masks = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [0]
+        term_indexes = {}
+
+        def term_bit(term):
+            if term not in term_indexes:
+                term_indexes[term] = len(term_indexes)
+                self.term_keyword_masks.append(0)
+                self._add_term(term, term_indexes[term])
+            return term_indexes[term]
+
+        for prepared in prepared_keywords:
+            include_terms = prepared["include"]
+            exclude_terms = prepared["exclude"]
+            # Empty terms are substrings of every text: an empty include term is
+            # always satisfied and an empty exclude term always rejects.
+            if not include_terms or "" in exclude_terms:
+                continue
+
+            keyword_index = len(self.keywords)
+            include_mask = 0
+            for term in include_terms:
+                if term:
+                    include_mask |= 1 << term_bit(term)
+            exclude_mask = 0
+            for term in exclude_terms:
+                exclude_mask |= 1 << term_bit(term)
+
+            self.keywords.append(prepared["keyword"])
+            self.include_masks.append(include_mask)
+            self.exclude_masks.append(exclude_mask)
+            if include_mask:
+                for term_index in iter_set_bits(include_mask):
+                    self.term_keyword_masks[term_index] |= 1 << keyword_index
+            else:
+                self.always_candidates |= 1 << keyword_index
+
+        self._build_failure_links()
+
+    def _add_term(self, term, term_index):
+        state = 0
+        for char in term:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(0)
+            state = next_state
+        self.output[state] |= 1 << term_index
+
+    def _build_failure_links(self):
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def term_hits(self, normalized_text):
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        state = 0
+        hits = 0
+        for char in normalized_text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits |= output[state]
+        return hits
+
+    def match(self, normalized_text):
+        hits = self.term_hits(normalized_text)
+        candidates = self.always_candidates
+        for term_index in iter_set_bits(hits):
+            candidates |= self.term_keyword_masks[term_index]
+
+        matched = []
+        for keyword_index in iter_set_bits(candidates):
+            include_mask = self.include_masks[keyword_index]
+            if include_mask & hits != include_mask:
+                continue
+            if self.exclude_masks[keyword_index] & hits:
+                continue
+            matched.append(self.keywords[keyword_index])
+        return matched
+
+
 class CategorizationService:
     def __init__(self):
         self.settings = FinanceSettings.load()
@@ -1119,6 +2622,7 @@ class CategorizationService:
                     ],
                 }
             )
+        self.matcher = KeywordMatcher(self.prepared_keywords)
 
         self.own_account_numbers = [
             {
@@ -1161,21 +2665,7 @@ class CategorizationService:
                 result.subcategory = self.settings.internal_transfer_subcategory
                 return result
 
-        normalized_text = normalize_text(categorization_text)
-        matched = []
-        for prepared in self.prepared_keywords:
-            include_terms = prepared["include"]
-            exclude_terms = prepared["exclude"]
-
-            if not include_terms:
-                continue
-            if not all(term in normalized_text for term in include_terms):
-                continue
-            if any(term in normalized_text for term in exclude_terms):
-                continue
-
-            matched.append(prepared["keyword"])
-
+        matched = self.matcher.match(normalize_text(categorization_text))
         if not matched:
             result.is_uncategorized = True
             return result
@@ -1214,6 +2704,23 @@ class CategorizationService:
         result.matched_keyword_ids = [str(keyword.id) for keyword in top_matches]
         return result
 
+    def scan_keywords(self, normalized_text):
+        """Reference matcher that tests every keyword term against the text."""
+        matched = []
+        for prepared in self.prepared_keywords:
+            include_terms = prepared["include"]
+            exclude_terms = prepared["exclude"]
+
+            if not include_terms:
+                continue
+            if not all(term in normalized_text for term in include_terms):
+                continue
+            if any(term in normalized_text for term in exclude_terms):
+                continue
+
+            matched.append(prepared["keyword"])
+        return matched
+
     def has_internal_account_reference(self, categorization_text, transaction_data):
         current_account = transaction_data.get("bank_account")
         current_account_id = getattr(current_account, "id", None)
@@ -1244,18 +2751,132 @@ class CategorizationService:
         )
 
 
+DATE_PARSE_CACHE_SIZE = 4096
+
+
+def strptime_date(value, date_format):
+    return datetime.strptime(value, date_format).date()
+
+
+def parse_iso_date(value):
+    """Parse ``%Y-%m-%d`` without ``strptime`` when the value is zero padded."""
+    digits = value[:4] + value[5:7] + value[8:]
+    if (
+        len(value) == 10
+        and value[4] == "-"
+        and value[7] == "-"
+        and digits.isascii()
+        and digits.isdigit()
+    ):
+        return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+    return strptime_date(value, "%Y-%m-%d")
+
+
+def parse_dotted_date(value):
+    """Parse ``%d.%m.%Y`` without ``strptime`` when the value is zero padded."""
+    digits = value[:2] + value[3:5] + value[6:]
+    if (
+        len(value) == 10
+        and value[2] == "."
+        and value[5] == "."
+        and digits.isascii()
+        and digits.isdigit()
+    ):
+        return date(int(value[6:]), int(value[3:5]), int(value[:2]))
+    return strptime_date(value, "%d.%m.%Y")
+
+
+DATE_PARSERS = {
+    "%Y-%m-%d": parse_iso_date,
+    "%d.%m.%Y": parse_dotted_date,
+}
+
+
+class MoneyTranslationTable(dict):
+    """``str.translate`` table that drops every character it was not built with.
+
+    Decimal digits are kept. Each other character is looked up once and then
+    stored in the table.
+    """
+
+    def __missing__(self, code):
+        value = code if chr(code).isdecimal() else None
+        self[code] = value
+        return value
+
+
+def money_translation_table(decimal_separator, thousands_separator=""):
+    table = MoneyTranslationTable({ord("-"): ord("-")})
+    if decimal_separator == ",":
+        table[ord(".")] = None
+        table[ord(",")] = ord(".")
+    else:
+        table[ord(".")] = ord(".")
+        table[ord(",")] = None
+    if len(thousands_separator) == 1 and thousands_separator in ",.":
+        table[ord(thousands_separator)] = None
+    return table
+
+
 class CSVRowExtractor:
+    """Read transaction values from the CSV rows of one mapping.
+
+    The columns of each logical field, the chain of date parsers and the
+    money translation table are built once per extractor, not once per row.
+    Parsed dates are memoised, since exports repeat the same few hundred
+    dates. ``csv_row_extractor`` shares one extractor per saved mapping.
+    """
+
+    DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%m/%d/%Y"]
+
     def __init__(self, csv_mapping):
         self.csv_mapping = csv_mapping
+        self.default_currency = csv_mapping.default_currency
+        self.decimal_separator = csv_mapping.decimal_separator
+        self.thousands_separator = csv_mapping.thousands_separator
+        self.date_formats = tuple(
+            dict.fromkeys(
+                [
+                    csv_mapping.date_format,
+                    *(csv_mapping.fallback_date_formats or []),
+                    *self.DATE_FORMATS,
+                ]
+            )
+        )
+        self.date_parsers = tuple(
+            DATE_PARSERS.get(date_format)
+            or partial(strptime_date, date_format=date_format)
+            for date_format in self.date_formats
+        )
+        self.parse_date_text = lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)(
+            self.parse_date_text
+        )
+        self.money_table = money_translation_table(
+            self.decimal_separator, self.thousands_separator
+        )
+        self.columns = {}
+
+    def field_columns(self, logical_field):
+        columns = self.columns.get(logical_field)
+        if columns is None:
+            columns = tuple(
+                str(column)
+                for column in coerce_list(self.csv_mapping.get_column(logical_field))
+            )
+            self.columns[logical_field] = columns
+        return columns
 
     def get_value(self, row, logical_field, default=""):
-        columns = coerce_list(self.csv_mapping.get_column(logical_field))
+        columns = self.field_columns(logical_field)
         if not columns:
             return default
+        if len(columns) == 1:
+            value = row.get(columns[0], "")
+            return default if value in (None, "") else str(value).strip()
 
         values = []
         for column in columns:
-            value = row.get(str(column), "")
+            value = row.get(column, "")
             if value not in (None, ""):
                 values.append(str(value).strip())
 
@@ -1270,13 +2891,12 @@ class CSVRowExtractor:
                 raise ValueError("Transaction date is missing")
             return None
 
-        formats = [self.csv_mapping.date_format]
-        formats.extend(self.csv_mapping.fallback_date_formats or [])
-        formats.extend(["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%m/%d/%Y"])
+        return self.parse_date_text(value)
 
-        for date_format in dict.fromkeys(formats):
+    def parse_date_text(self, value):
+        for parser in self.date_parsers:
             try:
-                return datetime.strptime(value, date_format).date()
+                return parser(value)
             except ValueError:
                 continue
 
@@ -1286,6 +2906,43 @@ class CSVRowExtractor:
             raise ValueError(f"Could not parse date '{value}'") from exc
 
     def parse_money(self, value):
+        raw = str(value or "").strip()
+        if not raw:
+            return Decimal("0.00")
+
+        is_negative = raw[0] == "(" and raw[-1] == ")"
+        if len(self.thousands_separator) > 1:
+            raw = re.sub(r"[^\d,.\-]", "", raw).replace(self.thousands_separator, "")
+        raw = raw.translate(self.money_table)
+        if not raw or raw == "-":
+            return Decimal("0.00")
+
+        try:
+            amount = Decimal(raw).quantize(Decimal("0.01"))
+        except InvalidOperation as exc:
+            raise ValueError(f"Could not parse amount '{value}'") from exc
+
+        return -amount if is_negative else amount
+
+    def parse_date_reference(self, value):
+        """Try ``strptime`` with every format, as imports did before memoising.
+
+        Kept as the reference path for ``benchmark parsing``.
+        """
+        value = str(value or "").strip()
+        for date_format in self.date_formats:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError as exc:
+            raise ValueError(f"Could not parse date '{value}'") from exc
+
+    def parse_money_reference(self, value):
+        """Clean amounts with regex and replace passes, the benchmark reference."""
         raw = str(value or "").replace("\xa0", " ").strip()
         if not raw:
             return Decimal("0.00")
@@ -1294,11 +2951,11 @@ class CSVRowExtractor:
         raw = raw.strip("()")
         raw = re.sub(r"[^\d,.\-]", "", raw)
 
-        if self.csv_mapping.thousands_separator:
-            raw = raw.replace(self.csv_mapping.thousands_separator, "")
+        if self.thousands_separator:
+            raw = raw.replace(self.thousands_separator, "")
         raw = raw.replace(" ", "")
 
-        if self.csv_mapping.decimal_separator == ",":
+        if self.decimal_separator == ",":
             raw = raw.replace(".", "")
             raw = raw.replace(",", ".")
         else:
@@ -1333,14 +2990,14 @@ class CSVRowExtractor:
         )
         posted_date = self.parse_date(self.get_value(row, "posted_date"))
 
-        currency = self.get_value(row, "currency", self.csv_mapping.default_currency)
+        currency = self.get_value(row, "currency", self.default_currency)
         return {
             "original_id": self.get_value(row, "original_id"),
             "transaction_date": transaction_date,
             "posted_date": posted_date,
             "description": self.get_value(row, "description"),
             "amount": amount,
-            "currency": (currency or self.csv_mapping.default_currency).upper()[:3],
+            "currency": (currency or self.default_currency).upper()[:3],
             "counterparty_account_number": self.get_value(
                 row, "counterparty_account_number"
             ),
@@ -1355,111 +3012,513 @@ class CSVRowExtractor:
         }
 
 
+_row_extractors = {}
+ROW_EXTRACTOR_CACHE_SIZE = 32
+
+
+def csv_row_extractor(csv_mapping):
+    """Return the shared extractor of a saved mapping, building it once.
+
+    Extractors are keyed by the mapping id and ``updated_at``, so saving a
+    mapping replaces its extractor. Unsaved mappings get a fresh one.
+    """
+    if csv_mapping._state.adding or csv_mapping.updated_at is None:
+        return CSVRowExtractor(csv_mapping)
+    key = (csv_mapping.id, csv_mapping.updated_at)
+    extractor = _row_extractors.get(key)
+    if extractor is None:
+        if len(_row_extractors) >= ROW_EXTRACTOR_CACHE_SIZE:
+            _row_extractors.clear()
+        extractor = _row_extractors[key] = CSVRowExtractor(csv_mapping)
+    return extractor
+
+
+class DuplicateRef:
+    __slots__ = ("id", "transaction_date", "description", "amount")
+
+    def __init__(self, id, transaction_date, description, amount):
+        self.id = id
+        self.transaction_date = transaction_date
+        self.description = description
+        self.amount = amount
+
+
+def transaction_duplicate_key(data):
+    return (
+        data["transaction_date"],
+        data["amount"],
+        data["description"],
+        data["counterparty_account_number"],
+    )
+
+
+class DuplicateIndex:
+    """Duplicate keys of one bank account, held in memory for an import.
+
+    Rows with an original id only match on that id; other rows match on
+    (date, amount, description, counterparty account). When several
+    transactions share a key the newest one wins, like ``.first()`` with the
+    default transaction ordering.
+    """
+
+    def __init__(self):
+        self.by_original_id = {}
+        self.by_fields = {}
+
+    @classmethod
+    def for_bank_account(cls, bank_account, rows_data=None):
+        """Load existing keys, restricted to ``rows_data`` when it is given."""
+        index = cls()
+        queryset = Transaction.objects.filter(bank_account=bank_account)
+        if rows_data is not None:
+            original_ids = {
+                data["original_id"] for data in rows_data if data.get("original_id")
+            }
+            dates = [
+                data["transaction_date"]
+                for data in rows_data
+                if not data.get("original_id")
+            ]
+            query = Q()
+            if original_ids:
+                query |= Q(original_id__in=original_ids)
+            if dates:
+                query |= Q(transaction_date__range=(min(dates), max(dates)))
+            if not query:
+                return index
+            queryset = queryset.filter(query)
+
+        existing = queryset.order_by("-transaction_date", "-created_at").values_list(
+            "id",
+            "original_id",
+            "transaction_date",
+            "amount",
+            "description",
+            "counterparty_account_number",
+        )
+        for (
+            transaction_id,
+            original_id,
+            transaction_date,
+            amount,
+            description,
+            counterparty_account_number,
+        ) in existing.iterator(chunk_size=5000):
+            duplicate = DuplicateRef(
+                transaction_id, transaction_date, description, amount
+            )
+            if original_id:
+                index.by_original_id.setdefault(original_id, duplicate)
+            index.by_fields.setdefault(
+                (transaction_date, amount, description, counterparty_account_number),
+                duplicate,
+            )
+        return index
+
+    def find(self, data):
+        if data.get("original_id"):
+            return self.by_original_id.get(data["original_id"])
+        return self.by_fields.get(transaction_duplicate_key(data))
+
+    def add(self, transaction_obj, data):
+        if data.get("original_id"):
+            self.by_original_id[data["original_id"]] = transaction_obj
+        self.by_fields[transaction_duplicate_key(data)] = transaction_obj
+
+    def update(self, other):
+        self.by_original_id.update(other.by_original_id)
+        self.by_fields.update(other.by_fields)
+
+
 class CSVImportService:
-    def __init__(self, csv_mapping, bank_account):
+    IMPORT_MODE_ROW = "row"
+    IMPORT_MODE_BATCH = "batch"
+    IMPORT_MODE_CHOICES = [
+        (IMPORT_MODE_ROW, "One transaction per row"),
+        (IMPORT_MODE_BATCH, "Batched inserts"),
+    ]
+    BATCH_SIZE = 1000
+    # The stored report keeps this many examples per outcome. Every row
+    # outcome is stored as an ImportRowResult.
+    REPORT_EXAMPLES = 20
+
+    def __init__(
+        self,
+        csv_mapping,
+        bank_account,
+        import_mode=IMPORT_MODE_BATCH,
+        batch_size=BATCH_SIZE,
+        categorizer=None,
+    ):
         self.csv_mapping = csv_mapping
         self.bank_account = bank_account
-        self.extractor = CSVRowExtractor(csv_mapping)
-        self.categorizer = CategorizationService()
+        self.import_mode = import_mode
+        self.batch_size = max(int(batch_size), 1)
+        self.extractor = csv_row_extractor(csv_mapping)
+        self.categorizer = categorizer or CategorizationService()
+        self.duplicate_index = None
 
-    def import_file(self, file_obj, source_filename="", dry_run=False):
+    def import_file(self, file_obj, source_filename="", dry_run=False, progress=None):
         if dry_run:
             return None, self.preview_file(file_obj, source_filename=source_filename)
 
+        csv_import, report = self._start_import(source_filename)
+        try:
+            rows = self._read_rows(file_obj)
+        except Exception as exc:
+            return self._fail_import(csv_import, report, str(exc))
+
+        self.duplicate_index = DuplicateIndex.for_bank_account(self.bank_account)
+        status = CSVImport.STATUS_COMPLETED
+        batch = []
+        try:
+            for line_number, row in rows:
+                report["loaded"] += 1
+                if self.import_mode == self.IMPORT_MODE_ROW:
+                    self._import_row_into_report(line_number, row, csv_import, report)
+                    if progress and report["loaded"] % self.batch_size == 0:
+                        progress(report["loaded"], None, "Importing rows")
+                    continue
+                batch.append((line_number, row))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch, csv_import, report)
+                    batch = []
+                    if progress:
+                        progress(report["loaded"], None, "Importing rows")
+        except (csv.Error, UnicodeDecodeError) as exc:
+            # Rows are read lazily, so a broken line further down the file only
+            # surfaces after the rows before it have been imported.
+            self._report_error(csv_import, report, None, str(exc))
+            status = CSVImport.STATUS_FAILED
+        if batch:
+            self._import_batch(batch, csv_import, report)
+        return self._finish_import(csv_import, report, status)
+
+    def import_parsed(
+        self, parsed, source_filename="", duplicate_index=None, progress=None
+    ):
+        """Import a statement that ``parse_statement`` reads and extracts.
+
+        Each parsed chunk is written as one batch, like the batch import mode.
+        Pass ``duplicate_index`` to share one index between statements of the
+        same bank account.
+        """
+        csv_import, report = self._start_import(source_filename)
+        if parsed.failed:
+            return self._fail_import(csv_import, report, parsed.error)
+
+        if duplicate_index is None:
+            duplicate_index = DuplicateIndex.for_bank_account(self.bank_account)
+        self.duplicate_index = duplicate_index
+        for chunk in parsed.chunks:
+            extracted = []
+            for line_number, row, data, error in chunk:
+                report["loaded"] += 1
+                if error:
+                    self._report_error(csv_import, report, line_number, error, row)
+                else:
+                    extracted.append((line_number, row, data))
+            self._import_extracted(extracted, csv_import, report)
+            if progress:
+                progress(report["loaded"], None, "Importing rows")
+
+        status = CSVImport.STATUS_COMPLETED
+        if parsed.error:
+            self._report_error(csv_import, report, None, parsed.error)
+            status = CSVImport.STATUS_FAILED
+        return self._finish_import(csv_import, report, status)
+
+    def _start_import(self, source_filename):
         csv_import = CSVImport.objects.create(
             source_filename=source_filename,
             bank_account=self.bank_account,
             csv_mapping=self.csv_mapping,
         )
-
         report = {
             "loaded": 0,
             "created": {
                 "count": 0,
                 "transactions": [],
+                "category_overlap_count": 0,
                 "category_overlaps": [],
+                "uncategorized_count": 0,
                 "uncategorized": [],
             },
             "skipped": {
+                "duplicate_count": 0,
                 "duplicates": [],
+                "error_count": 0,
                 "errors": [],
             },
         }
+        self.row_results = []
+        return csv_import, report
+
+    def _fail_import(self, csv_import, report, error):
+        self._report_error(csv_import, report, None, error)
+        self._save_row_results()
+        csv_import.status = CSVImport.STATUS_FAILED
+        csv_import.report = report
+        csv_import.error_count = 1
+        csv_import.save(update_fields=["status", "report", "error_count", "updated_at"])
+        return csv_import, report
+
+    def _finish_import(self, csv_import, report, status):
+        self._save_row_results()
+        csv_import.loaded_count = report["loaded"]
+        csv_import.created_count = report["created"]["count"]
+        csv_import.skipped_count = report["skipped"]["duplicate_count"]
+        csv_import.error_count = report["skipped"]["error_count"]
+        csv_import.status = status
+        csv_import.report = report
+        csv_import.save()
+        return csv_import, report
+
+    def _add_row_result(self, row_result):
+        self.row_results.append(row_result)
+        if len(self.row_results) >= self.batch_size:
+            self._save_row_results()
+
+    def _save_row_results(self):
+        ImportRowResult.objects.bulk_create(self.row_results)
+        self.row_results = []
+
+    def _add_example(self, examples, example):
+        if len(examples) < self.REPORT_EXAMPLES:
+            examples.append(example)
 
+    def _import_row_into_report(self, line_number, row, csv_import, report):
         try:
-            rows = self._read_rows(file_obj)
+            created_transaction = self._import_row(row, csv_import)
+        except IntegrityError:
+            self._report_duplicate(
+                csv_import, report, line_number, row, reason="Duplicate original id"
+            )
+            return
         except Exception as exc:
-            report["skipped"]["errors"].append({"error": str(exc)})
-            csv_import.status = CSVImport.STATUS_FAILED
-            csv_import.report = report
-            csv_import.error_count = 1
-            csv_import.save(
-                update_fields=["status", "report", "error_count", "updated_at"]
+            self._report_error(csv_import, report, line_number, str(exc), row)
+            return
+
+        if created_transaction is None:
+            self._report_duplicate(
+                csv_import, report, line_number, row, reason="Possible duplicate"
+            )
+            return
+
+        if created_transaction[0] is None:
+            self._report_duplicate(
+                csv_import, report, line_number, row, created_transaction[1]
+            )
+            return
+
+        transaction_obj, categorization = created_transaction
+        self._report_created(
+            csv_import, report, line_number, transaction_obj, categorization
+        )
+
+    def _report_error(self, csv_import, report, line_number, error, row=None):
+        example = {"error": error}
+        if line_number is not None:
+            example = {"line": line_number, "error": error, "row": row}
+        report["skipped"]["error_count"] += 1
+        self._add_example(report["skipped"]["errors"], example)
+        self._add_row_result(
+            ImportRowResult(
+                csv_import=csv_import,
+                line=line_number,
+                outcome=ImportRowResult.OUTCOME_ERROR,
+                message=error,
+                row=row or {},
+            )
+        )
+
+    def _report_duplicate(
+        self,
+        csv_import,
+        report,
+        line_number,
+        row,
+        duplicate=None,
+        reason="Duplicate transaction",
+    ):
+        example = {"line": line_number, "reason": reason, "row": row}
+        if duplicate is not None:
+            example["duplicate_transaction"] = self._duplicate_ref(duplicate)
+        report["skipped"]["duplicate_count"] += 1
+        self._add_example(report["skipped"]["duplicates"], example)
+        self._add_row_result(
+            ImportRowResult(
+                csv_import=csv_import,
+                line=line_number,
+                outcome=ImportRowResult.OUTCOME_DUPLICATE,
+                message=reason,
+                row=row,
+                duplicate_transaction=example.get("duplicate_transaction"),
+            )
+        )
+
+    def _wants_created_example(self, report, categorization):
+        created = report["created"]
+        return (
+            len(created["transactions"]) < self.REPORT_EXAMPLES
+            or (
+                categorization.is_category_overlap
+                and len(created["category_overlaps"]) < self.REPORT_EXAMPLES
+            )
+            or (
+                categorization.is_uncategorized
+                and len(created["uncategorized"]) < self.REPORT_EXAMPLES
             )
-            return csv_import, report
+        )
 
-        report["loaded"] = len(rows)
+    def _report_created(
+        self, csv_import, report, line_number, transaction_obj, categorization
+    ):
+        created = report["created"]
+        if self._wants_created_example(report, categorization):
+            serialized = serialize_transaction(transaction_obj)
+            self._add_example(created["transactions"], serialized)
+            if categorization.is_category_overlap:
+                self._add_example(created["category_overlaps"], serialized)
+            if categorization.is_uncategorized:
+                self._add_example(created["uncategorized"], serialized)
+        created["count"] += 1
+        created["category_overlap_count"] += categorization.is_category_overlap
+        created["uncategorized_count"] += categorization.is_uncategorized
+        self._add_row_result(
+            ImportRowResult(
+                csv_import=csv_import,
+                line=line_number,
+                outcome=ImportRowResult.OUTCOME_CREATED,
+                transaction_id=transaction_obj.id,
+                is_category_overlap=categorization.is_category_overlap,
+                is_uncategorized=categorization.is_uncategorized,
+            )
+        )
 
+    def _import_batch(self, rows, csv_import, report):
+        extracted = []
         for line_number, row in rows:
             try:
-                created_transaction = self._import_row(row, csv_import)
-            except IntegrityError:
-                report["skipped"]["duplicates"].append(
-                    {"line": line_number, "reason": "Duplicate original id", "row": row}
-                )
-                continue
+                extracted.append((line_number, row, self.extractor.extract(row)))
             except Exception as exc:
-                report["skipped"]["errors"].append(
-                    {"line": line_number, "error": str(exc), "row": row}
-                )
+                self._report_error(csv_import, report, line_number, str(exc), row)
+        self._import_extracted(extracted, csv_import, report)
+
+    def _import_extracted(self, extracted, csv_import, report):
+        # Rows of this chunk are only merged into the import's index once they
+        # are inserted, so a failed chunk can be replayed row by row.
+        chunk_index = DuplicateIndex()
+        pending = []
+        for line_number, row, data in extracted:
+            duplicate = chunk_index.find(data) or self.duplicate_index.find(data)
+            if duplicate:
+                self._report_duplicate(csv_import, report, line_number, row, duplicate)
                 continue
 
-            if created_transaction is None:
-                report["skipped"]["duplicates"].append(
-                    {"line": line_number, "reason": "Possible duplicate", "row": row}
+            try:
+                transaction_obj, categorization = self._build_transaction(
+                    data, row, csv_import
                 )
+            except Exception as exc:
+                self._report_error(csv_import, report, line_number, str(exc), row)
                 continue
+            chunk_index.add(transaction_obj, data)
+            pending.append((line_number, row, transaction_obj, categorization))
+
+        if not pending:
+            return
+
+        try:
+            with transaction.atomic():
+                Transaction.objects.bulk_create(
+                    [transaction_obj for _line, _row, transaction_obj, _cat in pending]
+                )
+                TransactionTag.objects.bulk_create(
+                    [
+                        TransactionTag(transaction=transaction_obj, tag=tag)
+                        for _line, _row, transaction_obj, categorization in pending
+                        for tag in categorization.tags
+                    ]
+                )
+                mark_rollups_stale(
+                    transaction_rollup_partition(transaction_obj)
+                    for _line, _row, transaction_obj, _cat in pending
+                )
+        except Exception:
+            # Fall back to one savepoint per row so each line gets its own
+            # duplicate or error outcome, exactly like the row import mode.
+            for line_number, row, _transaction_obj, _categorization in pending:
+                self._import_row_into_report(line_number, row, csv_import, report)
+            return
+
+        self.duplicate_index.update(chunk_index)
+        # Only the report examples need the fully loaded transaction.
+        examples = (
+            Transaction.objects.select_related(
+                "bank_account", "subcategory", "subcategory__category"
+            )
+            .prefetch_related("tags")
+            .in_bulk(
+                [
+                    transaction_obj.id
+                    for _line, _row, transaction_obj, categorization in pending
+                    if self._wants_created_example(report, categorization)
+                ]
+            )
+        )
+        for line_number, _row, transaction_obj, categorization in pending:
+            self._report_created(
+                csv_import,
+                report,
+                line_number,
+                examples.get(transaction_obj.id, transaction_obj),
+                categorization,
+            )
 
-            if created_transaction[0] is None:
-                duplicate = created_transaction[1]
-                report["skipped"]["duplicates"].append(
-                    {
-                        "line": line_number,
-                        "reason": "Duplicate transaction",
-                        "row": row,
-                        "duplicate_transaction": self._duplicate_ref(duplicate),
-                    }
-                )
-                continue
+    def _build_transaction(self, data, row, csv_import):
+        data["bank_account"] = self.bank_account
+        data["import_batch"] = csv_import
+        data["raw_data"] = row
 
-            transaction_obj, categorization = created_transaction
-            serialized = serialize_transaction(transaction_obj)
-            report["created"]["transactions"].append(serialized)
+        categorization_text = self.categorizer.build_categorization_text(
+            data, self.csv_mapping
+        )
+        categorization = self.categorizer.apply(categorization_text, data)
+        data.update(categorization.transaction_values())
+        data["categorization_text"] = self._stored_categorization_text(
+            categorization_text
+        )
 
-            if categorization.is_category_overlap:
-                report["created"]["category_overlaps"].append(serialized)
-            if categorization.is_uncategorized:
-                report["created"]["uncategorized"].append(serialized)
+        transaction_obj = Transaction(**data)
+        # bulk_create() skips Transaction.save(), so apply its normalization here.
+        transaction_obj.currency = str(transaction_obj.currency or "").upper()[:3]
+        transaction_obj.converted_currency = str(
+            transaction_obj.converted_currency or ""
+        ).upper()[:3]
+        transaction_obj.direction = (
+            Direction.INCOME if transaction_obj.amount >= 0 else Direction.EXPENSE
+        )
+        return transaction_obj, categorization
 
-        report["created"]["count"] = len(report["created"]["transactions"])
-        csv_import.loaded_count = report["loaded"]
-        csv_import.created_count = report["created"]["count"]
-        csv_import.skipped_count = len(report["skipped"]["duplicates"])
-        csv_import.error_count = len(report["skipped"]["errors"])
-        csv_import.status = CSVImport.STATUS_COMPLETED
-        csv_import.report = report
-        csv_import.save()
-        return csv_import, report
+    def _stored_categorization_text(self, categorization_text):
+        # Recategorization rebuilds the text from the account's default mapping,
+        # so text built from a different mapping must not be stored.
+        if self.csv_mapping.id != self.bank_account.default_csv_mapping_id:
+            return None
+        return normalize_text(categorization_text)
 
     def preview_file(self, file_obj, source_filename="", sample_size=10):
-        rows, headers = self._read_rows_with_headers(file_obj)
+        rows, headers = self._stream_rows_with_headers(file_obj)
+        sample_rows = list(islice(rows, sample_size))
+        loaded = len(sample_rows) + sum(1 for _row in rows)
         preview = {
             "source_filename": source_filename,
             "bank_account": model_ref(self.bank_account),
             "csv_mapping": model_ref(self.csv_mapping),
             "headers": headers,
-            "loaded": len(rows),
-            "sample_size": min(sample_size, len(rows)),
+            "loaded": loaded,
+            "sample_size": len(sample_rows),
             "rows": [],
             "summary": {
                 "valid": 0,
@@ -1471,7 +3530,10 @@ class CSVImportService:
             },
         }
 
-        for line_number, row in rows[:sample_size]:
+        self.duplicate_index = DuplicateIndex.for_bank_account(
+            self.bank_account, self._extract_valid_rows(sample_rows)
+        )
+        for line_number, row in sample_rows:
             row_preview = self.preview_row(line_number, row)
             preview["rows"].append(row_preview)
             if row_preview["status"] == "error":
@@ -1518,13 +3580,25 @@ class CSVImportService:
             }
 
     def _read_rows(self, file_obj):
-        rows, _headers = self._read_rows_with_headers(file_obj)
+        rows, _headers = self._stream_rows_with_headers(file_obj)
         return rows
 
-    def _read_rows_with_headers(self, file_obj):
-        return read_csv_rows_with_headers(self.csv_mapping, file_obj)
+    def _stream_rows_with_headers(self, file_obj):
+        return stream_csv_rows_with_headers(self.csv_mapping, file_obj)
+
+    def _extract_valid_rows(self, rows):
+        rows_data = []
+        for _line_number, row in rows:
+            try:
+                rows_data.append(self.extractor.extract(row))
+            except Exception:
+                continue
+        return rows_data
 
     def _find_duplicate(self, data):
+        if self.duplicate_index is not None:
+            return self.duplicate_index.find(data)
+
         if data.get("original_id"):
             return Transaction.objects.filter(
                 bank_account=self.bank_account,
@@ -1579,14 +3653,206 @@ class CSVImportService:
         )
         categorization = self.categorizer.apply(categorization_text, data)
         data.update(categorization.transaction_values())
+        data["categorization_text"] = self._stored_categorization_text(
+            categorization_text
+        )
 
         transaction_obj = Transaction.objects.create(**data)
         if categorization.tags:
             transaction_obj.tags.set(categorization.tags)
+        if self.duplicate_index is not None:
+            self.duplicate_index.add(transaction_obj, data)
 
         return transaction_obj, categorization
 
 
+@dataclass
+class StatementFile:
+    """One CSV statement of a multi-file import, possibly inside a ZIP archive."""
+
+    bank_account: object
+    csv_mapping: object
+    path: str
+    member: str = ""
+    source_filename: str = ""
+
+
+@dataclass
+class ParsedStatement:
+    """Rows of one statement in chunks of ``(line_number, row, data, error)``.
+
+    ``failed`` means the file could not be read at all. ``error`` on its own
+    means reading stopped at a broken line after the chunks. ``chunks`` may be
+    a generator that only sets ``error`` once it is exhausted.
+    """
+
+    chunks: object = ()
+    error: str = ""
+    failed: bool = False
+
+
+# Starting worker processes costs more than parsing a few small statements.
+IMPORT_POOL_MIN_BYTES = 4 * 1024 * 1024
+
+
+def import_worker_count():
+    return int(getattr(django_settings, "IMPORT_WORKERS", 0))
+
+
+def statement_archive_members(path):
+    """Return the CSV members of a ZIP archive, or ``None`` for a plain file."""
+    if not zipfile.is_zipfile(path):
+        return None
+    with zipfile.ZipFile(path) as archive:
+        return [
+            info.filename
+            for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(".csv")
+            and not Path(info.filename).name.startswith(".")
+            and not info.filename.startswith("__MACOSX/")
+        ]
+
+
+@contextmanager
+def open_statement_file(path, member=""):
+    if not member:
+        with open(path, "rb") as file_obj:
+            yield file_obj
+        return
+    with zipfile.ZipFile(path) as archive, archive.open(member) as file_obj:
+        yield file_obj
+
+
+def parse_statement(
+    csv_mapping, path, member="", chunk_size=CSVImportService.BATCH_SIZE
+):
+    """Open one statement file and extract its rows lazily, chunk by chunk.
+
+    This also runs in the import worker processes, so it must not touch the
+    database. Categorization and duplicate checks happen in the writer.
+    """
+    extractor = CSVRowExtractor(csv_mapping)
+    parsed = ParsedStatement()
+    stack = ExitStack()
+    try:
+        file_obj = stack.enter_context(open_statement_file(path, member))
+        rows, _headers = stream_csv_rows_with_headers(csv_mapping, file_obj)
+    except Exception as exc:
+        stack.close()
+        parsed.error = str(exc)
+        parsed.failed = True
+        return parsed
+    parsed.chunks = _parsed_chunks(parsed, extractor, rows, stack, chunk_size)
+    return parsed
+
+
+def _parsed_chunks(parsed, extractor, rows, stack, chunk_size):
+    with stack:
+        chunk = []
+        try:
+            for line_number, row in rows:
+                try:
+                    data = extractor.extract(row)
+                except Exception as exc:
+                    chunk.append((line_number, row, None, str(exc)))
+                else:
+                    chunk.append((line_number, row, data, ""))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        except (csv.Error, UnicodeDecodeError) as exc:
+            parsed.error = str(exc)
+        if chunk:
+            yield chunk
+
+
+def parse_statement_in_worker(csv_mapping, path, member=""):
+    """Parse a whole statement in a worker, so the result can be pickled."""
+    parsed = parse_statement(csv_mapping, path, member)
+    parsed.chunks = list(parsed.chunks)
+    return parsed
+
+
+def parse_statements(statements, workers=None):
+    """Yield a ``ParsedStatement`` for each statement file, in order.
+
+    Parsing is CPU bound, so several files are parsed in a pool of worker
+    processes. The workers are spawned rather than forked, because the
+    backend also runs job and request threads. Without an explicit
+    ``workers`` count, batches under ``IMPORT_POOL_MIN_BYTES`` are parsed in
+    this process, one chunk at a time as the writer asks for it.
+    """
+    if workers is None:
+        workers = import_worker_count()
+        paths = {statement.path for statement in statements}
+        if sum(os.path.getsize(path) for path in paths) < IMPORT_POOL_MIN_BYTES:
+            workers = 0
+    if workers <= 0 or len(statements) < 2:
+        for statement in statements:
+            yield parse_statement(
+                statement.csv_mapping, statement.path, statement.member
+            )
+        return
+
+    workers = min(workers, len(statements))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    ) as executor:
+
+        def submit(statement):
+            return executor.submit(
+                parse_statement_in_worker,
+                statement.csv_mapping,
+                statement.path,
+                statement.member,
+            )
+
+        # Only one statement per worker is parsed ahead of the writer, so a
+        # long batch never holds the rows of every file at once.
+        remaining = iter(statements)
+        pending = deque(submit(statement) for statement in islice(remaining, workers))
+        while pending:
+            parsed = pending.popleft().result()
+            pending.extend(submit(statement) for statement in islice(remaining, 1))
+            yield parsed
+
+
+def import_statements(statements, workers=None, progress=None):
+    """Import several statement files and return ``[(csv_import, report)]``.
+
+    Files are parsed in parallel and written one after the other by this
+    caller. Statements of the same bank account share one duplicate index,
+    so overlapping exports do not import a row twice. The caller syncs
+    exchange rates once for the whole batch.
+    """
+    categorizer = CategorizationService()
+    duplicate_indexes = {}
+    results = []
+    parsed_statements = parse_statements(statements, workers=workers)
+    for index, (statement, parsed) in enumerate(zip(statements, parsed_statements)):
+        if progress:
+            progress(index, len(statements), f"Importing {statement.source_filename}")
+        bank_account = statement.bank_account
+        if bank_account.id not in duplicate_indexes:
+            duplicate_indexes[bank_account.id] = DuplicateIndex.for_bank_account(
+                bank_account
+            )
+        service = CSVImportService(
+            statement.csv_mapping, bank_account, categorizer=categorizer
+        )
+        results.append(
+            service.import_parsed(
+                parsed,
+                statement.source_filename,
+                duplicate_index=duplicate_indexes[bank_account.id],
+            )
+        )
+    return results
+
+
 def strict_categorization_text(transaction_data, csv_mapping):
     parts = []
     for field_name in csv_mapping.get_categorization_fields():
@@ -2062,6 +4328,10 @@ def apply_internal_transfer_candidates(
         if subcategory_provided or apply_subcategory:
             update_values["subcategory"] = apply_subcategory
         Transaction.objects.filter(id__in=transaction_ids).update(**update_values)
+        mark_rollups_stale(
+            transaction_rollup_partition(transaction_obj)
+            for transaction_obj in [outgoing_transaction, incoming_transaction]
+        )
         used_transaction_ids.update(transaction_ids)
         match.outgoing_transaction.refresh_from_db()
         match.incoming_transaction.refresh_from_db()
@@ -2076,7 +4346,15 @@ def apply_internal_transfer_candidates(
     }
 
 
-def recategorize_transactions(queryset, include_locked=False):
+def recategorize_transactions(
+    queryset, include_locked=False, progress=None, include_details=True
+):
+    """Re-run keyword categorization for ``queryset`` in chunks.
+
+    Each chunk writes changed columns with one ``bulk_update`` and applies tag
+    differences with one ``bulk_create`` and one ``delete``. With
+    ``include_details=False`` only counts and transaction ids are returned.
+    """
     categorizer = CategorizationService()
 
     def transaction_summary(transaction_obj, data=None):
@@ -2107,160 +4385,330 @@ def recategorize_transactions(queryset, include_locked=False):
         "uncategorized_transaction_ids": [],
         "skipped_transaction_ids": [],
         "skipped_locked_transaction_ids": [],
-        "updated_transactions": [],
-        "unchanged_transactions": [],
-        "uncategorized_transactions": [],
-        "skipped_transactions": [],
-        "skipped_locked_transactions": [],
-        "conflict_details": [],
     }
+    if include_details:
+        stats.update(
+            {
+                "updated_transactions": [],
+                "unchanged_transactions": [],
+                "uncategorized_transactions": [],
+                "skipped_transactions": [],
+                "skipped_locked_transactions": [],
+                "conflict_details": [],
+            }
+        )
 
-    for transaction_obj in queryset.select_related(
-        "bank_account", "bank_account__default_csv_mapping"
-    ).prefetch_related("tags"):
-        stats["processed"] += 1
-        if transaction_obj.is_categorization_locked and not include_locked:
-            stats["skipped_locked"] += 1
-            stats["skipped_locked_transaction_ids"].append(str(transaction_obj.id))
-            stats["skipped_locked_transactions"].append(
-                transaction_summary(transaction_obj)
+    def record(outcome, transaction_obj, data=None):
+        stats[f"{outcome}_transaction_ids"].append(str(transaction_obj.id))
+        if include_details:
+            stats[f"{outcome}_transactions"].append(
+                transaction_summary(transaction_obj, data)
             )
-            continue
 
-        csv_mapping = (
-            transaction_obj.bank_account.default_csv_mapping
-            if transaction_obj.bank_account
-            else None
+    # SQLite does not isolate an open cursor from writes made on the same
+    # connection, so resolve the ids first and load each chunk separately.
+    transaction_ids = list(queryset.values_list("id", flat=True))
+    total = len(transaction_ids)
+    for start in range(0, total, RECATEGORIZE_CHUNK_SIZE):
+        if progress:
+            progress(start, total, "Recategorizing transactions")
+        chunk_ids = transaction_ids[start : start + RECATEGORIZE_CHUNK_SIZE]
+        chunk = (
+            Transaction.objects.select_related(
+                "bank_account", "bank_account__default_csv_mapping"
+            )
+            .prefetch_related("transactiontag_set")
+            .in_bulk(chunk_ids)
         )
-        if not csv_mapping:
-            stats["skipped_no_mapping"] += 1
-            stats["skipped_transaction_ids"].append(str(transaction_obj.id))
-            stats["skipped_transactions"].append(transaction_summary(transaction_obj))
-            continue
 
-        mapped_values = mapped_transaction_values_from_raw_data(
-            transaction_obj, csv_mapping
-        )
-        refreshed_fields = {
-            field_name: value
-            for field_name, value in mapped_values.items()
-            if getattr(transaction_obj, field_name) != value
-        }
+        # Categorization changes repeat the same few value combinations, so
+        # they are written as one UPDATE per combination. Rows with refreshed
+        # raw values carry per-row text and go through bulk_update instead, as
+        # do rows whose stored categorization text was missing or stale.
+        grouped_updates = defaultdict(list)
+        refreshed_rows = []
+        refreshed_update_fields = set()
+        text_rows = []
+        stale_partitions = set()
+        tag_links_to_add = []
+        tag_link_ids_to_delete = []
+        for transaction_id in chunk_ids:
+            transaction_obj = chunk.get(transaction_id)
+            if transaction_obj is None:
+                continue
+            stats["processed"] += 1
+            if transaction_obj.is_categorization_locked and not include_locked:
+                stats["skipped_locked"] += 1
+                record("skipped_locked", transaction_obj)
+                continue
 
-        data = {
-            "bank_account": transaction_obj.bank_account,
-            "bank_account_account_number": (
-                transaction_obj.bank_account.account_number
+            csv_mapping = (
+                transaction_obj.bank_account.default_csv_mapping
                 if transaction_obj.bank_account
-                else ""
-            ),
-        }
-        for field_name in RECATEGORIZABLE_TRANSACTION_FIELDS:
-            data[field_name] = mapped_values.get(
-                field_name, getattr(transaction_obj, field_name)
+                else None
             )
-        text = categorizer.build_categorization_text(data, csv_mapping)
-        result = categorizer.apply(text, data)
+            if not csv_mapping:
+                stats["skipped_no_mapping"] += 1
+                record("skipped", transaction_obj)
+                continue
 
-        if result.is_uncategorized:
-            stats["uncategorized"] += 1
-            stats["uncategorized_transaction_ids"].append(str(transaction_obj.id))
-            stats["uncategorized_transactions"].append(
-                transaction_summary(transaction_obj, data)
+            mapped_values = mapped_transaction_values_from_raw_data(
+                transaction_obj, csv_mapping
             )
-        if result.is_category_overlap:
-            stats["conflicts"] += 1
-            stats["category_overlaps"] += 1
-            stats["conflict_transaction_ids"].append(str(transaction_obj.id))
-            stats["conflict_details"].append(
-                {
-                    "transaction": transaction_summary(transaction_obj, data),
-                    "categorization_text": text,
-                    "categorization": serialize_categorization_result(result),
+            refreshed_fields = {
+                field_name: value
+                for field_name, value in mapped_values.items()
+                if getattr(transaction_obj, field_name) != value
+            }
+
+            data = {
+                "bank_account": transaction_obj.bank_account,
+                "bank_account_account_number": (
+                    transaction_obj.bank_account.account_number
+                    if transaction_obj.bank_account
+                    else ""
+                ),
+            }
+            for field_name in RECATEGORIZABLE_TRANSACTION_FIELDS:
+                data[field_name] = mapped_values.get(
+                    field_name, getattr(transaction_obj, field_name)
+                )
+            text = categorizer.build_categorization_text(data, csv_mapping)
+            result = categorizer.apply(text, data)
+            stored_text = normalize_text(text)
+            text_changed = transaction_obj.categorization_text != stored_text
+            transaction_obj.categorization_text = stored_text
+
+            if result.is_uncategorized:
+                stats["uncategorized"] += 1
+                record("uncategorized", transaction_obj, data)
+
+            # Rows with overlapping top keywords keep their categorization and
+            # only pick up refreshed raw values and the lock change.
+            is_overlap = result.is_category_overlap
+            if is_overlap:
+                stats["conflicts"] += 1
+                stats["category_overlaps"] += 1
+                stats["conflict_transaction_ids"].append(str(transaction_obj.id))
+                if include_details:
+                    stats["conflict_details"].append(
+                        {
+                            "transaction": transaction_summary(transaction_obj, data),
+                            "categorization_text": text,
+                            "categorization": serialize_categorization_result(result),
+                        }
+                    )
+
+            changed_fields = set(refreshed_fields)
+            for field_name, value in refreshed_fields.items():
+                setattr(transaction_obj, field_name, value)
+            if transaction_obj.is_categorization_locked and include_locked:
+                transaction_obj.is_categorization_locked = False
+                changed_fields.add("is_categorization_locked")
+
+            tags_changed = False
+            if not is_overlap:
+                categorization_values = {
+                    "subcategory_id": getattr(result.subcategory, "id", None),
+                    "want_need_investment": result.want_need_investment,
+                    "is_ignored": result.is_ignored,
                 }
-            )
-            lock_changed = transaction_obj.is_categorization_locked and include_locked
-            if refreshed_fields or lock_changed:
-                for field_name, value in refreshed_fields.items():
-                    setattr(transaction_obj, field_name, value)
-                if lock_changed:
-                    transaction_obj.is_categorization_locked = False
-                lock_update_fields = (
-                    ["is_categorization_locked"] if lock_changed else []
+                if any(
+                    getattr(transaction_obj, field_name) != value
+                    for field_name, value in categorization_values.items()
+                ):
+                    for field_name, value in categorization_values.items():
+                        setattr(transaction_obj, field_name, value)
+                    changed_fields.update(categorization_values)
+
+                current_links = {
+                    link.tag_id: link.id
+                    for link in transaction_obj.transactiontag_set.all()
+                }
+                desired_tag_ids = {tag.id for tag in result.tags}
+                tags_changed = current_links.keys() != desired_tag_ids
+                tag_links_to_add.extend(
+                    TransactionTag(transaction_id=transaction_obj.id, tag_id=tag_id)
+                    for tag_id in desired_tag_ids - current_links.keys()
                 )
-                transaction_obj.save(
-                    update_fields=[
-                        *refreshed_fields.keys(),
-                        *lock_update_fields,
-                        "direction",
-                        "updated_at",
-                    ]
+                tag_link_ids_to_delete.extend(
+                    link_id
+                    for tag_id, link_id in current_links.items()
+                    if tag_id not in desired_tag_ids
+                )
+
+            if changed_fields:
+                transaction_obj.direction = (
+                    Direction.INCOME
+                    if transaction_obj.amount >= 0
+                    else Direction.EXPENSE
                 )
+                changed_fields.add("direction")
+            if refreshed_fields:
+                refreshed_rows.append(transaction_obj)
+                refreshed_update_fields.update(changed_fields)
+                refreshed_update_fields.add("categorization_text")
+            else:
+                if changed_fields:
+                    values = tuple(
+                        (field_name, getattr(transaction_obj, field_name))
+                        for field_name in sorted(changed_fields)
+                    )
+                    grouped_updates[values].append(transaction_obj.id)
+                if text_changed:
+                    text_rows.append(transaction_obj)
+
+            if changed_fields:
+                stale_partitions.add(transaction_rollup_partition(transaction_obj))
+            if changed_fields or tags_changed:
                 stats["updated"] += 1
-                stats["updated_transaction_ids"].append(str(transaction_obj.id))
-                stats["updated_transactions"].append(
-                    transaction_summary(transaction_obj, data)
+                record("updated", transaction_obj, data)
+            elif not is_overlap:
+                stats["unchanged"] += 1
+                record("unchanged", transaction_obj, data)
+
+        updated_at = timezone.now()
+        with transaction.atomic():
+            for values, ids in grouped_updates.items():
+                Transaction.objects.filter(id__in=ids).update(
+                    **dict(values), updated_at=updated_at
+                )
+            if refreshed_rows:
+                for transaction_obj in refreshed_rows:
+                    transaction_obj.updated_at = updated_at
+                Transaction.objects.bulk_update(
+                    refreshed_rows, [*sorted(refreshed_update_fields), "updated_at"]
                 )
+            if text_rows:
+                Transaction.objects.bulk_update(text_rows, ["categorization_text"])
+            if tag_link_ids_to_delete:
+                TransactionTag.objects.filter(id__in=tag_link_ids_to_delete).delete()
+            if tag_links_to_add:
+                TransactionTag.objects.bulk_create(tag_links_to_add)
+            mark_rollups_stale(stale_partitions)
+
+    return stats
+
+
+def keyword_match_state(keyword):
+    """Snapshot the keyword fields that decide which texts it can match."""
+    return {
+        "is_active": keyword.is_active,
+        "include_terms": list(keyword.include_terms or []),
+    }
+
+
+def keyword_change_filter(*keyword_states):
+    """Return a ``Q`` for transactions a keyword change can recategorize.
+
+    A transaction can only gain or lose a keyword when its stored text
+    contains every include term of the old or the new keyword version, so
+    other rows keep their result. Rows without stored text are always
+    included. Returns ``None`` when every transaction may be affected.
+    """
+    query = Q(categorization_text__isnull=True)
+    for state in keyword_states:
+        if state is None or not state["is_active"]:
+            continue
+        raw_terms = [term for term in state["include_terms"] if term]
+        if not raw_terms:
             continue
+        terms = {normalize_text(term) for term in raw_terms} - {""}
+        if not terms:
+            return None
+        version_query = Q()
+        for term in sorted(terms):
+            version_query &= Q(categorization_text__contains=term)
+        query |= version_query
+    return query
 
-        scalar_changed = (
-            transaction_obj.subcategory_id != getattr(result.subcategory, "id", None)
-            or transaction_obj.want_need_investment != result.want_need_investment
-            or transaction_obj.is_ignored != result.is_ignored
-        )
-        desired_tags = list(result.tags)
-        desired_tag_ids = {tag.id for tag in desired_tags}
-        current_tag_ids = {tag.id for tag in transaction_obj.tags.all()}
-        tags_changed = current_tag_ids != desired_tag_ids
-        lock_changed = transaction_obj.is_categorization_locked and include_locked
 
-        if scalar_changed or refreshed_fields or lock_changed:
-            for field_name, value in refreshed_fields.items():
-                setattr(transaction_obj, field_name, value)
-            transaction_obj.subcategory = result.subcategory
-            transaction_obj.want_need_investment = result.want_need_investment
-            transaction_obj.is_ignored = result.is_ignored
-            if lock_changed:
-                transaction_obj.is_categorization_locked = False
-            lock_update_fields = ["is_categorization_locked"] if lock_changed else []
-            transaction_obj.save(
-                update_fields=[
-                    *refreshed_fields.keys(),
-                    "subcategory",
-                    "want_need_investment",
-                    "is_ignored",
-                    *lock_update_fields,
-                    "direction",
-                    "updated_at",
-                ]
-            )
-        if tags_changed:
-            transaction_obj.tags.set(desired_tags)
+def recategorize_keyword_change(
+    previous_state, current_state, progress=None, include_details=False
+):
+    """Recategorize only the transactions a keyword edit can affect.
+
+    Pass ``None`` as ``previous_state`` for a new keyword and as
+    ``current_state`` for a deleted one.
+    """
+    queryset = Transaction.objects.filter(is_categorization_locked=False)
+    scope = keyword_change_filter(previous_state, current_state)
+    if scope is not None:
+        queryset = queryset.filter(scope)
+    return recategorize_transactions(
+        queryset, progress=progress, include_details=include_details
+    )
 
-        if scalar_changed or refreshed_fields or tags_changed or lock_changed:
-            stats["updated"] += 1
-            stats["updated_transaction_ids"].append(str(transaction_obj.id))
-            stats["updated_transactions"].append(
-                transaction_summary(transaction_obj, data)
-            )
+
+class DashboardSummaryBuilder:
+    """Collect grouped dashboard amounts into the dashboard summary payload."""
+
+    def __init__(self, default_currency):
+        self.default_currency = default_currency
+        self.missing_conversions = 0
+        self.monthly = {}
+        self.income_categories = {}
+        self.expense_categories = {}
+        self.wni_amounts = defaultdict(Decimal)
+
+    def add(
+        self,
+        month,
+        amount,
+        is_expense,
+        category_name,
+        subcategory_name,
+        category_color,
+        subcategory_color,
+        wni_name,
+    ):
+        month_amounts = self.monthly.setdefault(
+            month, {"income": Decimal("0"), "expense": Decimal("0")}
+        )
+        if is_expense:
+            amount = -amount
+            month_amounts["expense"] += amount
+            categories = self.expense_categories
+            self.wni_amounts[wni_name] += amount
         else:
-            stats["unchanged"] += 1
-            stats["unchanged_transaction_ids"].append(str(transaction_obj.id))
-            stats["unchanged_transactions"].append(
-                transaction_summary(transaction_obj, data)
-            )
+            month_amounts["income"] += amount
+            categories = self.income_categories
+        add_category_amount(
+            categories,
+            category_name,
+            subcategory_name,
+            amount,
+            category_color,
+            subcategory_color,
+        )
 
-    return stats
+    def summary(self):
+        return {
+            "default_currency": self.default_currency,
+            "missing_conversions": self.missing_conversions,
+            "monthly": [
+                {
+                    "month": month.strftime("%Y-%m"),
+                    "income": float(amounts["income"]),
+                    "expense": float(amounts["expense"]),
+                }
+                for month, amounts in sorted(self.monthly.items())
+            ],
+            "income_categories": category_tree(self.income_categories),
+            "expense_categories": category_tree(self.expense_categories),
+            "want_need_investment": [
+                {"name": name, "amount": float(amount)}
+                for name, amount in sorted(self.wni_amounts.items())
+            ],
+        }
 
 
-def build_dashboard_summary(queryset, split_by_owners=False, default_currency=None):
-    default_currency = normalize_currency_code(
-        default_currency or FinanceSettings.load().default_currency
-    )
+def dashboard_amount_expression(default_currency, split_by_owners=False):
+    """SQL expression for a transaction's amount in ``default_currency``.
+
+    It is ``NULL`` when the transaction has no conversion to that currency.
+    """
     amount_field = DecimalField(max_digits=24, decimal_places=8)
-    base_queryset = Transaction.objects.filter(
-        id__in=queryset.order_by().values("id")
-    ).order_by()
     converted_amount = Case(
         When(
             converted_amount__isnull=False,
@@ -2271,154 +4719,87 @@ def build_dashboard_summary(queryset, split_by_owners=False, default_currency=No
         default=Value(None),
         output_field=amount_field,
     )
-    if split_by_owners:
-        amount = ExpressionWrapper(
-            converted_amount / Coalesce(F("bank_account__owners"), Value(1)),
-            output_field=amount_field,
-        )
-    else:
-        amount = converted_amount
-    amount_abs = Case(
-        When(
-            _summary_amount__lt=0,
-            then=ExpressionWrapper(
-                F("_summary_amount") * Value(-1),
-                output_field=amount_field,
-            ),
-        ),
-        default=F("_summary_amount"),
-        output_field=amount_field,
+    if not split_by_owners:
+        return converted_amount
+    return ExpressionWrapper(
+        converted_amount / owner_count_expression(), output_field=amount_field
     )
-    annotated = base_queryset.annotate(_summary_amount=amount)
-    valid = annotated.filter(_summary_amount__isnull=False)
-    summary = {
-        "default_currency": default_currency,
-        "missing_conversions": annotated.filter(_summary_amount__isnull=True).count(),
-        "monthly": [],
-        "income_categories": [],
-        "expense_categories": [],
-        "want_need_investment": [],
-    }
 
-    income_categories = {}
-    expense_categories = {}
 
-    monthly_rows = (
-        valid.annotate(_summary_month=TruncMonth("transaction_date"))
-        .values("_summary_month")
+def owner_count_expression():
+    # SQLite stores whole-number decimals as integers, so divide by a float to
+    # avoid integer division.
+    return Cast(Coalesce(F("bank_account__owners"), Value(1)), FloatField())
+
+
+def build_dashboard_summary(queryset, split_by_owners=False, default_currency=None):
+    """Summarize ``queryset`` for the dashboard with one grouped query.
+
+    Rows are grouped by month, sign, subcategory and want/need/investment, and
+    the monthly, category and want/need/investment sections are built from
+    those groups in Python.
+    """
+    default_currency = normalize_currency_code(
+        default_currency or FinanceSettings.load().default_currency
+    )
+    groups = (
+        Transaction.objects.filter(id__in=queryset.order_by().values("id"))
+        .order_by()
         .annotate(
-            income=Coalesce(
-                Sum(
-                    Case(
-                        When(_summary_amount__gte=0, then=F("_summary_amount")),
-                        default=Value(Decimal("0")),
-                        output_field=amount_field,
-                    )
-                ),
-                Value(Decimal("0")),
-                output_field=amount_field,
-            ),
-            expense=Coalesce(
-                Sum(
-                    Case(
-                        When(_summary_amount__lt=0, then=amount_abs),
-                        default=Value(Decimal("0")),
-                        output_field=amount_field,
-                    )
-                ),
-                Value(Decimal("0")),
-                output_field=amount_field,
+            _summary_amount=dashboard_amount_expression(
+                default_currency, split_by_owners
+            )
+        )
+        .annotate(
+            _summary_month=TruncMonth("transaction_date"),
+            _summary_is_expense=Case(
+                When(_summary_amount__lt=0, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
             ),
         )
-        .order_by("_summary_month")
-    )
-    for row in monthly_rows:
-        month = row["_summary_month"]
-        summary["monthly"].append(
-            {
-                "month": month.strftime("%Y-%m"),
-                "income": float(row["income"] or Decimal("0")),
-                "expense": float(row["expense"] or Decimal("0")),
-            }
+        .values("_summary_month", "_summary_is_expense", **dashboard_group_values())
+        .annotate(
+            amount=Sum("_summary_amount"),
+            valid_count=Count("_summary_amount"),
+            transaction_count=Count("id"),
         )
+    )
+    return summarize_dashboard_groups(groups, "_summary_month", default_currency)
+
 
-    category_values = {
+def dashboard_group_values():
+    return {
         "category_name": Coalesce(
-            F("subcategory__category__name"),
-            Value("Uncategorized"),
+            F("subcategory__category__name"), Value("Uncategorized")
         ),
         "subcategory_name": Coalesce(F("subcategory__name"), Value("Other")),
         "category_color": Coalesce(F("subcategory__category__color"), Value("")),
         "subcategory_color": Coalesce(F("subcategory__color"), Value("")),
+        "wni_name": Coalesce(F("want_need_investment"), Value("uncategorized")),
     }
-    income_category_rows = (
-        valid.filter(_summary_amount__gte=0)
-        .annotate(**category_values)
-        .values(
-            "category_name",
-            "subcategory_name",
-            "category_color",
-            "subcategory_color",
-        )
-        .annotate(amount=Sum("_summary_amount"))
-        .order_by("category_name", "subcategory_name")
-    )
-    for row in income_category_rows:
-        _add_category_amount(
-            income_categories,
-            row["category_name"],
-            row["subcategory_name"],
-            row["amount"] or Decimal("0"),
-            row["category_color"],
-            row["subcategory_color"],
-        )
-
-    expense_category_rows = (
-        valid.filter(_summary_amount__lt=0)
-        .annotate(_summary_abs_amount=amount_abs, **category_values)
-        .values(
-            "category_name",
-            "subcategory_name",
-            "category_color",
-            "subcategory_color",
-        )
-        .annotate(amount=Sum("_summary_abs_amount"))
-        .order_by("category_name", "subcategory_name")
-    )
-    for row in expense_category_rows:
-        _add_category_amount(
-            expense_categories,
-            row["category_name"],
-            row["subcategory_name"],
-            row["amount"] or Decimal("0"),
-            row["category_color"],
-            row["subcategory_color"],
-        )
-
-    wni_rows = (
-        valid.filter(_summary_amount__lt=0)
-        .annotate(
-            _summary_abs_amount=amount_abs,
-            wni_name=Coalesce(
-                F("want_need_investment"),
-                Value("uncategorized"),
-            ),
-        )
-        .values("wni_name")
-        .annotate(amount=Sum("_summary_abs_amount"))
-        .order_by("wni_name")
-    )
 
-    summary["income_categories"] = _category_tree(income_categories)
-    summary["expense_categories"] = _category_tree(expense_categories)
-    summary["want_need_investment"] = [
-        {"name": row["wni_name"], "amount": float(row["amount"] or Decimal("0"))}
-        for row in wni_rows
-    ]
-    return summary
+
+def summarize_dashboard_groups(groups, month_key, default_currency):
+    builder = DashboardSummaryBuilder(default_currency)
+    for group in groups:
+        builder.missing_conversions += group["transaction_count"] - group["valid_count"]
+        if not group["valid_count"]:
+            continue
+        builder.add(
+            group[month_key],
+            group["amount"] or Decimal("0"),
+            group["_summary_is_expense"],
+            group["category_name"],
+            group["subcategory_name"],
+            group["category_color"],
+            group["subcategory_color"],
+            group["wni_name"],
+        )
+    return builder.summary()
 
 
-def _category_tree(grouped_amounts):
+def category_tree(grouped_amounts):
     tree = []
     for category_name, category_data in sorted(grouped_amounts.items()):
         subcategories = category_data["children"]
@@ -2441,7 +4822,7 @@ def _category_tree(grouped_amounts):
     return tree
 
 
-def _add_category_amount(
+def add_category_amount(
     grouped_amounts,
     category_name,
     subcategory_name,
@@ -2463,3 +4844,228 @@ def _add_category_amount(
     if subcategory_color and not subcategory_data["color"]:
         subcategory_data["color"] = subcategory_color
     subcategory_data["amount"] += amount
+
+
+_rollup_signal_state = threading.local()
+
+
+def transaction_rollup_partition(transaction_obj):
+    transaction_date = Transaction._meta.get_field("transaction_date").to_python(
+        transaction_obj.transaction_date
+    )
+    return transaction_date.replace(day=1), transaction_obj.bank_account_id
+
+
+def mark_rollups_stale(partitions):
+    """Queue (month, bank account id) rollup partitions for a rebuild.
+
+    Every transaction write ends up here, so the exchange-rate status is
+    marked stale too.
+    """
+    partitions = set(partitions)
+    if not partitions:
+        return
+    StaleRollupMonth.objects.bulk_create(
+        [
+            StaleRollupMonth(month=month, bank_account_id=bank_account_id)
+            for month, bank_account_id in partitions
+        ],
+        ignore_conflicts=True,
+    )
+    mark_exchange_rate_status_stale()
+
+
+def mark_transaction_rollups_stale(queryset):
+    mark_rollups_stale(
+        queryset.order_by()
+        .annotate(_rollup_month=TruncMonth("transaction_date"))
+        .values_list("_rollup_month", "bank_account_id")
+        .distinct()
+    )
+
+
+def rollup_signals_suspended():
+    return getattr(_rollup_signal_state, "suspended", False)
+
+
+def delete_transactions(queryset):
+    """Delete ``queryset`` and mark its rollup months stale with one query.
+
+    The per-row ``post_delete`` marking is skipped while the delete runs.
+    """
+    with transaction.atomic():
+        mark_transaction_rollups_stale(queryset)
+        _rollup_signal_state.suspended = True
+        try:
+            return queryset.delete()
+        finally:
+            _rollup_signal_state.suspended = False
+
+
+def refresh_stale_rollups():
+    """Rebuild every rollup partition a transaction write has marked stale."""
+    stale = list(StaleRollupMonth.objects.values_list("id", "month", "bank_account_id"))
+    if not stale:
+        return 0
+    with transaction.atomic():
+        StaleRollupMonth.objects.filter(id__in=[row[0] for row in stale]).delete()
+        months_by_account = defaultdict(set)
+        for _stale_id, month, bank_account_id in stale:
+            months_by_account[bank_account_id].add(month)
+        for bank_account_id, months in months_by_account.items():
+            _rebuild_rollup_months(bank_account_id, months)
+            _rebuild_currency_months(bank_account_id, months)
+    return len(stale)
+
+
+def _rollup_months_transactions(bank_account_id, months):
+    last_month = max(months)
+    return (
+        Transaction.objects.filter(
+            bank_account_id=bank_account_id,
+            transaction_date__gte=min(months),
+            transaction_date__lt=(last_month + timedelta(days=32)).replace(day=1),
+        )
+        .order_by()
+        .annotate(_rollup_month=TruncMonth("transaction_date"))
+        .filter(_rollup_month__in=months)
+    )
+
+
+def _rebuild_currency_months(bank_account_id, months):
+    TransactionCurrencyMonth.objects.filter(
+        bank_account_id=bank_account_id, month__in=months
+    ).delete()
+    rows = (
+        _rollup_months_transactions(bank_account_id, months)
+        .values("_rollup_month", "currency")
+        .annotate(
+            _count=Count("id"),
+            _first_date=Min("transaction_date"),
+            _last_date=Max("transaction_date"),
+        )
+    )
+    TransactionCurrencyMonth.objects.bulk_create(
+        [
+            TransactionCurrencyMonth(
+                month=row["_rollup_month"],
+                bank_account_id=bank_account_id,
+                currency=row["currency"],
+                transaction_count=row["_count"],
+                first_transaction_date=row["_first_date"],
+                last_transaction_date=row["_last_date"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def _rebuild_rollup_months(bank_account_id, months):
+    TransactionRollup.objects.filter(
+        bank_account_id=bank_account_id, month__in=months
+    ).delete()
+    rows = (
+        _rollup_months_transactions(bank_account_id, months)
+        .annotate(
+            _has_conversion=Case(
+                When(converted_amount__isnull=False, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            _converted_is_negative=Case(
+                When(converted_amount__lt=0, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+        .values(
+            "_rollup_month",
+            "subcategory_id",
+            "want_need_investment",
+            "direction",
+            "is_ignored",
+            "is_categorization_locked",
+            "currency",
+            "converted_currency",
+            "_has_conversion",
+            "_converted_is_negative",
+        )
+        .annotate(
+            _count=Count("id"),
+            _amount=Sum("amount"),
+            _converted_amount=Sum("converted_amount"),
+        )
+    )
+    TransactionRollup.objects.bulk_create(
+        [
+            TransactionRollup(
+                month=row["_rollup_month"],
+                bank_account_id=bank_account_id,
+                subcategory_id=row["subcategory_id"],
+                want_need_investment=row["want_need_investment"],
+                direction=row["direction"],
+                is_ignored=row["is_ignored"],
+                is_categorization_locked=row["is_categorization_locked"],
+                currency=row["currency"],
+                converted_currency=row["converted_currency"],
+                has_conversion=row["_has_conversion"],
+                converted_is_negative=row["_converted_is_negative"],
+                transaction_count=row["_count"],
+                amount=row["_amount"] or Decimal("0"),
+                converted_amount=row["_converted_amount"] or Decimal("0"),
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def build_dashboard_summary_from_rollups(
+    rollups, split_by_owners=False, default_currency=None
+):
+    """Build the ``build_dashboard_summary`` payload from ``TransactionRollup`` rows.
+
+    ``rollups`` must already be filtered the way the transactions would be.
+    Stale partitions are rebuilt before it is read.
+    """
+    default_currency = normalize_currency_code(
+        default_currency or FinanceSettings.load().default_currency
+    )
+    refresh_stale_rollups()
+    amount_field = DecimalField(max_digits=24, decimal_places=8)
+    uses_conversion = Q(has_conversion=True, converted_currency=default_currency)
+    amount = Case(
+        When(uses_conversion, then=F("converted_amount")),
+        When(currency=default_currency, then=F("amount")),
+        default=Value(None),
+        output_field=amount_field,
+    )
+    if split_by_owners:
+        amount = ExpressionWrapper(
+            amount / owner_count_expression(), output_field=amount_field
+        )
+    groups = (
+        rollups.order_by()
+        .annotate(
+            _summary_amount=amount,
+            _summary_is_expense=Case(
+                When(uses_conversion, then=F("converted_is_negative")),
+                When(direction=Direction.EXPENSE, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+        .values("month", "_summary_is_expense", **dashboard_group_values())
+        .annotate(
+            amount=Sum("_summary_amount"),
+            valid_count=Sum(
+                Case(
+                    When(_summary_amount__isnull=False, then=F("transaction_count")),
+                    default=Value(0),
+                )
+            ),
+            transaction_count=Sum("transaction_count"),
+        )
+    )
+    return summarize_dashboard_groups(groups, "month", default_currency)
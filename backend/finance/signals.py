@@ -0,0 +1,25 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Transaction
+from .services import (
+    mark_rollups_stale,
+    register_sqlite_conversion_functions,
+    rollup_signals_suspended,
+    transaction_rollup_partition,
+)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def mark_transaction_rollup_stale(sender, instance, **kwargs):
+    if rollup_signals_suspended():
+        return
+    mark_rollups_stale([transaction_rollup_partition(instance)])
+
+
+@receiver(connection_created)
+def add_sqlite_conversion_functions(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        register_sqlite_conversion_functions(connection.connection)
@@ -1,54 +1,177 @@
+import gzip
 import json
+import random
 import sqlite3
 import tempfile
+import threading
+import zipfile
 from datetime import date, timedelta
 from decimal import Decimal
-from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
 from pathlib import Path
 from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.http import QueryDict
 from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from .constants import Direction, WantNeedInvestment
+from .jobs import store_job_upload
 from .models import (
     BankAccount,
     CSVImport,
     CSVMapping,
     Category,
     ExchangeRate,
+    ExchangeRateStatus,
     FinanceSettings,
+    ImportRowResult,
     InternalTransferMatch,
+    Job,
     Keyword,
     SavedFilter,
     Subcategory,
     Tag,
+    StaleRollupMonth,
     Transaction,
+    TransactionRollup,
     TransactionTag,
 )
 from .sample_data import SAMPLE_IMPORT_SOURCE, SAMPLE_PREFIX, delete_sample_data
 from .services import (
     CSVImportService,
+    CSVRowExtractor,
     CategorizationService,
     ExchangeRateProviderError,
     FrankfurterExchangeRateProvider,
+    HTTPResponseCache,
+    StatementFile,
+    amount_to_cents,
+    build_dashboard_summary,
+    build_dashboard_summary_from_rollups,
+    build_rate_lookup,
+    cache_exchange_rate_rows,
+    calculate_converted_amount,
+    clear_exchange_rate_index,
+    convert_amounts_in_cents,
+    convert_transactions_in_database,
+    csv_row_extractor,
+    currency_catalogue,
+    delete_transactions,
+    detect_csv_settings,
+    exchange_rate_gaps,
+    import_statements,
+    mark_exchange_rates_changed,
+    merge_exchange_rate_gaps,
+    normalize_text,
+    parse_statement,
     recalculate_transaction_conversions,
+    recategorize_transactions,
+    stream_csv_rows_with_headers,
     sync_missing_exchange_rates,
+    transaction_date_range,
 )
+from .views import dashboard_rollups, transactions_matching_filters
 
 
 def json_body(response):
     return json.loads(response.content.decode("utf-8"))
 
 
+class FakeFrankfurterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.server.requests.append(
+            {
+                "path": parts.path,
+                "query": parse_qs(parts.query),
+                "headers": dict(self.headers),
+                "client": self.client_address,
+            }
+        )
+        etag = self.server.etag
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        status, payload = self.server.respond(parts.path, parse_qs(parts.query))
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if etag:
+            self.send_header("ETag", etag)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeFrankfurterServer:
+    """Local HTTP server that answers like the Frankfurter API."""
+
+    def __init__(self, respond, etag=None):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeFrankfurterHandler)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.respond = respond
+        self.server.etag = etag
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v2"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+class ChunkedFile:
+    def __init__(self, content, chunk_size):
+        self.content = content
+        self.chunk_size = chunk_size
+
+    def chunks(self, chunk_size=None):
+        for start in range(0, len(self.content), self.chunk_size):
+            yield self.content[start : start + self.chunk_size]
+
+
 class FinanceTestCase(TestCase):
     def setUp(self):
+        # Test rollbacks do not reach the process-wide rate index.
+        clear_exchange_rate_index()
+        # Keep provider HTTP caches and uploads out of the source tree.
+        data_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(DATA_DIR=Path(data_dir)))
         self.mapping = CSVMapping.objects.create(
             name="Test Bank",
             date_format="%Y-%m-%d",
@@ -135,74 +258,48 @@ class ModelTests(FinanceTestCase):
             BankAccount.objects.create(name="Duplicate", account_number="123/0100")
 
     def test_frankfurter_provider_sends_json_headers_and_parses_flat_rows(self):
-        captured_requests = []
-
-        class FakeResponse:
-            def __enter__(self):
-                return self
-
-            def __exit__(self, exc_type, exc, traceback):
-                return False
-
-            def read(self):
-                return json.dumps(
-                    [
-                        {
-                            "date": "2024-01-02",
-                            "base": "EUR",
-                            "quote": "CZK",
-                            "rate": 24.726,
-                        }
-                    ]
-                ).encode("utf-8")
-
-        def fake_urlopen(request, timeout):
-            captured_requests.append((request, timeout))
-            return FakeResponse()
-
-        provider = FrankfurterExchangeRateProvider()
-        with patch("finance.services.urlopen", fake_urlopen):
+        def respond(path, query):
+            return 200, [
+                {
+                    "date": "2024-01-02",
+                    "base": "EUR",
+                    "quote": "CZK",
+                    "rate": 24.726,
+                }
+            ]
+
+        with FakeFrankfurterServer(respond) as server:
+            provider = FrankfurterExchangeRateProvider(server.url)
             rows = provider.fetch_rates(
                 "EUR", ["CZK"], date(2024, 1, 2), date(2024, 1, 2)
             )
-
-        request, timeout = captured_requests[0]
-        self.assertEqual(timeout, 30)
-        self.assertEqual(request.get_header("Accept"), "application/json")
-        self.assertEqual(request.get_header("User-agent"), provider.user_agent)
+            provider.close()
+
+        request = server.requests[0]
+        self.assertEqual(provider.timeout, 30)
+        self.assertEqual(request["path"], "/v2/rates")
+        self.assertEqual(request["query"]["quotes"], ["CZK"])
+        self.assertEqual(request["headers"]["Accept"], "application/json")
+        self.assertEqual(request["headers"]["Accept-Encoding"], "gzip")
+        self.assertEqual(request["headers"]["User-Agent"], provider.user_agent)
         self.assertEqual(rows[0]["date"], date(2024, 1, 2))
         self.assertEqual(rows[0]["base_currency"], "EUR")
         self.assertEqual(rows[0]["quote_currency"], "CZK")
         self.assertEqual(rows[0]["rate"], Decimal("24.726"))
 
     def test_frankfurter_provider_parses_currency_rows(self):
-        captured_requests = []
-
-        class FakeResponse:
-            def __enter__(self):
-                return self
-
-            def __exit__(self, exc_type, exc, traceback):
-                return False
-
-            def read(self):
-                return json.dumps(
-                    [
-                        {"iso_code": "CZK", "name": "Czech Koruna"},
-                        {"iso_code": "EUR", "name": "Euro"},
-                    ]
-                ).encode("utf-8")
-
-        def fake_urlopen(request, timeout):
-            captured_requests.append((request, timeout))
-            return FakeResponse()
-
-        provider = FrankfurterExchangeRateProvider()
-        with patch("finance.services.urlopen", fake_urlopen):
+        def respond(path, query):
+            return 200, [
+                {"iso_code": "CZK", "name": "Czech Koruna"},
+                {"iso_code": "EUR", "name": "Euro"},
+            ]
+
+        with FakeFrankfurterServer(respond) as server:
+            provider = FrankfurterExchangeRateProvider(server.url)
             currencies = provider.fetch_currencies()
+            provider.close()
 
-        request, _timeout = captured_requests[0]
-        self.assertIn("/v2/currencies", request.full_url)
+        self.assertEqual(server.requests[0]["path"], "/v2/currencies")
         self.assertEqual(
             currencies,
             [
@@ -211,6 +308,18 @@ class ModelTests(FinanceTestCase):
             ],
         )
 
+    def test_frankfurter_provider_reports_api_error_message(self):
+        def respond(path, query):
+            return 422, {"message": "invalid date range"}
+
+        with FakeFrankfurterServer(respond) as server:
+            provider = FrankfurterExchangeRateProvider(server.url)
+            with self.assertRaisesMessage(
+                ExchangeRateProviderError, "422 invalid date range"
+            ):
+                provider.fetch_currencies()
+            provider.close()
+
     def test_subcategory_derives_category_and_unique_tag_constraint(self):
         transaction_obj = Transaction.objects.create(
             bank_account=self.account,
@@ -381,6 +490,97 @@ class SampleDataCommandTests(TestCase):
         self.assertTrue(Transaction.objects.filter(id=user_transaction.id).exists())
 
 
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        # Test rollbacks do not reach the process-wide rate index.
+        clear_exchange_rate_index()
+
+    def test_categorization_benchmark_matches_reference_and_rolls_back(self):
+        stdout = StringIO()
+
+        call_command(
+            "benchmark",
+            "categorization",
+            "--keywords",
+            "40",
+            "--rows",
+            "200",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+
+        self.assertIn("mismatches: 0", stdout.getvalue())
+        self.assertFalse(Keyword.objects.exists())
+
+    def test_import_benchmark_matches_row_import_and_rolls_back(self):
+        stdout = StringIO()
+
+        call_command(
+            "benchmark",
+            "import",
+            "--keywords",
+            "10",
+            "--rows",
+            "120",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+
+        self.assertIn("mismatches: 0", stdout.getvalue())
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(CSVMapping.objects.exists())
+
+    def test_conversion_benchmark_matches_python_conversion_and_rolls_back(self):
+        stdout = StringIO()
+
+        call_command(
+            "benchmark",
+            "conversion",
+            "--rows",
+            "200",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+
+        self.assertIn("mismatches: 0", stdout.getvalue())
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(ExchangeRate.objects.exists())
+
+    def test_parsing_benchmark_matches_reference_parsers_and_rolls_back(self):
+        stdout = StringIO()
+
+        call_command(
+            "benchmark",
+            "parsing",
+            "--rows",
+            "300",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+
+        self.assertIn("mapping: Sample - Airbank Style CSV Mapping", stdout.getvalue())
+        self.assertIn("mismatches: 0", stdout.getvalue())
+        self.assertFalse(CSVMapping.objects.exists())
+
+    def test_dashboard_benchmark_uses_one_query_and_rolls_back(self):
+        stdout = StringIO()
+
+        call_command(
+            "benchmark",
+            "dashboard",
+            "--rows",
+            "300",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+
+        self.assertIn("reference_queries: 5", stdout.getvalue())
+        self.assertIn("single_pass_queries: 1", stdout.getvalue())
+        self.assertIn("mismatches: 0", stdout.getvalue())
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(TransactionRollup.objects.exists())
+
+
 class CSVImportServiceTests(FinanceTestCase):
     def test_imports_and_categorizes_transactions(self):
         keyword = self.keyword("McDonalds", ["McDonalds"])
@@ -401,6 +601,50 @@ class CSVImportServiceTests(FinanceTestCase):
         self.assertEqual(transaction_obj.want_need_investment, WantNeedInvestment.WANT)
         self.assertIn(self.tag, transaction_obj.tags.all())
 
+    def test_import_report_keeps_counts_and_examples_and_pages_row_results(self):
+        body = "ID,Date,Description,Amount,Currency\n" + "".join(
+            f"tx-{index},2026-01-{index:02d},Shop {index},-{index}.00,CZK\n"
+            for index in range(1, 6)
+        )
+        body += "tx-1,2026-01-01,Shop 1,-1.00,CZK\ntx-9,never,Broken,-1.00,CZK\n"
+
+        with patch.object(CSVImportService, "REPORT_EXAMPLES", 2):
+            csv_import, report = CSVImportService(
+                self.mapping, self.account
+            ).import_file(self.csv_file(body))
+
+        self.assertEqual(report["created"]["count"], 5)
+        self.assertEqual(len(report["created"]["transactions"]), 2)
+        self.assertEqual(report["created"]["uncategorized_count"], 5)
+        self.assertEqual(report["skipped"]["duplicate_count"], 1)
+        self.assertEqual(report["skipped"]["error_count"], 1)
+        self.assertEqual(report["skipped"]["errors"][0]["line"], 8)
+        self.assertEqual((csv_import.skipped_count, csv_import.error_count), (1, 1))
+        self.assertEqual(csv_import.row_results.count(), 7)
+
+        response = self.client.get(
+            f"/api/imports/{csv_import.id}/rows/",
+            {"outcome": ImportRowResult.OUTCOME_CREATED, "limit": "2", "offset": "2"},
+        )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(payload["count"], 5)
+        self.assertEqual(payload["next_offset"], 4)
+        self.assertEqual([item["line"] for item in payload["results"]], [4, 5])
+        self.assertEqual(payload["results"][0]["transaction"]["original_id"], "tx-3")
+
+        duplicates = json_body(
+            self.client.get(
+                f"/api/imports/{csv_import.id}/rows/",
+                {"outcome": ImportRowResult.OUTCOME_DUPLICATE},
+            )
+        )["results"]
+        self.assertEqual(duplicates[0]["row"]["ID"], "tx-1")
+        self.assertEqual(
+            duplicates[0]["duplicate_transaction"]["description"], "Shop 1"
+        )
+
     def test_preview_reports_headers_parsed_rows_and_duplicates(self):
         self.keyword("McDonalds", ["mcdonald"])
         Transaction.objects.create(
@@ -425,6 +669,34 @@ class CSVImportServiceTests(FinanceTestCase):
         self.assertEqual(preview["summary"]["duplicates"], 1)
         self.assertEqual(preview["rows"][0]["categorization"]["status"], "matched")
 
+    def test_duplicate_lookups_do_not_query_per_row(self):
+        def csv_body(row_count):
+            return "ID,Date,Description,Amount,Currency\n" + "".join(
+                f"tx-{index},2026-01-02,Row {index},-1.00,CZK\n"
+                for index in range(row_count)
+            )
+
+        query_counts = []
+        for row_count in [2, 20]:
+            service = CSVImportService(self.mapping, self.account)
+            with CaptureQueriesContext(connection) as queries:
+                service.preview_file(self.csv_file(csv_body(row_count)), sample_size=20)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+        _csv_import, report = CSVImportService(
+            self.mapping,
+            self.account,
+            import_mode=CSVImportService.IMPORT_MODE_ROW,
+        ).import_file(self.csv_file(csv_body(3) + "tx-1,2026-01-03,Again,-2.00,CZK\n"))
+
+        self.assertEqual(report["created"]["count"], 3)
+        self.assertEqual(
+            report["skipped"]["duplicates"][0]["duplicate_transaction"]["id"],
+            str(Transaction.objects.get(original_id="tx-1").id),
+        )
+
     def test_dry_run_does_not_create_transactions(self):
         _csv_import, preview = CSVImportService(self.mapping, self.account).import_file(
             self.csv_file(
@@ -450,6 +722,261 @@ class CSVImportServiceTests(FinanceTestCase):
         self.assertEqual(csv_import.error_count, 1)
         self.assertEqual(report["skipped"]["errors"][0]["line"], 2)
 
+    def test_streaming_reader_handles_values_split_across_chunks(self):
+        content = (
+            "ID;Date;Description;Amount;Currency\r\n"
+            'tx-1;2026-01-02;"Café\r\nsecond line";-12.50;CZK\r\n'
+            "\r\n"
+            "tx-2;2026-01-03;Žabka;-3.00;CZK"
+        ).encode("utf-8")
+        self.mapping.delimiter = ";"
+
+        for chunk_size in [1, 2, 3, 64 * 1024]:
+            rows, headers = stream_csv_rows_with_headers(
+                self.mapping, ChunkedFile(content, chunk_size)
+            )
+            self.assertEqual(headers[0], "ID")
+            self.assertEqual(
+                [(line, row["Description"]) for line, row in rows],
+                [(2, "Café\nsecond line"), (3, "Žabka")],
+            )
+
+    def test_unreadable_line_fails_import_after_earlier_rows(self):
+        content = (
+            b"ID,Date,Description,Amount,Currency\n"
+            b"tx-1,2026-01-02,Valid,-12.50,CZK\n"
+            b"tx-2,2026-01-03,\xff,-1.00,CZK\n"
+        )
+
+        csv_import, report = CSVImportService(self.mapping, self.account).import_file(
+            ChunkedFile(content, 16)
+        )
+
+        self.assertEqual(csv_import.status, csv_import.STATUS_FAILED)
+        self.assertEqual(csv_import.created_count, 1)
+        self.assertIn("utf-8", report["skipped"]["errors"][0]["error"])
+
+    def test_batch_import_matches_row_by_row_import(self):
+        keyword = self.keyword("McDonalds", ["McDonalds"])
+        keyword.tags.add(self.tag)
+        existing = Transaction.objects.create(
+            original_id="tx-1",
+            bank_account=self.account,
+            transaction_date="2026-01-02",
+            description="Existing",
+            amount=Decimal("-1.00"),
+        )
+        content = (
+            "ID,Date,Description,Amount,Currency\n"
+            "tx-1,2026-01-02,Existing,-1.00,CZK\n"
+            "tx-2,2026-01-03,McDonalds Prague,-12.50,czk\n"
+            ",2026-01-04,Coffee,-3.00,CZK\n"
+            ",2026-01-04,Coffee,-3.00,CZK\n"
+            "tx-3,not-a-date,Broken,-1.00,CZK\n"
+            "tx-2,2026-01-05,Repeated id,-2.00,CZK\n"
+            "tx-4,2026-01-06,Salary,1000.00,CZK\n"
+        )
+
+        reports = {}
+        for import_mode in [
+            CSVImportService.IMPORT_MODE_ROW,
+            CSVImportService.IMPORT_MODE_BATCH,
+        ]:
+            Transaction.objects.exclude(id=existing.id).delete()
+            _csv_import, report = CSVImportService(
+                self.mapping, self.account, import_mode=import_mode, batch_size=3
+            ).import_file(self.csv_file(content))
+            reports[import_mode] = report
+
+        row_report = reports[CSVImportService.IMPORT_MODE_ROW]
+        batch_report = reports[CSVImportService.IMPORT_MODE_BATCH]
+        self.assertEqual(batch_report["created"]["count"], 3)
+        self.assertEqual(
+            [
+                (item["description"], item["currency"], item["direction"])
+                for item in batch_report["created"]["transactions"]
+            ],
+            [
+                (item["description"], item["currency"], item["direction"])
+                for item in row_report["created"]["transactions"]
+            ],
+        )
+        self.assertEqual(
+            [
+                (item["line"], item["reason"])
+                for item in batch_report["skipped"]["duplicates"]
+            ],
+            [
+                (2, "Duplicate transaction"),
+                (5, "Duplicate transaction"),
+                (7, "Duplicate transaction"),
+            ],
+        )
+        self.assertEqual(
+            [
+                (item["line"], item["reason"])
+                for item in row_report["skipped"]["duplicates"]
+            ],
+            [
+                (item["line"], item["reason"])
+                for item in batch_report["skipped"]["duplicates"]
+            ],
+        )
+        self.assertEqual(
+            batch_report["skipped"]["duplicates"][0]["duplicate_transaction"]["id"],
+            str(existing.id),
+        )
+        self.assertEqual(
+            [item["line"] for item in batch_report["skipped"]["errors"]], [6]
+        )
+        imported = Transaction.objects.get(original_id="tx-2")
+        self.assertEqual(imported.currency, "CZK")
+        self.assertEqual(imported.subcategory, self.subcategory)
+        self.assertIn(self.tag, imported.tags.all())
+        self.assertEqual(imported.categorization_text, "mcdonaldsprague")
+
+    def test_csv_row_extractor_is_shared_until_the_mapping_is_saved(self):
+        self.mapping.column_map["description"] = ["Description", "Note"]
+        self.mapping.save()
+        extractor = csv_row_extractor(self.mapping)
+
+        self.assertIs(csv_row_extractor(self.mapping), extractor)
+        self.assertIs(CSVImportService(self.mapping, self.account).extractor, extractor)
+        self.assertEqual(
+            extractor.field_columns("description"), ("Description", "Note")
+        )
+        values = extractor.extract(
+            {
+                "ID": "1",
+                "Date": "06.01.2025",
+                "Description": " Coffee ",
+                "Note": "card",
+                "Amount": "-12.50",
+                "Currency": "",
+            }
+        )
+        self.assertEqual(values["transaction_date"], date(2025, 1, 6))
+        self.assertEqual(values["description"], "Coffee card")
+        self.assertEqual(values["amount"], Decimal("-12.50"))
+        self.assertEqual(values["currency"], self.mapping.default_currency)
+
+        self.mapping.column_map["description"] = "Note"
+        self.mapping.save()
+        replaced = csv_row_extractor(self.mapping)
+
+        self.assertIsNot(replaced, extractor)
+        self.assertEqual(replaced.field_columns("description"), ("Note",))
+
+    def test_import_statements_parses_files_in_worker_processes(self):
+        header = "ID,Date,Description,Amount,Currency\n"
+        directory = Path(settings.DATA_DIR)
+        paths = []
+        for index, line in enumerate(
+            [
+                "pool-1,2026-01-02,Lunch,-12.50,CZK\n",
+                "pool-2,02.01.2026,Dinner,-20.00,CZK\npool-3,never,Broken,-1.00,CZK\n",
+            ]
+        ):
+            path = directory / f"statement-{index}.csv"
+            path.write_text(header + line, encoding="utf-8")
+            paths.append(str(path))
+
+        results = import_statements(
+            [
+                StatementFile(self.account, self.mapping, path, source_filename=path)
+                for path in paths
+            ],
+            workers=2,
+        )
+
+        self.assertEqual(
+            [csv_import.created_count for csv_import, _report in results], [1, 1]
+        )
+        self.assertEqual(results[1][1]["skipped"]["errors"][0]["line"], 3)
+        self.assertEqual(
+            Transaction.objects.get(original_id="pool-2").transaction_date,
+            date(2026, 1, 2),
+        )
+
+    def test_parse_statement_reads_chunks_lazily(self):
+        path = Path(settings.DATA_DIR) / "statement.csv"
+        path.write_text(
+            "ID,Date,Description,Amount,Currency\n"
+            "lazy-1,2026-01-02,Lunch,-12.50,CZK\n"
+            "lazy-2,never,Broken,-1.00,CZK\n"
+            "lazy-3,2026-01-03,Dinner,-20.00,CZK\n",
+            encoding="utf-8",
+        )
+
+        parsed = parse_statement(self.mapping, str(path), chunk_size=2)
+        chunks = iter(parsed.chunks)
+        first = next(chunks)
+
+        self.assertEqual([row[0] for row in first], [2, 3])
+        self.assertEqual(first[0][2]["original_id"], "lazy-1")
+        self.assertIsNone(first[1][2])
+        self.assertTrue(first[1][3])
+        self.assertEqual([[row[0] for row in chunk] for chunk in chunks], [[4]])
+        self.assertEqual(parsed.error, "")
+        self.assertFalse(parsed.failed)
+
+        missing = parse_statement(self.mapping, str(path.with_name("missing.csv")))
+        self.assertTrue(missing.failed)
+        self.assertEqual(list(missing.chunks), [])
+
+    def test_job_uploads_keep_their_extension(self):
+        archive = store_job_upload(SimpleUploadedFile("January.ZIP", b"PK"))
+        statement = store_job_upload(SimpleUploadedFile("statement", b"ID\n"))
+
+        self.assertTrue(archive.endswith(".zip"))
+        self.assertTrue(statement.endswith(".csv"))
+
+    def test_extractor_fast_paths_match_the_reference_parsers(self):
+        self.mapping.decimal_separator = ","
+        self.mapping.thousands_separator = " "
+        self.mapping.fallback_date_formats = ["%d.%m.%Y", "%m/%d/%Y"]
+        extractor = CSVRowExtractor(self.mapping)
+
+        for value in [
+            "2025-01-06",
+            "2025-1-6",
+            "06.01.2025",
+            "6.1.2025",
+            "01/31/2025",
+            "2025-01-06T10:00:00",
+            "31.02.2025",
+            "2025-13-01",
+            "soon",
+        ]:
+            with self.subTest(value=value):
+                try:
+                    expected = extractor.parse_date_reference(value)
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        extractor.parse_date(value)
+                else:
+                    self.assertEqual(extractor.parse_date(value), expected)
+        for value in [
+            "-1 234,50",
+            "1\xa0234,5 Kč",
+            "(12,30)",
+            "1.234.567,891",
+            "-",
+            "",
+            "1,2,3",
+        ]:
+            with self.subTest(value=value):
+                try:
+                    expected = extractor.parse_money_reference(value)
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        extractor.parse_money(value)
+                else:
+                    self.assertEqual(extractor.parse_money(value), expected)
+
+        extractor.parse_date("06.01.2025")
+        self.assertGreater(extractor.parse_date_text.cache_info().hits, 0)
+
 
 class CategorizationTests(FinanceTestCase):
     def test_higher_priority_keyword_wins(self):
@@ -495,6 +1022,71 @@ class CategorizationTests(FinanceTestCase):
         self.assertEqual(wni_only.want_need_investment, WantNeedInvestment.INVESTMENT)
         self.assertTrue(own_transfer.is_ignored)
 
+    def test_compiled_matcher_agrees_with_term_scan(self):
+        self.keyword("Tesco", ["tesco"], priority=1)
+        self.keyword("Tesco Fuel", ["tesco", "fuel"], priority=10)
+        self.keyword("Fuel not refund", ["fuel"], exclude_terms=["refund"], priority=5)
+        self.keyword("Overlapping", ["escof"], priority=5)
+        self.keyword("Spaced", ["shell station"], priority=3)
+        self.keyword("Blank include", [" "], exclude_terms=["atm"], priority=0)
+        self.keyword("Blank exclude", ["tesco"], exclude_terms=[" "], priority=20)
+        Keyword.objects.create(name="No terms", include_terms=[], priority=50)
+
+        categorizer = CategorizationService()
+        texts = [
+            "Tesco fuel station",
+            "TESCOFUEL refund",
+            "Shell  Station Prague",
+            "ATM withdrawal",
+            "",
+            "tesc o",
+        ]
+        for text in texts:
+            normalized = normalize_text(text)
+            self.assertEqual(
+                [keyword.id for keyword in categorizer.matcher.match(normalized)],
+                [keyword.id for keyword in categorizer.scan_keywords(normalized)],
+                text,
+            )
+
+        result = categorizer.apply("Tesco fuel station")
+        self.assertEqual(
+            [keyword.name for keyword in result.matched_keywords],
+            ["Tesco Fuel", "Fuel not refund", "Overlapping", "Tesco", "Blank include"],
+        )
+
+    def test_recategorize_diffs_tags_and_can_omit_details(self):
+        keyword = self.keyword("McDonalds", ["mcdonald"])
+        keyword.tags.add(self.tag)
+        stale_tag = Tag.objects.create(name="Stale")
+        transactions = [
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date="2026-01-02",
+                description=description,
+                amount=Decimal("-12.50"),
+            )
+            for description in ["McDonalds Prague", "Unknown shop"]
+        ]
+        transactions[0].tags.add(stale_tag)
+
+        with patch("finance.services.RECATEGORIZE_CHUNK_SIZE", 1):
+            stats = recategorize_transactions(
+                Transaction.objects.all(), include_details=False
+            )
+        repeated = recategorize_transactions(Transaction.objects.all())
+
+        transactions[0].refresh_from_db()
+        self.assertEqual(stats["processed"], 2)
+        self.assertEqual(stats["updated_transaction_ids"], [str(transactions[0].id)])
+        self.assertEqual(stats["unchanged_transaction_ids"], [str(transactions[1].id)])
+        self.assertNotIn("updated_transactions", stats)
+        self.assertEqual(transactions[0].subcategory, self.subcategory)
+        self.assertEqual(list(transactions[0].tags.all()), [self.tag])
+        self.assertEqual(repeated["updated"], 0)
+        self.assertEqual(repeated["unchanged"], 2)
+        self.assertEqual(len(repeated["unchanged_transactions"]), 2)
+
     def test_internal_account_reference_ignore_setting(self):
         BankAccount.objects.create(name="Savings", account_number="456-789/0100")
 
@@ -821,6 +1413,58 @@ class APITests(FinanceTestCase):
         self.assertEqual(payload["detected_settings"]["decimal_separator"], ",")
         self.assertEqual(payload["detected_settings"]["thousands_separator"], " ")
 
+    def test_csv_mapping_column_detection_reads_only_a_prefix_of_large_files(self):
+        rows = [
+            f"api-{index};06.01.2025;Kavárna {index};-1 234,50;CZK"
+            for index in range(400)
+        ]
+        body = "ID;Datum;Popis;Částka;Měna\r\n" + "\r\n".join(rows)
+
+        with (
+            patch("finance.services.CSV_DETECTION_PREFIX_BYTES", 1000),
+            patch(
+                "finance.services.detect_csv_settings", wraps=detect_csv_settings
+            ) as detect_settings,
+        ):
+            response = self.client.post(
+                "/api/csv-mappings/detect-columns/",
+                {"csv_file": self.csv_file(body)},
+            )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 200)
+        # The row count is scaled from the prefix.
+        self.assertTrue(payload["loaded_is_estimate"])
+        self.assertAlmostEqual(payload["loaded"], 400, delta=10)
+        self.assertEqual(payload["headers"], ["ID", "Datum", "Popis", "Částka", "Měna"])
+        self.assertEqual(payload["detected_settings"]["encoding"], "utf-8-sig")
+        self.assertEqual(payload["detected_settings"]["date_format"], "%d.%m.%Y")
+        self.assertEqual(payload["sample_rows"][0]["raw"]["Popis"], "Kavárna 0")
+        # Detection sees only the prefix, cut after a whole line.
+        prefix = detect_settings.call_args.args[0]
+        self.assertLess(len(prefix), 1000)
+        self.assertTrue(prefix.endswith(b"CZK\r\n"))
+
+    def test_csv_mapping_column_detection_ignores_bytes_past_the_prefix(self):
+        rows = [
+            f"api-{index},2025-01-06,Coffee {index},-12.50,CZK".encode("ascii")
+            for index in range(100)
+        ]
+        rows[80] = "api-80,2025-01-06,Káva,-12.50,CZK".encode("cp1250")
+        body = b"ID,Date,Description,Amount,Currency\n" + b"\n".join(rows)
+
+        with patch("finance.services.CSV_DETECTION_PREFIX_BYTES", 1000):
+            response = self.client.post(
+                "/api/csv-mappings/detect-columns/",
+                {"csv_file": SimpleUploadedFile("statement.csv", body)},
+            )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(payload["loaded_is_estimate"])
+        self.assertEqual(payload["sample_rows"][0]["raw"]["Description"], "Coffee 0")
+        self.assertIn("plain ASCII", payload["warnings"][0])
+
     def test_csv_mapping_column_detection_requires_file(self):
         response = self.client.post(
             "/api/csv-mappings/detect-columns/",
@@ -885,6 +1529,47 @@ class APITests(FinanceTestCase):
         self.assertEqual(json_body(visible)["total_count"], 1)
         self.assertEqual(json_body(visible)["limit"], 1)
 
+    def test_transaction_list_cursor_pagination_follows_offset_order(self):
+        for index, transaction_date in enumerate(
+            ["2026-01-05", "2026-01-03", "2026-01-03", "2026-01-03", "2026-01-01"]
+        ):
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date=transaction_date,
+                description=f"Row {index}",
+                amount=Decimal("-1.00"),
+            )
+        offset_ids = [
+            row["id"]
+            for row in json_body(self.client.get("/api/transactions/"))["results"]
+        ]
+
+        cursor_ids = []
+        cursor = ""
+        pages = []
+        while cursor is not None:
+            page = json_body(
+                self.client.get("/api/transactions/", {"cursor": cursor, "limit": 2})
+            )
+            pages.append(page)
+            cursor_ids.extend(row["id"] for row in page["results"])
+            cursor = page["next_cursor"]
+        counted = json_body(
+            self.client.get(
+                "/api/transactions/", {"cursor": "", "include_count": "true"}
+            )
+        )
+        invalid = self.client.get("/api/transactions/", {"cursor": "not-a-cursor"})
+
+        self.assertEqual(len(offset_ids), 5)
+        self.assertEqual(cursor_ids, offset_ids)
+        self.assertEqual([len(page["results"]) for page in pages], [2, 2, 1])
+        self.assertNotIn("count", pages[0])
+        self.assertEqual(counted["count"], 5)
+        self.assertEqual(counted["total_count"], 5)
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(json_body(invalid)["details"]["field"], "cursor")
+
     def test_transaction_list_omits_raw_data_but_exposes_on_demand(self):
         transaction_obj = Transaction.objects.create(
             bank_account=self.account,
@@ -1129,6 +1814,103 @@ class APITests(FinanceTestCase):
         self.assertFalse(payload["exchange_rate_sync"]["synced"])
         self.assertIn("provider unavailable", payload["exchange_rate_sync"]["error"])
 
+    def test_import_keeps_rows_read_before_an_unreadable_line(self):
+        # The broken line sits past the first chunk read from the upload.
+        content = (
+            b"ID,Date,Description,Amount,Currency\n"
+            + b"".join(
+                b"api-%d,2026-01-02,Lunch,-12.50,USD\n" % index for index in range(2500)
+            )
+            + b"api-x,2026-01-03,\xff,-1.00,USD\n"
+        )
+
+        with (
+            override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=1024),
+            patch("finance.views.sync_missing_exchange_rates") as sync_rates,
+        ):
+            sync_rates.return_value = {"created_rates": 0}
+            response = self.client.post(
+                "/api/imports/",
+                {
+                    "bank_account_id": str(self.account.id),
+                    "csv_mapping_id": str(self.mapping.id),
+                    "csv_file": SimpleUploadedFile("broken.csv", content),
+                },
+            )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(payload["import"]["status"], CSVImport.STATUS_FAILED)
+        self.assertGreater(payload["import"]["created_count"], 0)
+        self.assertEqual(
+            Transaction.objects.count(), payload["import"]["created_count"]
+        )
+        self.assertTrue(payload["exchange_rate_sync"]["synced"])
+        sync_rates.assert_called_once()
+
+    def test_statement_import_reads_zip_archives_and_syncs_rates_once(self):
+        savings = BankAccount.objects.create(
+            name="Savings", default_csv_mapping=self.mapping
+        )
+        header = "ID,Date,Description,Amount,Currency\n"
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr(
+                "2026-01/savings.csv",
+                header + "sav-1,2026-01-05,Interest,3.10,CZK\n",
+            )
+            zip_file.writestr("2026-01/readme.txt", "not a statement")
+
+        with patch("finance.views.sync_missing_exchange_rates") as sync_rates:
+            sync_rates.return_value = {"created_rates": 0}
+            response = self.client.post(
+                "/api/imports/statements/",
+                {
+                    "bank_account_id": str(self.account.id),
+                    "file_accounts": json.dumps({"savings.csv": str(savings.id)}),
+                    "files": [
+                        self.csv_file(
+                            header
+                            + "main-1,2026-01-02,Lunch,-12.50,CZK\n"
+                            + "main-2,2026-01-03,Dinner,-20.00,CZK\n"
+                        ),
+                        self.csv_file(header + "main-2,2026-01-03,Dinner,-20.00,CZK\n"),
+                        SimpleUploadedFile("january.zip", archive.getvalue()),
+                    ],
+                },
+            )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [
+                (item["source_filename"], item["bank_account"]["name"])
+                for item in payload["imports"]
+            ],
+            [
+                ("statement.csv", "Main"),
+                ("statement.csv", "Main"),
+                ("january.zip/2026-01/savings.csv", "Savings"),
+            ],
+        )
+        # The second file overlaps the first one and only holds a duplicate.
+        self.assertEqual(
+            [item["created_count"] for item in payload["imports"]], [2, 0, 1]
+        )
+        self.assertEqual(payload["imports"][1]["skipped_count"], 1)
+        self.assertEqual(payload["created_count"], 3)
+        self.assertEqual(Transaction.objects.filter(bank_account=savings).count(), 1)
+        sync_rates.assert_called_once()
+        self.assertEqual(list((settings.DATA_DIR / "job_uploads").iterdir()), [])
+
+        response = self.client.post(
+            "/api/imports/statements/",
+            {"files": [self.csv_file(header)]},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json_body(response)["details"]["field"], "file_accounts")
+        self.assertEqual(list((settings.DATA_DIR / "job_uploads").iterdir()), [])
+
     def test_imports_api_lists_recent_imports(self):
         older = CSVImport.objects.create(
             bank_account=self.account,
@@ -1249,6 +2031,97 @@ class APITests(FinanceTestCase):
             2,
         )
 
+    def test_keyword_changes_recategorize_only_matching_transactions(self):
+        transactions = {
+            description: Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date="2026-01-02",
+                description=description,
+                amount=Decimal("-12.50"),
+            )
+            for description in ["McDonalds Prague", "Burger King Brno", "Unknown shop"]
+        }
+        recategorize_transactions(Transaction.objects.all())
+        transactions["Burger Stand"] = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2026-01-03",
+            description="Burger Stand",
+            amount=Decimal("-5.00"),
+        )
+
+        def subcategory_ids():
+            return {
+                transaction_obj.description: transaction_obj.subcategory_id
+                for transaction_obj in Transaction.objects.all()
+            }
+
+        created = self.post_json(
+            "/api/keywords/",
+            {
+                "name": "Burgers",
+                "include_terms": ["burger"],
+                "subcategory_id": str(self.subcategory.id),
+                "recategorize": True,
+            },
+        )
+        keyword_id = json_body(created)["id"]
+        created_stats = json_body(created)["recategorization"]
+
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(created_stats["processed"], 2)
+        self.assertEqual(created_stats["updated"], 2)
+        self.assertNotIn("updated_transactions", created_stats)
+        self.assertEqual(
+            subcategory_ids(),
+            {
+                "McDonalds Prague": None,
+                "Burger King Brno": self.subcategory.id,
+                "Unknown shop": None,
+                "Burger Stand": self.subcategory.id,
+            },
+        )
+
+        updated = self.patch_json(
+            f"/api/keywords/{keyword_id}/",
+            {"include_terms": ["Mc Donald"], "recategorize": True},
+        )
+        updated_stats = json_body(updated)["recategorization"]
+
+        self.assertEqual(updated_stats["processed"], 3)
+        self.assertEqual(updated_stats["updated"], 3)
+        self.assertEqual(
+            subcategory_ids(),
+            {
+                "McDonalds Prague": self.subcategory.id,
+                "Burger King Brno": None,
+                "Unknown shop": None,
+                "Burger Stand": None,
+            },
+        )
+
+        renamed = self.patch_json(f"/api/keywords/{keyword_id}/", {"name": "Mc"})
+        self.assertNotIn("recategorization", json_body(renamed))
+
+        deleted = self.delete_json(
+            f"/api/keywords/{keyword_id}/", {"recategorize": True}
+        )
+        deleted_payload = json_body(deleted)
+
+        self.assertTrue(deleted_payload["deleted"])
+        self.assertEqual(deleted_payload["recategorization"]["processed"], 1)
+        self.assertEqual(
+            deleted_payload["recategorization"]["uncategorized_transaction_ids"],
+            [str(transactions["McDonalds Prague"].id)],
+        )
+
+        self.patch_json(
+            f"/api/csv-mappings/{self.mapping.id}/",
+            {"categorization_fields": ["counterparty_name"]},
+        )
+        self.assertFalse(
+            Transaction.objects.filter(categorization_text__isnull=False).exists()
+        )
+
     def test_recategorize_uses_current_filters_and_replaces_tags(self):
         stale_tag = Tag.objects.create(name="Old rule")
         Keyword.objects.create(
@@ -1845,22 +2718,421 @@ class APITests(FinanceTestCase):
         self.assertEqual(payload["monthly"], [])
         self.assertEqual(payload["missing_conversions"], 1)
 
-    def test_exchange_rate_sync_caches_flat_provider_rows_and_recalculates(self):
+    def test_single_transaction_edits_reuse_the_shared_rate_index(self):
         settings_obj = FinanceSettings.load()
         settings_obj.default_currency = "CZK"
         settings_obj.save()
+        rate = ExchangeRate.objects.create(
+            date="2024-01-01",
+            base_currency="EUR",
+            quote_currency="CZK",
+            rate=Decimal("25.0000000000"),
+        )
         transaction_obj = Transaction.objects.create(
             bank_account=self.account,
             transaction_date="2024-01-02",
             description="Euro lunch",
             amount=Decimal("-10.00"),
             currency="EUR",
-            subcategory=self.subcategory,
         )
+        single_row = Transaction.objects.filter(id=transaction_obj.id)
+        recalculate_transaction_conversions(single_row, default_currency="CZK")
 
-        class FakeProvider:
-            def fetch_rates(
-                self, base_currency, quote_currencies, start_date, end_date
+        with self.captureOnCommitCallbacks(execute=True):
+            cache_exchange_rate_rows(
+                [
+                    {
+                        "date": date(2024, 1, 2),
+                        "base_currency": "EUR",
+                        "quote_currency": "CZK",
+                        "rate": Decimal("26.0000000000"),
+                    }
+                ]
+            )
+        with CaptureQueriesContext(connection) as queries:
+            recalculate_transaction_conversions(single_row, default_currency="CZK")
+        transaction_obj.refresh_from_db()
+
+        self.assertFalse(
+            any('"finance_exchangerate"' in query["sql"] for query in queries)
+        )
+        self.assertEqual(transaction_obj.converted_amount, Decimal("-260.00"))
+
+        # Another process writing rates only bumps the generation; the index
+        # notices it on the next lookup.
+        ExchangeRate.objects.filter(date="2024-01-02").delete()
+        ExchangeRateStatus.objects.update(rate_generation=F("rate_generation") + 1)
+        recalculate_transaction_conversions(single_row, default_currency="CZK")
+        transaction_obj.refresh_from_db()
+        self.assertEqual(transaction_obj.converted_amount, Decimal("-250.00"))
+
+        rate.delete()
+        mark_exchange_rates_changed()
+        recalculate_transaction_conversions(single_row, default_currency="CZK")
+        transaction_obj.refresh_from_db()
+        self.assertEqual(
+            transaction_obj.conversion_status,
+            Transaction.CONVERSION_STATUS_MISSING_RATE,
+        )
+
+    def test_rolled_back_rate_writes_stay_out_of_the_rate_index(self):
+        transaction_obj = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-02",
+            description="Euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+        single_row = Transaction.objects.filter(id=transaction_obj.id)
+        recalculate_transaction_conversions(single_row, default_currency="CZK")
+
+        with self.assertRaises(RuntimeError):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    cache_exchange_rate_rows(
+                        [
+                            {
+                                "date": date(2024, 1, 2),
+                                "base_currency": "EUR",
+                                "quote_currency": "CZK",
+                                "rate": Decimal("26.0000000000"),
+                            }
+                        ]
+                    )
+                    raise RuntimeError("import failed")
+        recalculate_transaction_conversions(single_row, default_currency="CZK")
+        transaction_obj.refresh_from_db()
+
+        self.assertFalse(ExchangeRate.objects.exists())
+        self.assertEqual(
+            transaction_obj.conversion_status,
+            Transaction.CONVERSION_STATUS_MISSING_RATE,
+        )
+
+    def test_cents_conversion_kernel_matches_decimal_conversion(self):
+        rng = random.Random(7)
+        lookup = {}
+        days = [date(2024, 1, 1) + timedelta(days=offset) for offset in range(60)]
+        # IDR products outgrow the exact integer range for the largest amount.
+        for currency, rate in [("CZK", 25.0), ("USD", 1.1), ("IDR", 17000000.0)]:
+            dates = sorted(rng.sample(days, 40))
+            lookup[currency] = {
+                "dates": dates,
+                "rates": [
+                    Decimal(f"{rate * rng.uniform(0.9, 1.1):.4f}") for _date in dates
+                ],
+            }
+        lookup["CZK"]["rates"][0] = Decimal("24.6500000000")
+        currencies = ["CZK", "czk", "EUR", "USD", "IDR", "PLN"]
+        amounts = [Decimal("0.50"), Decimal("-0.50"), Decimal("999999999999.99")]
+        amounts += [
+            Decimal(rng.randint(-100000000, 100000000)) / 100 for _index in range(400)
+        ]
+        rows = [
+            (
+                date(2023, 12, 30) + timedelta(days=rng.randint(0, 65)),
+                rng.choice(currencies),
+                amount,
+            )
+            for amount in amounts
+        ]
+        rows.append((lookup["CZK"]["dates"][0], "EUR", Decimal("0.50")))
+
+        for target_currency in ["CZK", "EUR", "USD", "IDR"]:
+            results = convert_amounts_in_cents(
+                [row[0] for row in rows],
+                [row[1] for row in rows],
+                [amount_to_cents(row[2]) for row in rows],
+                target_currency,
+                lookup,
+            )
+            for (day, currency, amount), result in zip(rows, results):
+                expected = calculate_converted_amount(
+                    amount, currency, target_currency, day, lookup
+                )
+                self.assertEqual(
+                    (
+                        result["amount_cents"],
+                        result["rate"],
+                        result["rate_date"],
+                        result["status"],
+                    ),
+                    (
+                        (
+                            amount_to_cents(expected["amount"])
+                            if expected["amount"] is not None
+                            else None
+                        ),
+                        expected["rate"],
+                        expected["rate_date"],
+                        expected["status"],
+                    ),
+                )
+
+        # 0.50 EUR at 24.65 is a tie that rounds half to even.
+        tie = convert_amounts_in_cents([rows[-1][0]], ["EUR"], [50], "CZK", lookup)
+        self.assertEqual(tie[0]["amount_cents"], 1232)
+
+    def test_database_conversion_matches_python_conversion(self):
+        for quote, rate in [("CZK", "24.6500000000"), ("USD", "1.0833000000")]:
+            ExchangeRate.objects.create(
+                date="2024-01-01",
+                base_currency="EUR",
+                quote_currency=quote,
+                rate=Decimal(rate),
+            )
+        for index, (currency, amount) in enumerate(
+            [
+                ("EUR", "0.50"),
+                ("EUR", "-1234.57"),
+                # Too large for the integer path at a CZK rate.
+                ("EUR", "-99999999999.99"),
+                ("USD", "-10.01"),
+                ("CZK", "-99.99"),
+                ("PLN", "-5.00"),
+                ("usd", "3.33"),
+            ]
+        ):
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date="2024-01-03",
+                description=f"Row {index}",
+                amount=Decimal(amount),
+                currency=currency,
+            )
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2023-12-31",
+            description="Before the first rate",
+            amount=Decimal("-1.00"),
+            currency="USD",
+        )
+        fields = [
+            "id",
+            "converted_amount",
+            "converted_currency",
+            "conversion_rate",
+            "conversion_rate_date",
+            "conversion_status",
+        ]
+
+        for default_currency in ["CZK", "EUR", "USD"]:
+            python_result = recalculate_transaction_conversions(
+                default_currency=default_currency
+            )
+            expected = list(Transaction.objects.order_by("id").values_list(*fields))
+            Transaction.objects.update(
+                converted_amount=None, converted_currency="", conversion_status=""
+            )
+
+            result = convert_transactions_in_database(default_currency=default_currency)
+            rerun = convert_transactions_in_database(
+                Transaction.objects.filter(currency="EUR"),
+                default_currency=default_currency,
+            )
+
+            self.assertEqual(
+                list(Transaction.objects.order_by("id").values_list(*fields)),
+                expected,
+            )
+            self.assertEqual(result["processed"], 8)
+            self.assertEqual(result["updated"], 8)
+            self.assertEqual(result["missing_rates"], python_result["missing_rates"])
+            self.assertEqual(rerun["processed"], 3)
+            self.assertEqual(rerun["updated"], 0)
+
+        self.patch_json("/api/settings/", {"default_currency": "EUR"})
+        self.patch_json("/api/settings/", {"default_currency": "CZK"})
+        euro_row = Transaction.objects.get(description="Row 0")
+        # 0.50 * 24.65 = 12.325 rounds half to even, as Decimal does.
+        self.assertEqual(euro_row.converted_amount, Decimal("12.32"))
+
+    def test_database_conversion_counts_rows_that_leave_the_scope(self):
+        for currency in ["EUR", "USD"]:
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date="2024-01-03",
+                description=f"{currency} lunch",
+                amount=Decimal("-10.00"),
+                currency=currency,
+            )
+        recalculate_transaction_conversions(default_currency="CZK")
+        ExchangeRate.objects.create(
+            date="2024-01-01",
+            base_currency="EUR",
+            quote_currency="CZK",
+            rate=Decimal("25.0000000000"),
+        )
+        missing = Transaction.objects.filter(
+            conversion_status=Transaction.CONVERSION_STATUS_MISSING_RATE
+        )
+
+        result = convert_transactions_in_database(missing, default_currency="CZK")
+
+        self.assertEqual(result["processed"], 2)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(result["missing_rates"], 1)
+        self.assertEqual(
+            Transaction.objects.get(currency="EUR").converted_amount,
+            Decimal("-250.00"),
+        )
+
+    def test_database_conversion_falls_back_on_old_sqlite(self):
+        ExchangeRate.objects.create(
+            date="2024-01-01",
+            base_currency="EUR",
+            quote_currency="CZK",
+            rate=Decimal("25.0000000000"),
+        )
+        transaction_obj = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-03",
+            description="Euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+
+        with (
+            patch.object(connection.Database, "sqlite_version_info", (3, 34, 1)),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            result = convert_transactions_in_database(default_currency="CZK")
+        transaction_obj.refresh_from_db()
+
+        self.assertFalse(any("RETURNING" in query["sql"] for query in queries))
+        self.assertEqual(result["processed"], 1)
+        self.assertEqual(transaction_obj.converted_amount, Decimal("-250.00"))
+
+    def test_dashboard_rollups_match_live_summary_after_writes(self):
+        shared = BankAccount.objects.create(name="Shared", owners=2)
+        transport = Category.objects.create(name="Transport")
+        fuel = Subcategory.objects.create(name="Fuel", category=transport)
+        ExchangeRate.objects.create(
+            date="2026-01-01",
+            base_currency="EUR",
+            quote_currency="CZK",
+            rate=Decimal("25.0000000000"),
+        )
+        rows = [
+            (self.account, "2026-01-02", "-90.00", "CZK", self.subcategory, True),
+            (self.account, "2026-01-15", "1000.00", "CZK", None, False),
+            (self.account, "2026-02-03", "-10.00", "EUR", fuel, False),
+            (self.account, "2026-02-04", "-5.00", "USD", None, False),
+            (shared, "2026-02-10", "-31.00", "CZK", fuel, False),
+            (None, "2026-03-01", "-7.00", "CZK", None, False),
+        ]
+        transactions = [
+            Transaction.objects.create(
+                bank_account=account,
+                transaction_date=day,
+                description="Rollup row",
+                amount=Decimal(amount),
+                currency=currency,
+                subcategory=subcategory,
+                want_need_investment=WantNeedInvestment.NEED if subcategory else None,
+                is_ignored=ignored,
+            )
+            for account, day, amount, currency, subcategory, ignored in rows
+        ]
+        recalculate_transaction_conversions(default_currency="CZK")
+        transactions[1].tags.add(self.tag)
+
+        filter_sets = [
+            {},
+            {"split_by_owners": "true"},
+            {"include_ignored": "true", "date_from": "2026-02-01"},
+            {"date_to": "2026-01-31", "direction": Direction.EXPENSE},
+            {"category": [str(transport.id), "__unassigned__"]},
+            {"bank_account": str(shared.id), "want_need_investment": "__unassigned__"},
+            {"date_from": "2026-01-10"},
+            {"tag": str(self.tag.id)},
+        ]
+
+        def assert_rollups_match():
+            for filters in filter_sets:
+                params = QueryDict(mutable=True)
+                for key, value in filters.items():
+                    params.setlist(key, value if isinstance(value, list) else [value])
+                expected = build_dashboard_summary(
+                    transactions_matching_filters(params),
+                    split_by_owners=bool(filters.get("split_by_owners")),
+                    default_currency="CZK",
+                )
+                response = self.client.get("/api/dashboard/summary/", filters)
+                self.assertEqual(json_body(response), expected, filters)
+
+        assert_rollups_match()
+        self.assertIsNone(dashboard_rollups(QueryDict("date_from=2026-01-10")))
+        self.assertTrue(TransactionRollup.objects.exists())
+        self.assertFalse(StaleRollupMonth.objects.exists())
+
+        self.patch_json(
+            f"/api/transactions/{transactions[0].id}/",
+            {"transaction_date": "2026-03-05", "bank_account_id": str(shared.id)},
+        )
+        self.post_json(
+            "/api/transactions/bulk-assign/?date_from=2026-02-01",
+            {"subcategory_id": str(self.subcategory.id)},
+        )
+        transactions[5].delete()
+        recategorize_transactions(Transaction.objects.all(), include_locked=True)
+
+        assert_rollups_match()
+
+    def test_default_currency_change_refreshes_dashboard_rollups(self):
+        ExchangeRate.objects.create(
+            date="2026-01-01",
+            base_currency="EUR",
+            quote_currency="CZK",
+            rate=Decimal("25.0000000000"),
+        )
+        for day, amount, currency in [
+            ("2026-01-02", "-250.00", "CZK"),
+            ("2026-02-03", "-10.00", "EUR"),
+        ]:
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date=day,
+                description="Rollup row",
+                amount=Decimal(amount),
+                currency=currency,
+            )
+        recalculate_transaction_conversions(default_currency="CZK")
+        self.assertEqual(
+            build_dashboard_summary_from_rollups(
+                dashboard_rollups(QueryDict()), default_currency="CZK"
+            )["monthly"][1]["expense"],
+            250.0,
+        )
+
+        self.patch_json("/api/settings/", {"default_currency": "EUR"})
+
+        summary = build_dashboard_summary_from_rollups(
+            dashboard_rollups(QueryDict()), default_currency="EUR"
+        )
+        self.assertEqual(
+            summary,
+            build_dashboard_summary(Transaction.objects.all(), default_currency="EUR"),
+        )
+        self.assertEqual(summary["missing_conversions"], 0)
+        self.assertEqual([row["expense"] for row in summary["monthly"]], [10.0, 10.0])
+
+    def test_exchange_rate_sync_caches_flat_provider_rows_and_recalculates(self):
+        settings_obj = FinanceSettings.load()
+        settings_obj.default_currency = "CZK"
+        settings_obj.save()
+        transaction_obj = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-02",
+            description="Euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+            subcategory=self.subcategory,
+        )
+
+        class FakeProvider:
+            def fetch_rates(
+                self, base_currency, quote_currencies, start_date, end_date
             ):
                 self.call = (base_currency, quote_currencies, start_date, end_date)
                 return [
@@ -1890,6 +3162,406 @@ class APITests(FinanceTestCase):
             Transaction.CONVERSION_STATUS_CONVERTED,
         )
 
+    def test_currency_catalogue_follows_transaction_writes(self):
+        lunch = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-02",
+            description="Euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-03-05",
+            description="Euro dinner",
+            amount=Decimal("-20.00"),
+            currency="EUR",
+        )
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-02-10",
+            description="Groceries",
+            amount=Decimal("-300.00"),
+            currency="CZK",
+        )
+
+        self.assertEqual(
+            currency_catalogue()["EUR"],
+            {
+                "transaction_count": 2,
+                "start_date": date(2024, 1, 2),
+                "end_date": date(2024, 3, 5),
+            },
+        )
+        with CaptureQueriesContext(connection) as queries:
+            catalogue = currency_catalogue()
+        self.assertFalse(
+            any('"finance_transaction"' in query["sql"] for query in queries)
+        )
+        self.assertEqual(catalogue["CZK"]["transaction_count"], 1)
+
+        lunch.currency = "USD"
+        lunch.save()
+        catalogue = currency_catalogue()
+        self.assertEqual(catalogue["EUR"]["transaction_count"], 1)
+        self.assertEqual(catalogue["EUR"]["start_date"], date(2024, 3, 5))
+        self.assertEqual(catalogue["USD"]["end_date"], date(2024, 1, 2))
+
+        delete_transactions(Transaction.objects.filter(currency="EUR"))
+        self.assertEqual(sorted(currency_catalogue()), ["CZK", "USD"])
+        self.assertEqual(
+            transaction_date_range(),
+            {"start_date": date(2024, 1, 2), "end_date": date(2024, 2, 10)},
+        )
+
+    def test_exchange_rate_status_is_read_from_the_maintained_record(self):
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-02",
+            description="Euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+
+        first = json_body(self.client.get("/api/exchange-rates/status/"))
+        with CaptureQueriesContext(connection) as queries:
+            second = json_body(self.client.get("/api/exchange-rates/status/"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(second["default_currency"], "CZK")
+        self.assertEqual(second["transaction_currencies"], ["CZK", "EUR"])
+        self.assertEqual(second["required_rate_currencies"], ["CZK"])
+        self.assertEqual(second["transaction_date_from"], "2024-01-02")
+        self.assertEqual(second["missing_converted_transactions"], 1)
+
+        cache_exchange_rate_rows(
+            [
+                {
+                    "date": date(2024, 1, 2),
+                    "base_currency": "EUR",
+                    "quote_currency": "CZK",
+                    "rate": Decimal("25.0000000000"),
+                }
+            ]
+        )
+        self.assertTrue(ExchangeRateStatus.load().is_stale)
+        status = json_body(self.client.get("/api/exchange-rates/status/"))
+        self.assertEqual(status["cached_rate_count"], 1)
+        self.assertEqual(status["latest_cached_rate_date"], "2024-01-02")
+
+        recalculate_transaction_conversions(default_currency="CZK")
+        status = json_body(self.client.get("/api/exchange-rates/status/"))
+        self.assertEqual(status["missing_converted_transactions"], 0)
+
+        # Writes that bypass the transaction services are picked up on refresh.
+        Transaction.objects.update(converted_amount=None)
+        cached = json_body(self.client.get("/api/exchange-rates/status/"))
+        refreshed = json_body(
+            self.client.get("/api/exchange-rates/status/", {"refresh": "1"})
+        )
+        self.assertEqual(cached["missing_converted_transactions"], 0)
+        self.assertEqual(refreshed["missing_converted_transactions"], 1)
+
+    def test_exchange_rate_sync_recalculates_only_rows_new_rates_affect(self):
+        for quote, rate in [("CZK", "25.0000000000"), ("USD", "1.2500000000")]:
+            for rate_date in ["2024-01-01", "2024-01-10"]:
+                ExchangeRate.objects.create(
+                    date=rate_date,
+                    base_currency="EUR",
+                    quote_currency=quote,
+                    rate=Decimal(rate),
+                )
+        rows = [
+            ("2024-01-02", "CZK"),
+            ("2024-01-03", "CZK"),
+            ("2024-01-05", "EUR"),
+            ("2024-01-05", "USD"),
+            ("2024-01-12", "USD"),
+        ]
+        for day, currency in rows:
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date=day,
+                description="Converted earlier",
+                amount=Decimal("-10.00"),
+                currency=currency,
+            )
+        recalculate_transaction_conversions(default_currency="CZK")
+        new_row = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-14",
+            description="Imported later",
+            amount=Decimal("-10.00"),
+            currency="USD",
+        )
+
+        class FakeProvider:
+            def fetch_rates(
+                self, base_currency, quote_currencies, start_date, end_date
+            ):
+                return [
+                    {
+                        "date": date(2024, 1, 13),
+                        "base_currency": "EUR",
+                        "quote_currency": "USD",
+                        "rate": Decimal("1.0000000000"),
+                    }
+                ]
+
+        result = sync_missing_exchange_rates(
+            provider=FakeProvider(), default_currency="CZK"
+        )
+        new_row.refresh_from_db()
+
+        self.assertEqual(result["created_rates"], 1)
+        self.assertEqual(result["recalculation"]["processed"], 1)
+        self.assertEqual(result["recalculation"]["ledger_transactions"], 6)
+        self.assertEqual(new_row.converted_amount, Decimal("-250.00"))
+        self.assertEqual(new_row.conversion_rate_date, date(2024, 1, 13))
+
+    def test_load_exchange_rates_command_reads_zipped_reference_file(self):
+        transaction_obj = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2024-01-06",
+            description="Weekend dollar lunch",
+            amount=Decimal("-10.00"),
+            currency="USD",
+        )
+        recalculate_transaction_conversions(default_currency="CZK")
+        csv_body = (
+            "Date,USD,CZK,RUB,\n"
+            "2024-01-05,1.0921,24.6700,N/A,\n"
+            "2024-01-04,1.0953,24.6350,N/A,\n"
+        )
+        stdout = StringIO()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive_path = Path(temp_dir) / "eurofxref-hist.zip"
+            with zipfile.ZipFile(archive_path, "w") as archive:
+                archive.writestr("eurofxref-hist.csv", csv_body)
+            call_command(
+                "load_exchange_rates",
+                str(archive_path),
+                "--default-currency",
+                "CZK",
+                stdout=stdout,
+            )
+            call_command(
+                "load_exchange_rates",
+                str(archive_path),
+                "--default-currency",
+                "CZK",
+                stdout=stdout,
+            )
+        transaction_obj.refresh_from_db()
+
+        self.assertEqual(ExchangeRate.objects.count(), 4)
+        self.assertIn("Loaded 4 new rates from 4 file rows.", stdout.getvalue())
+        self.assertIn("Loaded 0 new rates from 4 file rows.", stdout.getvalue())
+        self.assertEqual(transaction_obj.converted_amount, Decimal("-225.90"))
+        self.assertEqual(transaction_obj.conversion_rate_date, date(2024, 1, 5))
+
+    def test_load_exchange_rates_command_rejects_unknown_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "rates.csv"
+            path.write_text("Currency,Rate\nUSD,1.1\n", encoding="utf-8")
+            with self.assertRaisesMessage(CommandError, "Date column"):
+                call_command("load_exchange_rates", str(path), stdout=StringIO())
+
+        self.assertFalse(ExchangeRate.objects.exists())
+
+    def test_exchange_rate_planner_refills_interior_gaps_in_one_query(self):
+        business_days = [
+            date(2024, 3, 1) + timedelta(days=offset)
+            for offset in range(120)
+            if (date(2024, 3, 1) + timedelta(days=offset)).weekday() < 5
+        ]
+        # Good Friday and Easter Monday, then a real hole in June for USD.
+        holidays = {date(2024, 3, 29), date(2024, 4, 1)}
+        usd_hole = (date(2024, 6, 3), date(2024, 6, 14))
+        for rate_date in business_days:
+            if rate_date in holidays:
+                continue
+            for quote in ["CZK", "USD"]:
+                if quote == "USD" and usd_hole[0] <= rate_date <= usd_hole[1]:
+                    continue
+                ExchangeRate.objects.create(
+                    date=rate_date,
+                    base_currency="EUR",
+                    quote_currency=quote,
+                    rate=Decimal("1.0000000000"),
+                )
+        for day, currency in [("2024-03-04", "USD"), ("2024-06-28", "USD")]:
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date=day,
+                description="Dollar lunch",
+                amount=Decimal("-10.00"),
+                currency=currency,
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            gaps = exchange_rate_gaps(
+                date(2024, 3, 4), date(2024, 6, 28), ["CZK", "USD"]
+            )
+
+        # One rate query, next to the rate generation check.
+        self.assertEqual(
+            len(
+                [query for query in queries if 'finance_exchangerate"' in query["sql"]]
+            ),
+            1,
+        )
+        self.assertEqual(gaps, [("USD", date(2024, 6, 1), date(2024, 6, 16))])
+        self.assertEqual(
+            merge_exchange_rate_gaps(
+                gaps + [("CZK", date(2024, 9, 1), date(2024, 9, 30))]
+            ),
+            {(date(2024, 6, 1), date(2024, 9, 30)): ["CZK", "USD"]},
+        )
+        self.assertEqual(
+            len(
+                merge_exchange_rate_gaps(
+                    gaps + [("CZK", date(2025, 9, 1), date(2025, 9, 30))]
+                )
+            ),
+            2,
+        )
+
+        class FakeProvider:
+            calls = []
+
+            def fetch_rates(
+                self, base_currency, quote_currencies, start_date, end_date
+            ):
+                self.calls.append((quote_currencies, start_date, end_date))
+                return []
+
+        provider = FakeProvider()
+        sync_missing_exchange_rates(provider=provider, default_currency="CZK")
+        sync_missing_exchange_rates(provider=provider, default_currency="CZK")
+
+        self.assertEqual(
+            provider.calls, [(["USD"], date(2024, 6, 1), date(2024, 6, 16))]
+        )
+
+    def test_exchange_rate_sync_fetches_chunks_concurrently_over_kept_connections(
+        self,
+    ):
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2020-01-02",
+            description="Old euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+        transaction_obj = Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2023-06-01",
+            description="Dollar lunch",
+            amount=Decimal("-10.00"),
+            currency="USD",
+        )
+
+        def respond(path, query):
+            return 200, [
+                {"date": rate_date, "base": "EUR", "quote": quote, "rate": 2}
+                for rate_date in {query["from"][0], query["to"][0]}
+                for quote in query["quotes"][0].split(",")
+            ]
+
+        with (
+            FakeFrankfurterServer(respond) as server,
+            patch.object(FrankfurterExchangeRateProvider, "api_base_url", server.url),
+            override_settings(EXCHANGE_RATE_FETCH_WORKERS=2),
+        ):
+            result = sync_missing_exchange_rates(default_currency="CZK")
+        transaction_obj.refresh_from_db()
+
+        chunk_starts = sorted(
+            request["query"]["from"][0] for request in server.requests
+        )
+        self.assertEqual(
+            chunk_starts, ["2019-12-28", "2021-01-01", "2022-01-06", "2023-01-11"]
+        )
+        self.assertLessEqual(len({request["client"] for request in server.requests}), 2)
+        self.assertEqual(result["fetched_rows"], 16)
+        self.assertEqual(result["created_rates"], 16)
+        self.assertEqual(transaction_obj.converted_amount, Decimal("-10.00"))
+
+    def test_exchange_rate_sync_caches_nothing_when_a_chunk_fails(self):
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2020-01-02",
+            description="Old euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+        Transaction.objects.create(
+            bank_account=self.account,
+            transaction_date="2023-06-01",
+            description="Euro lunch",
+            amount=Decimal("-10.00"),
+            currency="EUR",
+        )
+
+        def respond(path, query):
+            if query["from"][0] == "2022-01-06":
+                return 500, {"message": "upstream unavailable"}
+            return 200, [
+                {"date": query["from"][0], "base": "EUR", "quote": "CZK", "rate": 25}
+            ]
+
+        with (
+            FakeFrankfurterServer(respond) as server,
+            patch.object(FrankfurterExchangeRateProvider, "api_base_url", server.url),
+            override_settings(EXCHANGE_RATE_FETCH_WORKERS=2),
+        ):
+            with self.assertRaisesMessage(
+                ExchangeRateProviderError, "500 upstream unavailable"
+            ):
+                sync_missing_exchange_rates(default_currency="CZK")
+
+        self.assertFalse(ExchangeRate.objects.exists())
+
+    def test_provider_cache_revalidates_and_serves_stale_currencies(self):
+        def respond(path, query):
+            if path.endswith("/currencies"):
+                return 200, {"CZK": "Czech Koruna", "EUR": "Euro"}
+            return 200, [
+                {"date": "2024-01-02", "base": "EUR", "quote": "CZK", "rate": 25}
+            ]
+
+        with (
+            tempfile.TemporaryDirectory() as cache_dir,
+            FakeFrankfurterServer(respond, etag='"v1"') as server,
+        ):
+            cache = HTTPResponseCache(cache_dir)
+            provider = FrankfurterExchangeRateProvider(server.url, cache=cache)
+            first = provider.fetch_currencies()
+            self.assertEqual(provider.fetch_currencies(), first)
+            self.assertEqual(len(server.requests), 1)
+
+            # An expired currency list is served at once and refreshed behind.
+            provider.currencies_max_age = 0
+            with patch.object(threading.Thread, "start", threading.Thread.run):
+                self.assertEqual(provider.fetch_currencies(), first)
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(server.requests[1]["headers"]["If-None-Match"], '"v1"')
+
+            # Expired rates are revalidated before they are returned.
+            provider.rates_max_age = 0
+            day = date(2024, 1, 2)
+            rows = provider.fetch_rates("EUR", ["CZK"], day, day)
+            self.assertEqual(provider.fetch_rates("EUR", ["CZK"], day, day), rows)
+            provider.close()
+
+        self.assertEqual(rows[0]["rate"], Decimal("25"))
+        self.assertEqual(len(server.requests), 4)
+        self.assertNotIn("If-None-Match", server.requests[2]["headers"])
+        self.assertEqual(server.requests[3]["headers"]["If-None-Match"], '"v1"')
+
     def test_maintenance_summary_returns_counts(self):
         csv_import = CSVImport.objects.create(
             bank_account=self.account,
@@ -2034,6 +3706,13 @@ class APITests(FinanceTestCase):
             amount=Decimal("-12.50"),
             subcategory=self.subcategory,
         )
+        ExchangeRate.objects.create(
+            date="2026-01-01",
+            base_currency="EUR",
+            quote_currency="CZK",
+            rate=Decimal("25.0000000000"),
+        )
+        self.assertTrue(build_rate_lookup(["CZK"], date(2026, 1, 2)))
 
         response = self.delete_json(
             "/api/maintenance/finance-data/",
@@ -2054,6 +3733,7 @@ class APITests(FinanceTestCase):
         self.assertFalse(Tag.objects.exists())
         self.assertFalse(Subcategory.objects.exists())
         self.assertFalse(Category.objects.exists())
+        self.assertEqual(build_rate_lookup(["CZK"], date(2026, 1, 2)), {})
 
     def test_maintenance_database_backup_returns_sqlite_attachment(self):
         Transaction.objects.create(
@@ -2143,6 +3823,85 @@ class APITests(FinanceTestCase):
 
 
 @override_settings(ALLOWED_HOSTS=["testserver", "127.0.0.1", "localhost"])
+@override_settings(JOB_WORKERS=0)
+class JobTests(FinanceTestCase):
+    def test_background_import_runs_as_job_and_can_be_polled(self):
+        body = (
+            "ID,Date,Description,Amount,Currency\njob-1,2026-01-02,Lunch,-12.50,CZK\n"
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir, self.settings(
+            DATA_DIR=Path(temp_dir)
+        ):
+            with patch("finance.views.sync_missing_exchange_rates") as sync_rates:
+                sync_rates.return_value = {"created_rates": 0}
+                response = self.client.post(
+                    "/api/imports/",
+                    {
+                        "bank_account_id": str(self.account.id),
+                        "csv_file": self.csv_file(body),
+                        "background": "true",
+                    },
+                )
+            uploads = list((Path(temp_dir) / "job_uploads").iterdir())
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(payload["kind"], Job.KIND_IMPORT_TRANSACTIONS)
+        self.assertEqual(payload["status"], Job.STATUS_COMPLETED)
+        self.assertEqual(payload["result"]["import"]["created_count"], 1)
+        self.assertTrue(payload["result"]["exchange_rate_sync"]["synced"])
+        self.assertEqual(uploads, [])
+        self.assertEqual(Transaction.objects.count(), 1)
+
+        polled = json_body(self.client.get(f"/api/jobs/{payload['id']}/"))
+        self.assertEqual(polled["status"], Job.STATUS_COMPLETED)
+        self.assertEqual(
+            [job["id"] for job in json_body(self.client.get("/api/jobs/"))],
+            [payload["id"]],
+        )
+
+    def test_background_recategorize_keeps_request_filters(self):
+        self.keyword("McDonalds", ["mcdonald"])
+        for transaction_date in ["2025-12-31", "2026-01-02"]:
+            Transaction.objects.create(
+                bank_account=self.account,
+                transaction_date=transaction_date,
+                description="McDonalds Prague",
+                amount=Decimal("-12.50"),
+            )
+
+        response = self.client.post(
+            "/api/transactions/recategorize/?date_from=2026-01-01",
+            data=json.dumps({"background": True}),
+            content_type="application/json",
+        )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(payload["status"], Job.STATUS_COMPLETED)
+        self.assertEqual(payload["result"]["processed"], 1)
+        self.assertEqual(payload["result"]["updated"], 1)
+        self.assertEqual(
+            Transaction.objects.filter(subcategory=self.subcategory).count(), 1
+        )
+
+    def test_failed_background_job_reports_error(self):
+        with patch("finance.views.sync_missing_exchange_rates") as sync_rates:
+            sync_rates.side_effect = ExchangeRateProviderError("provider unavailable")
+            response = self.client.post(
+                "/api/exchange-rates/sync/",
+                data=json.dumps({"background": True}),
+                content_type="application/json",
+            )
+        payload = json_body(response)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(payload["status"], Job.STATUS_FAILED)
+        self.assertEqual(payload["error"], "provider unavailable")
+        self.assertIsNotNone(payload["finished_at"])
+
+
 class MaintenanceRestoreTests(TransactionTestCase):
     def setUp(self):
         self.client = Client()
@@ -2221,11 +3980,22 @@ class MaintenanceRestoreTests(TransactionTestCase):
                 legacy_backup_path = Path(backup.name)
                 backup.write(backup_bytes)
             legacy_connection = sqlite3.connect(str(legacy_backup_path))
+            for table_name in [
+                "finance_internaltransfermatch",
+                "finance_job",
+                "finance_transactionrollup",
+                "finance_stalerollupmonth",
+                "finance_exchangeratestatus",
+                "finance_transactioncurrencymonth",
+                "finance_importrowresult",
+            ]:
+                legacy_connection.execute(f"DROP TABLE IF EXISTS {table_name}")
             legacy_connection.execute(
-                "DROP TABLE IF EXISTS finance_internaltransfermatch"
+                "ALTER TABLE finance_transaction DROP COLUMN categorization_text"
             )
+            legacy_connection.execute("DROP INDEX finance_tra_transac_88e786_idx")
             legacy_connection.execute(
-                "DELETE FROM django_migrations WHERE app = ? AND name = ?",
+                "DELETE FROM django_migrations WHERE app = ? AND name >= ?",
                 ("finance", "0010_internal_transfer_match"),
             )
             legacy_connection.commit()
@@ -123,9 +123,21 @@ urlpatterns = [
         name="recategorize-transactions",
     ),
     path("imports/preview/", views.ImportPreviewView.as_view(), name="import-preview"),
+    path(
+        "imports/<uuid:pk>/rows/",
+        views.ImportRowResultsView.as_view(),
+        name="import-row-results",
+    ),
+    path(
+        "imports/statements/",
+        views.ImportStatementsView.as_view(),
+        name="import-statements",
+    ),
     path(
         "imports/", views.ImportTransactionsView.as_view(), name="import-transactions"
     ),
+    path("jobs/", views.JobCollectionView.as_view(), name="jobs"),
+    path("jobs/<uuid:pk>/", views.JobDetailView.as_view(), name="job-detail"),
     path(
         "dashboard/summary/",
         views.DashboardSummaryView.as_view(),
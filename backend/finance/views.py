@@ -1,7 +1,11 @@
+import binascii
 import json
 import sqlite3
 import tempfile
-from datetime import date, datetime
+import uuid
+import zipfile
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from decimal import InvalidOperation
 from pathlib import Path
@@ -15,6 +19,7 @@ from django.db.models import Q
 from django.http import Http404
 from django.http import HttpResponse
 from django.http import JsonResponse
+from django.http import QueryDict
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
@@ -31,13 +36,17 @@ from .models import (
     ExchangeRate,
     FinanceSettings,
     HEX_COLOR_VALIDATOR,
+    ImportRowResult,
     InternalTransferMatch,
+    Job,
     Keyword,
     SavedFilter,
     Subcategory,
     Tag,
     Transaction,
+    TransactionRollup,
 )
+from .jobs import store_job_upload, submit_job
 from .sample_data import (
     SAMPLE_IMPORT_SOURCE,
     SAMPLE_PREFIX,
@@ -45,11 +54,14 @@ from .sample_data import (
     seed_sample_data,
 )
 from .serializers import (
+    model_ref,
     serialize_bank_account,
     serialize_category,
     serialize_csv_import,
     serialize_csv_mapping,
     serialize_finance_settings,
+    serialize_import_row_result,
+    serialize_job,
     serialize_keyword,
     serialize_saved_filter,
     serialize_subcategory,
@@ -57,22 +69,36 @@ from .serializers import (
     serialize_transaction,
 )
 from .services import (
+    RECATEGORIZABLE_TRANSACTION_FIELDS,
     CSVImportService,
     CategorizationService,
     ExchangeRateProviderError,
+    StatementFile,
     available_currency_options,
     apply_internal_transfer_candidates,
     build_dashboard_summary,
+    build_dashboard_summary_from_rollups,
     build_internal_transfer_candidates,
     build_uncategorized_suggestions,
+    clear_exchange_rate_index,
+    convert_transactions_in_database,
+    delete_transactions,
     detect_csv_columns,
     exchange_rate_status,
     fallback_currency_options,
+    import_statements,
+    keyword_match_state,
+    mark_exchange_rates_changed,
+    mark_rollups_stale,
+    mark_transaction_rollups_stale,
     normalize_currency_code,
+    recategorize_keyword_change,
     recategorize_transactions,
     recalculate_transaction_conversions,
     serialize_categorization_result,
+    statement_archive_members,
     sync_missing_exchange_rates,
+    transaction_rollup_partition,
 )
 
 
@@ -395,7 +421,7 @@ class FinanceSettingsView(JsonView):
             )
         settings_obj.save()
         if settings_obj.default_currency != old_default_currency:
-            recalculate_transaction_conversions(
+            convert_transactions_in_database(
                 default_currency=settings_obj.default_currency
             )
         return json_response(serialize_finance_settings(settings_obj))
@@ -403,7 +429,11 @@ class FinanceSettingsView(JsonView):
 
 class ExchangeRateStatusView(JsonView):
     def get(self, request):
-        return json_response(exchange_rate_status())
+        return json_response(
+            exchange_rate_status(
+                refresh=parse_bool(request.GET.get("refresh"), default=False)
+            )
+        )
 
 
 class ExchangeRateCurrenciesView(JsonView):
@@ -414,8 +444,18 @@ class ExchangeRateCurrenciesView(JsonView):
             return json_response(fallback_currency_options(exc))
 
 
+def run_exchange_rate_sync_job(params, progress):
+    return sync_missing_exchange_rates(progress=progress)
+
+
 class ExchangeRateSyncView(JsonView):
     def post(self, request):
+        data = parse_json_body(request)
+        if parse_bool(data.get("background"), default=False):
+            job = submit_job(
+                Job.KIND_SYNC_EXCHANGE_RATES, {}, run_exchange_rate_sync_job
+            )
+            return json_response(serialize_job(job), status=202)
         try:
             return json_response(sync_missing_exchange_rates())
         except ExchangeRateProviderError as exc:
@@ -511,6 +551,9 @@ class BankAccountDetailView(JsonView):
             account.default_csv_mapping = optional_object(
                 CSVMapping, data["default_csv_mapping_id"], "default_csv_mapping_id"
             )
+            Transaction.objects.filter(bank_account=account).update(
+                categorization_text=None
+            )
         account.save()
         return json_response(serialize_bank_account(account))
 
@@ -669,6 +712,10 @@ class CSVMappingDetailView(JsonView):
                         mapping, field, clean_text(data[field], field, field == "name")
                     )
         mapping.save()
+        if {"column_map", "categorization_fields"} & data.keys():
+            Transaction.objects.filter(
+                bank_account__default_csv_mapping=mapping
+            ).update(categorization_text=None)
         return json_response(serialize_csv_mapping(mapping))
 
     def delete(self, request, pk):
@@ -828,13 +875,26 @@ class KeywordCollectionView(JsonView):
         )
         if data.get("tag_ids"):
             set_tags(keyword, data["tag_ids"])
-        return json_response(serialize_keyword(keyword), status=201)
+        payload = serialize_keyword(keyword)
+        add_keyword_recategorization(payload, data, None, keyword_match_state(keyword))
+        return json_response(payload, status=201)
+
+
+def add_keyword_recategorization(payload, options, previous_state, current_state):
+    if not parse_bool(options.get("recategorize"), default=False):
+        return
+    payload["recategorization"] = recategorize_keyword_change(
+        previous_state,
+        current_state,
+        include_details=parse_bool(options.get("include_details"), default=False),
+    )
 
 
 class KeywordDetailView(JsonView):
     def patch(self, request, pk):
         keyword = get_object_or_404(Keyword, id=pk)
         data = parse_json_body(request)
+        previous_state = keyword_match_state(keyword)
         for field in [
             "name",
             "include_terms",
@@ -868,14 +928,27 @@ class KeywordDetailView(JsonView):
         keyword.save()
         if "tag_ids" in data:
             set_tags(keyword, data["tag_ids"])
-        return json_response(serialize_keyword(keyword))
+        payload = serialize_keyword(keyword)
+        add_keyword_recategorization(
+            payload, data, previous_state, keyword_match_state(keyword)
+        )
+        return json_response(payload)
 
     def delete(self, request, pk):
-        get_object_or_404(Keyword, id=pk).delete()
-        return json_response({"deleted": True})
+        keyword = get_object_or_404(Keyword, id=pk)
+        data = parse_json_body(request)
+        previous_state = keyword_match_state(keyword)
+        keyword.delete()
+        payload = {"deleted": True}
+        add_keyword_recategorization(payload, data, previous_state, None)
+        return json_response(payload)
 
 
 def filtered_transactions(request):
+    return transactions_matching_filters(request.GET)
+
+
+def transactions_matching_filters(params):
     queryset = (
         Transaction.objects.select_related(
             "bank_account", "subcategory", "subcategory__category"
@@ -883,7 +956,6 @@ def filtered_transactions(request):
         .prefetch_related("tags")
         .all()
     )
-    params = request.GET
 
     if not parse_bool(params.get("include_ignored"), default=False):
         queryset = queryset.filter(is_ignored=False)
@@ -908,6 +980,33 @@ def filtered_transactions(request):
         if filter_has_no_selection(params, field_name):
             return queryset.none()
 
+    queryset = filter_transaction_dimensions(queryset, params)
+    tag_values, include_unassigned_tags = split_unassigned_filter(params, "tag")
+    if tag_values or include_unassigned_tags:
+        tag_query = Q()
+        if tag_values:
+            tag_query |= Q(tags__id__in=tag_values)
+        if include_unassigned_tags:
+            tag_query |= Q(tags__isnull=True)
+        # Only the tag join can repeat a transaction.
+        queryset = queryset.filter(tag_query).distinct()
+    if params.get("q"):
+        query = params["q"]
+        queryset = queryset.filter(
+            Q(description__icontains=query)
+            | Q(counterparty_name__icontains=query)
+            | Q(counterparty_account_number__icontains=query)
+            | Q(transaction_type__icontains=query)
+            | Q(counterparty_note__icontains=query)
+            | Q(my_note__icontains=query)
+            | Q(other_note__icontains=query)
+        )
+
+    return queryset
+
+
+def filter_transaction_dimensions(queryset, params):
+    """Apply the filters shared by transactions and ``TransactionRollup`` rows."""
     direction_values = filter_values(params, "direction")
     if direction_values:
         for value in direction_values:
@@ -958,60 +1057,131 @@ def filtered_transactions(request):
         if include_unassigned_subcategory:
             subcategory_query |= Q(subcategory__isnull=True)
         queryset = queryset.filter(subcategory_query)
+    return queryset
 
-    tag_values, include_unassigned_tags = split_unassigned_filter(params, "tag")
-    if tag_values or include_unassigned_tags:
-        tag_query = Q()
-        if tag_values:
-            tag_query |= Q(tags__id__in=tag_values)
-        if include_unassigned_tags:
-            tag_query |= Q(tags__isnull=True)
-        queryset = queryset.filter(tag_query)
-    if params.get("q"):
-        query = params["q"]
-        queryset = queryset.filter(
-            Q(description__icontains=query)
-            | Q(counterparty_name__icontains=query)
-            | Q(counterparty_account_number__icontains=query)
-            | Q(transaction_type__icontains=query)
-            | Q(counterparty_note__icontains=query)
-            | Q(my_note__icontains=query)
-            | Q(other_note__icontains=query)
-        )
 
-    return queryset.distinct()
+def dashboard_rollups(params):
+    """Return the rollup rows for ``params``, or ``None`` to use the live query.
+
+    Rollups cover whole months and carry no tags or text, so tag filters,
+    text search and date bounds inside a month need the transaction table.
+    """
+    if filter_values(params, "tag") or params.get("q"):
+        return None
+    date_from = date_to = None
+    if params.get("date_from"):
+        date_from = parse_date_value(params["date_from"], "date_from")
+        if date_from.day != 1:
+            return None
+    if params.get("date_to"):
+        date_to = parse_date_value(params["date_to"], "date_to")
+        if (date_to + timedelta(days=1)).day != 1:
+            return None
+
+    queryset = TransactionRollup.objects.all()
+    if not parse_bool(params.get("include_ignored"), default=False):
+        queryset = queryset.filter(is_ignored=False)
+    if not parse_bool(params.get("include_locked"), default=False):
+        queryset = queryset.filter(is_categorization_locked=False)
+    if date_from:
+        queryset = queryset.filter(month__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(month__lte=date_to)
+    for field_name in [
+        "direction",
+        "want_need_investment",
+        "bank_account",
+        "category",
+        "subcategory",
+    ]:
+        if filter_has_no_selection(params, field_name):
+            return queryset.none()
+    return filter_transaction_dimensions(queryset, params)
+
+
+TRANSACTION_LIST_ORDERING = ["-transaction_date", "-created_at", "id"]
+
+
+def encode_transaction_cursor(transaction_obj):
+    position = [
+        transaction_obj.transaction_date.isoformat(),
+        transaction_obj.created_at.isoformat(),
+        str(transaction_obj.id),
+    ]
+    return urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+def transactions_after_cursor(queryset, cursor):
+    """Filter ``queryset`` to the rows after ``cursor`` in list ordering."""
+    try:
+        transaction_date, created_at, transaction_id = json.loads(
+            urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        transaction_date = date.fromisoformat(transaction_date)
+        created_at = datetime.fromisoformat(created_at)
+        transaction_id = uuid.UUID(transaction_id)
+    except (TypeError, ValueError, UnicodeError, binascii.Error):
+        raise APIValidationError("Invalid cursor", {"field": "cursor"})
+    return queryset.filter(transaction_date__lte=transaction_date).filter(
+        Q(transaction_date__lt=transaction_date)
+        | Q(transaction_date=transaction_date, created_at__lt=created_at)
+        | Q(
+            transaction_date=transaction_date,
+            created_at=created_at,
+            id__gt=transaction_id,
+        )
+    )
 
 
 class TransactionCollectionView(JsonView):
     def get(self, request):
-        queryset = filtered_transactions(request)
+        queryset = filtered_transactions(request).order_by(*TRANSACTION_LIST_ORDERING)
         settings_obj = FinanceSettings.load()
         split_by_owners = parse_bool(request.GET.get("split_by_owners"), default=False)
         limit = min(
             clean_int(request.GET.get("limit"), "limit", default=500, minimum=1), 10000
         )
-        offset = clean_int(request.GET.get("offset"), "offset", default=0, minimum=0)
-        count = queryset.count()
-        items = queryset[offset : offset + limit]
-        return json_response(
-            {
-                "count": count,
-                "total_count": Transaction.objects.count(),
-                "limit": limit,
-                "offset": offset,
-                "next_offset": offset + limit if offset + limit < count else None,
-                "previous_offset": max(offset - limit, 0) if offset else None,
-                "results": [
-                    serialize_transaction(
-                        transaction,
-                        split_by_owners,
-                        default_currency=settings_obj.default_currency,
-                        include_raw_data=False,
-                    )
-                    for transaction in items
-                ],
-            }
-        )
+        use_cursor = "cursor" in request.GET
+        include_count = parse_bool(
+            request.GET.get("include_count"), default=not use_cursor
+        )
+        payload = {"limit": limit}
+        if include_count:
+            payload["count"] = queryset.count()
+            payload["total_count"] = Transaction.objects.count()
+
+        if use_cursor:
+            # Keyset pagination: each page seeks past the last row of the
+            # previous one, so deep pages cost the same as the first.
+            if request.GET["cursor"]:
+                queryset = transactions_after_cursor(queryset, request.GET["cursor"])
+            items = list(queryset[: limit + 1])
+            payload["next_cursor"] = (
+                encode_transaction_cursor(items[limit - 1])
+                if len(items) > limit
+                else None
+            )
+            items = items[:limit]
+        else:
+            offset = clean_int(
+                request.GET.get("offset"), "offset", default=0, minimum=0
+            )
+            items = list(queryset[offset : offset + limit + 1])
+            payload["offset"] = offset
+            payload["next_offset"] = offset + limit if len(items) > limit else None
+            payload["previous_offset"] = max(offset - limit, 0) if offset else None
+            items = items[:limit]
+
+        payload["results"] = [
+            serialize_transaction(
+                transaction,
+                split_by_owners,
+                default_currency=settings_obj.default_currency,
+                include_raw_data=False,
+            )
+            for transaction in items
+        ]
+        return json_response(payload)
 
     def post(self, request):
         data = parse_json_body(request)
@@ -1179,6 +1349,7 @@ class TransactionDetailView(JsonView):
             id=pk,
         )
         data = parse_json_body(request)
+        previous_rollup_partition = transaction_rollup_partition(transaction)
         lock_trigger_fields = {
             "subcategory_id",
             "want_need_investment",
@@ -1238,7 +1409,10 @@ class TransactionDetailView(JsonView):
             )
         if should_lock_categorization:
             transaction.is_categorization_locked = True
+        if {*RECATEGORIZABLE_TRANSACTION_FIELDS, "bank_account_id"} & data.keys():
+            transaction.categorization_text = None
         transaction.save()
+        mark_rollups_stale([previous_rollup_partition])
         if "tag_ids" in data:
             set_tags(transaction, data["tag_ids"])
         settings_obj = FinanceSettings.load()
@@ -1275,16 +1449,49 @@ class TransactionRawDataView(JsonView):
         )
 
 
+def recategorize_queryset(filters, transaction_ids):
+    queryset = transactions_matching_filters(filters)
+    if transaction_ids:
+        queryset = queryset.filter(id__in=transaction_ids)
+    return queryset
+
+
+def run_recategorize_job(params, progress):
+    return recategorize_transactions(
+        recategorize_queryset(QueryDict(params["filters"]), params["transaction_ids"]),
+        include_locked=params["include_locked"],
+        include_details=params.get("include_details", True),
+        progress=progress,
+    )
+
+
 class RecategorizeTransactionsView(JsonView):
     def post(self, request):
         data = parse_json_body(request)
         transaction_ids = clean_list(data.get("transaction_ids"), "transaction_ids")
         include_locked = parse_bool(data.get("include_locked"), default=False)
-        queryset = filtered_transactions(request)
-        if transaction_ids:
-            queryset = queryset.filter(id__in=transaction_ids)
+        include_details = parse_bool(data.get("include_details"), default=True)
+        queryset = recategorize_queryset(request.GET, transaction_ids)
+        if parse_bool(data.get("background"), default=False):
+            # Surface invalid filter values now instead of as a failed job.
+            queryset.exists()
+            job = submit_job(
+                Job.KIND_RECATEGORIZE_TRANSACTIONS,
+                {
+                    "filters": request.GET.urlencode(),
+                    "transaction_ids": [str(value) for value in transaction_ids],
+                    "include_locked": include_locked,
+                    "include_details": include_details,
+                },
+                run_recategorize_job,
+            )
+            return json_response(serialize_job(job), status=202)
         return json_response(
-            recategorize_transactions(queryset, include_locked=include_locked)
+            recategorize_transactions(
+                queryset,
+                include_locked=include_locked,
+                include_details=include_details,
+            )
         )
 
 
@@ -1426,7 +1633,9 @@ class BulkAssignTransactionsView(JsonView):
         if not actions:
             raise APIValidationError("Choose at least one bulk assignment")
 
-        Transaction.objects.filter(id__in=transaction_ids).update(**update_values)
+        assigned = Transaction.objects.filter(id__in=transaction_ids)
+        assigned.update(**update_values)
+        mark_transaction_rollups_stale(assigned)
 
         if tag_mode != "no_change":
             through_model = Transaction.tags.through
@@ -1509,36 +1718,306 @@ class ImportTransactionsView(JsonView):
     def post(self, request):
         bank_account, csv_mapping, csv_file = resolve_import_inputs(request)
         dry_run = parse_bool(request.POST.get("dry_run"), default=False)
+        import_mode = (
+            clean_choice(
+                request.POST.get("import_mode"),
+                "import_mode",
+                CSVImportService.IMPORT_MODE_CHOICES,
+            )
+            or CSVImportService.IMPORT_MODE_BATCH
+        )
 
-        service = CSVImportService(csv_mapping, bank_account)
+        if not dry_run and parse_bool(request.POST.get("background"), default=False):
+            job = submit_job(
+                Job.KIND_IMPORT_TRANSACTIONS,
+                {
+                    "bank_account_id": str(bank_account.id),
+                    "csv_mapping_id": str(csv_mapping.id),
+                    "source_filename": csv_file.name,
+                    "import_mode": import_mode,
+                    "upload_path": store_job_upload(csv_file),
+                },
+                run_import_job,
+            )
+            return json_response(serialize_job(job), status=202)
+
+        service = CSVImportService(csv_mapping, bank_account, import_mode=import_mode)
         csv_import, report = service.import_file(
             csv_file, csv_file.name, dry_run=dry_run
         )
         if dry_run:
             return json_response({"dry_run": True, "preview": report})
-        exchange_rate_sync = {"attempted": False}
-        if csv_import.status != csv_import.STATUS_FAILED and csv_import.created_count:
-            exchange_rate_sync["attempted"] = True
-            try:
-                exchange_rate_sync.update(sync_missing_exchange_rates())
-                exchange_rate_sync["synced"] = True
-            except ExchangeRateProviderError as exc:
-                exchange_rate_sync.update(
-                    {
-                        "synced": False,
-                        "error": str(exc),
-                    }
-                )
+        return json_response(
+            import_response_payload(csv_import, report),
+            status=201 if import_kept_rows(csv_import) else 400,
+        )
+
+
+class ImportRowResultsView(JsonView):
+    def get(self, request, pk):
+        csv_import = get_object_or_404(CSVImport, pk=pk)
+        queryset = csv_import.row_results.order_by("line", "id")
+        outcome = clean_choice(
+            request.GET.get("outcome"), "outcome", ImportRowResult.OUTCOME_CHOICES
+        )
+        if outcome:
+            queryset = queryset.filter(outcome=outcome)
+        if parse_bool(request.GET.get("category_overlap"), default=False):
+            queryset = queryset.filter(is_category_overlap=True)
+        if parse_bool(request.GET.get("uncategorized"), default=False):
+            queryset = queryset.filter(is_uncategorized=True)
+
+        limit = min(
+            clean_int(request.GET.get("limit"), "limit", default=100, minimum=1), 1000
+        )
+        offset = clean_int(request.GET.get("offset"), "offset", default=0, minimum=0)
+        items = list(
+            queryset.select_related(
+                "transaction__bank_account",
+                "transaction__subcategory__category",
+            ).prefetch_related("transaction__tags")[offset : offset + limit + 1]
+        )
         return json_response(
             {
-                "import": serialize_csv_import(csv_import),
-                "report": report,
-                "exchange_rate_sync": exchange_rate_sync,
-            },
-            status=201 if csv_import.status != csv_import.STATUS_FAILED else 400,
+                "import": model_ref(csv_import),
+                "count": queryset.count(),
+                "limit": limit,
+                "offset": offset,
+                "next_offset": offset + limit if len(items) > limit else None,
+                "previous_offset": max(offset - limit, 0) if offset else None,
+                "results": [
+                    serialize_import_row_result(row_result)
+                    for row_result in items[:limit]
+                ],
+            }
         )
 
 
+def import_kept_rows(csv_import):
+    """Return whether ``csv_import`` completed or created rows before failing.
+
+    Streamed files are imported as they are read, so the rows before an
+    unreadable line stay imported and the request still counts as a success.
+    """
+    return csv_import.status != csv_import.STATUS_FAILED or bool(
+        csv_import.created_count
+    )
+
+
+def import_response_payload(csv_import, report):
+    return {
+        "import": serialize_csv_import(csv_import),
+        "report": report,
+        "exchange_rate_sync": sync_exchange_rates_after_import([csv_import]),
+    }
+
+
+def sync_exchange_rates_after_import(csv_imports):
+    exchange_rate_sync = {"attempted": False}
+    if any(csv_import.created_count for csv_import in csv_imports):
+        exchange_rate_sync["attempted"] = True
+        try:
+            exchange_rate_sync.update(sync_missing_exchange_rates())
+            exchange_rate_sync["synced"] = True
+        except ExchangeRateProviderError as exc:
+            exchange_rate_sync.update(
+                {
+                    "synced": False,
+                    "error": str(exc),
+                }
+            )
+    return exchange_rate_sync
+
+
+def run_import_job(params, progress):
+    upload_path = Path(params["upload_path"])
+    try:
+        service = CSVImportService(
+            CSVMapping.objects.get(id=params["csv_mapping_id"]),
+            BankAccount.objects.get(id=params["bank_account_id"]),
+            import_mode=params["import_mode"],
+        )
+        with upload_path.open("rb") as csv_file:
+            csv_import, report = service.import_file(
+                csv_file, params["source_filename"], progress=progress
+            )
+    finally:
+        upload_path.unlink(missing_ok=True)
+    progress(report["loaded"], report["loaded"], "Syncing exchange rates")
+    return import_response_payload(csv_import, report)
+
+
+def parse_file_accounts(value):
+    if value in (None, ""):
+        return {}
+    try:
+        file_accounts = json.loads(value)
+    except json.JSONDecodeError as exc:
+        raise APIValidationError(
+            "file_accounts must be a JSON object", {"field": "file_accounts"}
+        ) from exc
+    if not isinstance(file_accounts, dict):
+        raise APIValidationError(
+            "file_accounts must be a JSON object", {"field": "file_accounts"}
+        )
+    return {str(name): str(account_id) for name, account_id in file_accounts.items()}
+
+
+def resolve_statement_files(request, upload_paths):
+    """Store the uploaded statements and return their job parameters.
+
+    ZIP archives are expanded to the CSV files they contain. Each file is
+    assigned the bank account named for it in ``file_accounts``, by its own
+    name, its name inside the archive or the archive name, and otherwise
+    ``bank_account_id``.
+    """
+    uploads = request.FILES.getlist("files")
+    if not uploads:
+        raise APIValidationError("files is required", {"field": "files"})
+
+    default_account = optional_object(
+        BankAccount, request.POST.get("bank_account_id"), "bank_account_id"
+    )
+    csv_mapping = optional_object(
+        CSVMapping, request.POST.get("csv_mapping_id"), "csv_mapping_id"
+    )
+    file_accounts = parse_file_accounts(request.POST.get("file_accounts"))
+    bank_accounts = {}
+    statements = []
+    for upload in uploads:
+        path = store_job_upload(upload)
+        upload_paths.append(path)
+        try:
+            members = statement_archive_members(path)
+        except zipfile.BadZipFile as exc:
+            raise APIValidationError(
+                f"Could not read ZIP archive: {exc}",
+                {"field": "files", "file": upload.name},
+            ) from exc
+        if members == []:
+            raise APIValidationError(
+                "The ZIP archive contains no CSV files",
+                {"field": "files", "file": upload.name},
+            )
+
+        for member in members or [""]:
+            names = [member, Path(member).name, upload.name] if member else []
+            account_id = next(
+                (file_accounts[name] for name in names if name in file_accounts),
+                file_accounts.get(upload.name),
+            )
+            if account_id and account_id not in bank_accounts:
+                bank_accounts[account_id] = optional_object(
+                    BankAccount, account_id, "file_accounts"
+                )
+            bank_account = bank_accounts.get(account_id) or default_account
+            source_filename = f"{upload.name}/{member}" if member else upload.name
+            if not bank_account:
+                raise APIValidationError(
+                    "Select a bank account for every file.",
+                    {"field": "file_accounts", "file": source_filename},
+                )
+            statement_mapping = csv_mapping or bank_account.default_csv_mapping
+            if not statement_mapping:
+                raise APIValidationError(
+                    "Select a CSV mapping or set a default on the bank account.",
+                    {"field": "csv_mapping_id", "file": source_filename},
+                )
+            statements.append(
+                {
+                    "bank_account_id": str(bank_account.id),
+                    "csv_mapping_id": str(statement_mapping.id),
+                    "path": path,
+                    "member": member,
+                    "source_filename": source_filename[:255],
+                }
+            )
+    return statements
+
+
+class ImportStatementsView(JsonView):
+    def post(self, request):
+        upload_paths = []
+        try:
+            statements = resolve_statement_files(request, upload_paths)
+        except Exception:
+            for path in upload_paths:
+                Path(path).unlink(missing_ok=True)
+            raise
+        params = {"statements": statements, "upload_paths": upload_paths}
+
+        if parse_bool(request.POST.get("background"), default=False):
+            job = submit_job(Job.KIND_IMPORT_STATEMENTS, params, run_statements_job)
+            return json_response(serialize_job(job), status=202)
+
+        payload = run_statements_job(params)
+        succeeded = payload["created_count"] or any(
+            item["status"] != CSVImport.STATUS_FAILED for item in payload["imports"]
+        )
+        return json_response(payload, status=201 if succeeded else 400)
+
+
+def run_statements_job(params, progress=None):
+    statements = params["statements"]
+    try:
+        bank_accounts = {
+            str(bank_account.id): bank_account
+            for bank_account in BankAccount.objects.filter(
+                id__in={statement["bank_account_id"] for statement in statements}
+            )
+        }
+        csv_mappings = {
+            str(csv_mapping.id): csv_mapping
+            for csv_mapping in CSVMapping.objects.filter(
+                id__in={statement["csv_mapping_id"] for statement in statements}
+            )
+        }
+        results = import_statements(
+            [
+                StatementFile(
+                    bank_account=bank_accounts[statement["bank_account_id"]],
+                    csv_mapping=csv_mappings[statement["csv_mapping_id"]],
+                    path=statement["path"],
+                    member=statement["member"],
+                    source_filename=statement["source_filename"],
+                )
+                for statement in statements
+            ],
+            progress=progress,
+        )
+    finally:
+        for path in params["upload_paths"]:
+            Path(path).unlink(missing_ok=True)
+    if progress:
+        progress(len(statements), len(statements), "Syncing exchange rates")
+    csv_imports = [csv_import for csv_import, _report in results]
+    return {
+        "imports": [serialize_csv_import(csv_import) for csv_import in csv_imports],
+        "created_count": sum(csv_import.created_count for csv_import in csv_imports),
+        "exchange_rate_sync": sync_exchange_rates_after_import(csv_imports),
+    }
+
+
+class JobCollectionView(JsonView):
+    def get(self, request):
+        limit = min(
+            clean_int(request.GET.get("limit"), "limit", default=20, minimum=1), 100
+        )
+        jobs = Job.objects.all()
+        if request.GET.get("kind"):
+            jobs = jobs.filter(
+                kind=clean_choice(
+                    request.GET["kind"], "kind", Job.KIND_CHOICES, allow_blank=False
+                )
+            )
+        return json_response([serialize_job(job) for job in jobs[:limit]])
+
+
+class JobDetailView(JsonView):
+    def get(self, request, pk):
+        return json_response(serialize_job(get_object_or_404(Job, id=pk)))
+
+
 class KeywordPreviewView(JsonView):
     def post(self, request):
         data = parse_json_body(request)
@@ -1573,6 +2052,15 @@ class DashboardSummaryView(JsonView):
     def get(self, request):
         split_by_owners = parse_bool(request.GET.get("split_by_owners"), default=False)
         settings_obj = FinanceSettings.load()
+        rollups = dashboard_rollups(request.GET)
+        if rollups is not None:
+            return json_response(
+                build_dashboard_summary_from_rollups(
+                    rollups,
+                    split_by_owners,
+                    default_currency=settings_obj.default_currency,
+                )
+            )
         return json_response(
             build_dashboard_summary(
                 filtered_transactions(request),
@@ -1636,7 +2124,7 @@ def delete_all_transactions():
         "imports": CSVImport.objects.count(),
     }
     with transaction.atomic():
-        Transaction.objects.all().delete()
+        delete_transactions(Transaction.objects.all())
         CSVImport.objects.all().delete()
     return counts
 
@@ -1644,11 +2132,12 @@ def delete_all_transactions():
 def delete_all_finance_data():
     counts = maintenance_counts()
     with transaction.atomic():
-        Transaction.objects.all().delete()
+        delete_transactions(Transaction.objects.all())
         CSVImport.objects.all().delete()
         Keyword.objects.all().delete()
         SavedFilter.objects.all().delete()
         ExchangeRate.objects.all().delete()
+        mark_exchange_rates_changed()
         BankAccount.objects.all().delete()
         CSVMapping.objects.all().delete()
         Tag.objects.all().delete()
@@ -1842,6 +2331,9 @@ def restore_sqlite_database_from_path(backup_path):
             source.close()
     connection.close()
     migrate_restored_database()
+    # The restored generation may match the one the index was loaded at.
+    clear_exchange_rate_index()
+    mark_exchange_rates_changed()
     return pre_restore_path
 
 
@@ -1,6 +1,7 @@
 """PyInstaller entry point for the local Django backend."""
 
 import logging
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -58,6 +59,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Import worker processes are started by running this executable again.
+    multiprocessing.freeze_support()
     try:
         main()
     except Exception:
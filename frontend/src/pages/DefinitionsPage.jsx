@@ -1192,9 +1192,12 @@ function MappingReview({ draft, headers, mappingDetails, parsingSettings }) {
 
 function MappingSample({ detected }) {
   const rows = detected.sample_rows || [];
+  const rowCount = detected.loaded == null
+    ? "Rows not counted."
+    : `${detected.loaded_is_estimate ? "About " : ""}${detected.loaded} rows detected.`;
   return (
     <div className="mapping-sample">
-      <div className="mapping-sample-meta">{detected.loaded} rows detected. Showing {rows.length} samples.</div>
+      <div className="mapping-sample-meta">{rowCount} Showing {rows.length} samples.</div>
       <div className="mapping-sample-table">
         <table>
           <thead><tr>{detected.headers.map((header) => <th key={header}>{header}</th>)}</tr></thead>
@@ -289,20 +289,23 @@ function previewRowLabel(row) {
 
 function ImportReport({ report }) {
   const duplicates = report.skipped?.duplicates || [];
+  const duplicateCount = report.skipped?.duplicate_count ?? duplicates.length;
+  const errorCount = report.skipped?.error_count ?? report.skipped?.errors?.length;
   return (
     <div className="import-report-content">
       <div className="metrics-grid report-grid">
         <Metric label="Loaded" value={formatCount(report.loaded)} />
         <Metric label="Created" tone="positive" value={formatCount(report.created?.count)} />
-        <Metric label="Duplicates" value={formatCount(duplicates.length)} />
-        <Metric label="Errors" tone="negative" value={formatCount(report.skipped?.errors?.length)} />
+        <Metric label="Duplicates" value={formatCount(duplicateCount)} />
+        <Metric label="Errors" tone="negative" value={formatCount(errorCount)} />
       </div>
-      {duplicates.length ? <DuplicateList duplicates={duplicates} /> : null}
+      {duplicates.length ? <DuplicateList duplicates={duplicates} total={duplicateCount} /> : null}
     </div>
   );
 }
 
-function DuplicateList({ duplicates }) {
+function DuplicateList({ duplicates, total }) {
+  const shown = Math.min(duplicates.length, 12);
   return (
     <div className="import-duplicate-list">
       <div className="import-duplicate-list-title">Skipped duplicates</div>
@@ -318,8 +321,8 @@ function DuplicateList({ duplicates }) {
           </div>
         );
       })}
-      {duplicates.length > 12 ? (
-        <div className="muted">+{formatCount(duplicates.length - 12)} more duplicates</div>
+      {total > shown ? (
+        <div className="muted">+{formatCount(total - shown)} more duplicates</div>
       ) : null}
     </div>
   );